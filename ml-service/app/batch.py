@@ -0,0 +1,494 @@
+"""
+Offline Batch Scoring
+Scores profile files on a process pool and writes recommendations and placement to Parquet
+
+Usage:
+    python -m app.batch profiles.jsonl out/
+    python -m app.batch profiles.csv out/ --top-k 10 --workers 8 --chunk-size 2000
+    python -m app.batch profiles.parquet out/ --scaling --scaling-records 8000
+
+The output directory holds two Parquet datasets (one part file per input
+chunk) that pandas/pyarrow read as a single table:
+
+    recommendations/  one row per (userId, rank)
+    placement/        one row per userId
+    errors/           one row per input row that could not be read (only if any)
+
+Each finished chunk leaves a checkpoint, so rerunning the same command
+after an interruption only scores the chunks that are missing.
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .models.catalog_index import CatalogIndex
+from .models.collaborative import create_collaborative_model
+from .models.hybrid import HybridRecommender
+from .models.placement import PlacementPredictor
+from .models.profile_context import ProfileContext
+from .models.retrieval import create_retriever
+from .utils.catalog_artifact import load_compiled_catalog
+from .utils.data_loader import compute_catalog_version, get_careers_file, load_careers_data
+
+FORMATS = {'.jsonl': 'jsonl', '.ndjson': 'jsonl', '.csv': 'csv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+# Profile fields holding lists; CSV cells carry them as JSON arrays or "a;b;c"
+LIST_FIELDS = ('skills', 'interests', 'primaryObjectives', 'preferredDomains', 'targetIndustries',
+               'geographicPreferences', 'certifications')
+INT_FIELDS = ('yearsExperience', 'workLifeBalancePriority', 'projectsCompleted')
+# Text fields the scorers lower-case or compare as strings (UserProfile's str fields)
+STR_FIELDS = ('educationLevel', 'fieldOfStudy', 'currentStatus', 'experienceLevel', 'learningStyle',
+              'timeCommitment', 'currentRole', 'remotePreference', 'careerTimeline', 'riskTolerance',
+              'workStyle', 'problemSolvingApproach', 'learningPace')
+BOOL_FIELDS = ('startingFresh', 'willingToRelocate', 'leadershipAspirations')
+# Fields holding JSON objects; CSV cells carry them as JSON text
+JSON_FIELDS = ('salaryExpectation', 'skillProficiency')
+
+RECOMMENDATION_COLUMNS = ['userId', 'rank', 'careerId', 'careerTitle', 'category', 'matchPercentage',
+                          'contentBased', 'collaborative', 'missingSkills', 'timeline']
+
+ERROR_COLUMNS = ['row', 'userId', 'column', 'error']
+
+MANIFEST_FILE = '_manifest.json'
+CHECKPOINT_DIR = '_checkpoints'
+
+# ===== Input =====
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"Unsupported input format '{ext}' (expected one of {', '.join(sorted(FORMATS))})")
+    return FORMATS[ext]
+
+def read_chunks(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Input rows as DataFrames of at most chunk_size rows, never loading the whole file"""
+    fmt = detect_format(path)
+    if fmt == 'jsonl':
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False) as reader:
+            yield from reader
+    elif fmt == 'csv':
+        with pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False) as reader:
+            yield from reader
+    else:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+class InvalidRecord(ValueError):
+    """An input row with a cell that can't be read as its profile field"""
+
+    def __init__(self, column: str, message: str):
+        super().__init__(f"{column}: {message}")
+        self.column = column
+        self.message = message
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _normalize_value(key: str, value):
+    if isinstance(value, str) and key not in STR_FIELDS:
+        text = value.strip()
+        if key in LIST_FIELDS:
+            value = json.loads(text) if text.startswith('[') else [v.strip() for v in text.split(';') if v.strip()]
+        elif key in JSON_FIELDS:
+            value = json.loads(text)
+        elif key in INT_FIELDS:
+            value = float(text)
+        elif text.lower() in ('true', 'false'):
+            value = text.lower() == 'true'
+    if key in INT_FIELDS and isinstance(value, float):
+        # inf / nan (e.g. "1e400") have no integer value
+        if not math.isfinite(value):
+            raise ValueError(f"expected an integer, got {value!r}")
+        value = int(value)
+
+    # Shapes the scorers rely on
+    if key in STR_FIELDS and not isinstance(value, str):
+        raise ValueError(f"expected a string, got {value!r}")
+    if key in LIST_FIELDS and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+        raise ValueError(f"expected a list of strings, got {value!r}")
+    if key in INT_FIELDS and (isinstance(value, bool) or not isinstance(value, int)):
+        raise ValueError(f"expected an integer, got {value!r}")
+    if key in BOOL_FIELDS and not isinstance(value, bool):
+        raise ValueError(f"expected true or false, got {value!r}")
+    if key == 'salaryExpectation' and not (isinstance(value, dict) and all(_is_number(v) for v in value.values())):
+        raise ValueError(f"expected an object of numbers, got {value!r}")
+    if key == 'skillProficiency' and not (isinstance(value, list) and all(
+            isinstance(v, dict) and _is_number(v.get('level', 3)) for v in value)):
+        raise ValueError(f"expected a list of objects with a numeric level, got {value!r}")
+    return value
+
+def normalize_record(record: Dict) -> Dict:
+    """
+    A profile dict from one input row.
+
+    Drops empty cells, turns array values (Parquet lists) and list cells
+    written as JSON or ';'-separated text into lists, and restores numeric,
+    boolean and object fields that CSV reads as text. Every field the
+    scorers read is then type-checked against the profile schema (text
+    fields must be strings, counts finite integers, and so on), so a bad
+    cell is caught here rather than failing a worker. Raises InvalidRecord,
+    naming the column, for a cell that can't be read.
+    """
+    profile = {}
+    for key, value in record.items():
+        if isinstance(value, np.ndarray):
+            value = value.tolist()
+        elif isinstance(value, np.generic):
+            value = value.item()
+
+        if value is None or value == '' or (isinstance(value, float) and math.isnan(value)):
+            continue
+
+        try:
+            profile[key] = _normalize_value(key, value)
+        except (ValueError, TypeError, OverflowError) as e:
+            raise InvalidRecord(key, str(e)) from e
+    return profile
+
+# ===== Workers =====
+
+# Per-process scoring state, set once by init_worker
+_worker = {}
+
+def load_catalog():
+    """The careers catalog, memory-mapped from its compiled artifact when ML_CATALOG_ARTIFACT_DIR is set"""
+    artifact_dir = os.getenv('ML_CATALOG_ARTIFACT_DIR')
+    if artifact_dir:
+        return load_compiled_catalog(artifact_dir, get_careers_file(), lambda: load_careers_data(strict=True))
+    # Offline runs fail on a missing or broken catalog rather than score against mock data
+    return load_careers_data(strict=True)
+
+def init_worker(placement_model: Optional[str]):
+    """Load the catalog and models (and the interaction log, when configured) once per worker process"""
+    careers_data = load_catalog()
+    predictor = PlacementPredictor()
+    if placement_model:
+        predictor.load_model(placement_model)
+
+    index = getattr(careers_data, 'catalog_index', None)
+    if index is None:
+        index = CatalogIndex(careers_data)
+    _worker['recommender'] = HybridRecommender(
+        careers_data,
+        index=index,
+        collaborative=create_collaborative_model(careers_data),
+        retriever=create_retriever(index)
+    )
+    _worker['predictor'] = predictor
+    _worker['version'] = getattr(careers_data, 'version', None) or compute_catalog_version(careers_data)
+
+def worker_info() -> Dict:
+    return {'pid': os.getpid(), 'catalogVersion': _worker['version']}
+
+def score_chunk(chunk: int, user_ids: List[str], profiles: List[Dict], top_k: int, out_dir: str,
+                errors: List[Dict] = ()) -> Dict:
+    """
+    Score one input chunk and write its part files and checkpoint.
+
+    errors are the chunk's unreadable rows (see iter_work), written to
+    the errors dataset with the chunk.
+
+    Parts are written under temporary names and renamed into place, and
+    the checkpoint is written last, so a chunk counts as done only once
+    all of its output is complete.
+    """
+    start = time.perf_counter()
+    contexts = [ProfileContext(p) for p in profiles]
+    pages = _worker['recommender'].recommend_batch(contexts, top_n=top_k)
+    predictions = _worker['predictor'].predict_probability_batch(contexts)
+
+    rows = []
+    for user_id, page in zip(user_ids, pages):
+        for rank, rec in enumerate(page, 1):
+            career = rec['career']
+            rows.append({
+                'userId': user_id,
+                'rank': rank,
+                'careerId': str(career.get('id', '')),
+                'careerTitle': career.get('title', ''),
+                'category': career.get('category', ''),
+                'matchPercentage': rec['matchPercentage'],
+                'contentBased': rec['breakdown']['contentBased'],
+                'collaborative': rec['breakdown']['collaborative'],
+                'missingSkills': rec['missingSkills'],
+                'timeline': rec['timeline']
+            })
+
+    placement = pd.DataFrame({
+        'userId': user_ids,
+        'probability': [p['probability'] for p in predictions],
+        'confidence': [p['confidence'] for p in predictions],
+        'improvementAreas': [[i['area'] for i in p['improvementAreas']] for p in predictions]
+    })
+
+    name = f'part-{chunk:05d}.parquet'
+    tables = [('recommendations', pd.DataFrame(rows, columns=RECOMMENDATION_COLUMNS)), ('placement', placement)]
+    if errors:
+        tables.append(('errors', pd.DataFrame(list(errors), columns=ERROR_COLUMNS)))
+    for table, frame in tables:
+        path = os.path.join(out_dir, table, name)
+        partial = os.path.join(out_dir, table, f'.{name}.tmp')  # Dot files are ignored by dataset readers
+        frame.to_parquet(partial, index=False)
+        os.replace(partial, path)
+
+    result = {
+        'chunk': chunk,
+        'rows': len(profiles),
+        'rejected': len(errors),
+        'seconds': round(time.perf_counter() - start, 4),
+        'catalogVersion': _worker['version']
+    }
+    _write_json(os.path.join(out_dir, CHECKPOINT_DIR, f'chunk-{chunk:05d}.json'), result)
+    return result
+
+def _write_json(path: str, data: Dict):
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+# ===== Driver =====
+
+def input_identity(path: str) -> Dict:
+    """What a checkpointed run must match to be resumed"""
+    stat = os.stat(path)
+    return {'input': os.path.abspath(path), 'inputBytes': stat.st_size, 'inputMtime': stat.st_mtime}
+
+def prepare_output(out_dir: str, manifest: Dict, overwrite: bool) -> set:
+    """
+    Create the output layout and return the chunks already completed.
+
+    A previous run is resumed only if it used the same input and settings;
+    otherwise the run stops rather than mix outputs, unless overwrite is set.
+    """
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        settings = lambda m: {k: v for k, v in m.items() if k not in ('catalogVersion', 'complete', 'summary')}
+        if overwrite:
+            for name in ('recommendations', 'placement', 'errors', CHECKPOINT_DIR, MANIFEST_FILE):
+                target = os.path.join(out_dir, name)
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                elif os.path.exists(target):
+                    os.remove(target)
+        elif settings(previous) != settings(manifest) or previous.get('catalogVersion') != manifest['catalogVersion']:
+            raise ValueError(f"{out_dir} holds output of a different input, settings or catalog; "
+                             f"use --overwrite to replace it")
+
+    for name in ('recommendations', 'placement', 'errors', CHECKPOINT_DIR):
+        os.makedirs(os.path.join(out_dir, name), exist_ok=True)
+    _write_json(path, manifest)
+
+    done = set()
+    for name in os.listdir(os.path.join(out_dir, CHECKPOINT_DIR)):
+        if name.startswith('chunk-') and name.endswith('.json'):
+            done.add(int(name[len('chunk-'):-len('.json')]))
+    return done
+
+def iter_work(path: str, chunk_size: int, id_column: str,
+              skip: set) -> Iterator[Tuple[int, List[str], List[Dict], List[Dict]]]:
+    """
+    (chunk, user IDs, profiles, errors) for every chunk not in skip.
+
+    Rows without an ID use their row number (0-based). A row with an
+    unreadable cell is left out and reported in errors as its row number,
+    user ID (when readable), column and message, so one bad cell never
+    stops a run.
+    """
+    row = 0
+    for chunk, frame in enumerate(read_chunks(path, chunk_size)):
+        first, row = row, row + len(frame)
+        if chunk in skip:
+            continue
+
+        user_ids, profiles, errors = [], [], []
+        for offset, record in enumerate(frame.to_dict('records')):
+            try:
+                profile = normalize_record(record)
+            except InvalidRecord as e:
+                user_id = record.get(id_column)
+                errors.append({
+                    'row': first + offset,
+                    'userId': str(user_id) if isinstance(user_id, (str, int)) and user_id != '' else None,
+                    'column': e.column,
+                    'error': e.message
+                })
+                continue
+            user_ids.append(str(profile.get(id_column, first + offset)))
+            profiles.append(profile)
+        yield chunk, user_ids, profiles, errors
+
+def run(path: str, out_dir: str, top_k: int = 5, chunk_size: int = 1000, workers: int = None,
+        id_column: str = 'userId', placement_model: Optional[str] = None, overwrite: bool = False,
+        quiet: bool = False) -> Dict:
+    """
+    Score every profile in `path` into `out_dir` and return a run summary.
+
+    Chunks are read in order and handed to `workers` processes, at most
+    two per worker in flight, so memory stays bounded by the chunk size
+    rather than the input size.
+    """
+    workers = workers or os.cpu_count() or 1
+    detect_format(path)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(placement_model,)) as pool:
+        catalog_version = pool.submit(worker_info).result()['catalogVersion']
+        startup_seconds = time.perf_counter() - start
+
+        manifest = {**input_identity(path), 'chunkSize': chunk_size, 'topK': top_k, 'idColumn': id_column,
+                    'placementModel': placement_model, 'catalogVersion': catalog_version}
+        done = prepare_output(out_dir, manifest, overwrite)
+        if done and not quiet:
+            print(f"Resuming: {len(done)} chunk(s) already checkpointed")
+
+        scored = {'chunks': 0, 'rows': 0, 'rejected': 0}
+        pending = set()
+
+        def collect(futures):
+            for future in futures:
+                result = future.result()
+                scored['chunks'] += 1
+                scored['rows'] += result['rows']
+                scored['rejected'] += result['rejected']
+                if not quiet:
+                    rejected = f" ({result['rejected']} rejected)" if result['rejected'] else ""
+                    print(f"chunk {result['chunk']}: {result['rows']} profiles{rejected} in {result['seconds']:.2f}s")
+
+        for chunk, user_ids, profiles, errors in iter_work(path, chunk_size, id_column, done):
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            pending.add(pool.submit(score_chunk, chunk, user_ids, profiles, top_k, out_dir, errors))
+
+        collect(wait(pending).done)
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        'workers': workers,
+        'chunksScored': scored['chunks'],
+        'chunksSkipped': len(done),
+        'profilesScored': scored['rows'],
+        'profilesRejected': scored['rejected'],
+        'elapsedSeconds': round(elapsed, 3),
+        'startupSeconds': round(startup_seconds, 3),
+        'profilesPerSecond': round(scored['rows'] / elapsed, 1) if elapsed > 0 else 0.0,
+        'catalogVersion': catalog_version
+    }
+    _write_json(os.path.join(out_dir, MANIFEST_FILE), {**manifest, 'complete': True, 'summary': summary})
+    return summary
+
+def scaling_report(path: str, records: int, chunk_size: int, top_k: int, max_workers: int,
+                   placement_model: Optional[str] = None) -> List[Dict]:
+    """
+    Throughput of the first `records` profiles with 1, 2, 4 .. max_workers processes.
+
+    Each point is a fresh run into a scratch directory. Throughput counts
+    scoring and writing only (worker start-up, mostly catalog loading, is
+    reported separately), and efficiency is the speedup over one worker
+    divided by the worker count.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        fmt = detect_format(path)
+        sample = os.path.join(tmp, 'sample' + os.path.splitext(path)[1])
+        frames, total = [], 0
+        for frame in read_chunks(path, chunk_size):
+            frames.append(frame.head(records - total))
+            total += len(frames[-1])
+            if total >= records:
+                break
+
+        # Same format as the input, so reading and normalizing cost the same
+        frame = pd.concat(frames, ignore_index=True)
+        if fmt == 'jsonl':
+            frame.to_json(sample, orient='records', lines=True)
+        elif fmt == 'csv':
+            frame.to_csv(sample, index=False)
+        else:
+            frame.to_parquet(sample, index=False)
+
+        counts = sorted({2 ** i for i in range(int(math.log2(max_workers)) + 1)} | {max_workers})
+        report = []
+        for n in counts:
+            summary = run(sample, os.path.join(tmp, f'out-{n}'), top_k, chunk_size, n,
+                          placement_model=placement_model, quiet=True)
+            scoring_seconds = summary['elapsedSeconds'] - summary['startupSeconds']
+            report.append({
+                'workers': n,
+                'profiles': summary['profilesScored'],
+                'startupSeconds': summary['startupSeconds'],
+                'scoringSeconds': round(scoring_seconds, 3),
+                'profilesPerSecond': round(summary['profilesScored'] / scoring_seconds, 1)
+            })
+
+    base = report[0]['profilesPerSecond']
+    for point in report:
+        point['speedup'] = round(point['profilesPerSecond'] / base, 2)
+        point['efficiency'] = round(point['speedup'] / point['workers'], 2)
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('input', help='profiles as .jsonl, .csv or .parquet')
+    parser.add_argument('output', help='output directory (created; resumed if it holds a matching run)')
+    parser.add_argument('--top-k', type=int, default=5, help='recommendations per profile')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='profiles per chunk (and checkpoint)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes (default: CPU count)')
+    parser.add_argument('--id-column', default='userId', help='input column with the user ID (default: row number)')
+    parser.add_argument('--catalog', help='careers catalog file (default: CAREERS_DATA_PATH or the Next.js data)')
+    parser.add_argument('--placement-model', default=os.getenv('ML_PLACEMENT_MODEL_PATH'),
+                        help='trained placement model (default: ML_PLACEMENT_MODEL_PATH, else heuristics)')
+    parser.add_argument('--overwrite', action='store_true', help='discard existing output instead of resuming')
+    parser.add_argument('--scaling', action='store_true',
+                        help='report scaling from 1 to --workers processes on a sample instead of scoring')
+    parser.add_argument('--scaling-records', type=int, default=4000, help='profiles in the scaling sample')
+    args = parser.parse_args()
+
+    if args.catalog:
+        os.environ['CAREERS_DATA_PATH'] = args.catalog  # Inherited by the worker processes
+
+    try:
+        if args.scaling:
+            report = scaling_report(args.input, args.scaling_records, args.chunk_size, args.top_k,
+                                    args.workers, args.placement_model)
+            print(f"{'workers':>8}{'profiles/s':>13}{'speedup':>10}{'efficiency':>12}{'startup s':>11}")
+            for p in report:
+                print(f"{p['workers']:>8}{p['profilesPerSecond']:>13,.1f}{p['speedup']:>10.2f}"
+                      f"{p['efficiency']:>12.0%}{p['startupSeconds']:>11.2f}")
+            os.makedirs(args.output, exist_ok=True)
+            _write_json(os.path.join(args.output, 'scaling.json'), {'cpuCount': os.cpu_count(), 'points': report})
+            return
+
+        summary = run(args.input, args.output, args.top_k, args.chunk_size, args.workers, args.id_column,
+                      args.placement_model, args.overwrite)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except BrokenProcessPool as e:
+        # Worker start-up failed (e.g. the catalog is missing); the worker's traceback is printed above
+        print(f"Error: worker start-up failed: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Scored {summary['profilesScored']} profiles ({summary['chunksScored']} chunks, "
+          f"{summary['chunksSkipped']} resumed) in {summary['elapsedSeconds']}s "
+          f"with {summary['workers']} workers: {summary['profilesPerSecond']} profiles/s")
+    if summary['profilesRejected']:
+        print(f"Rejected {summary['profilesRejected']} unreadable row(s); see {os.path.join(args.output, 'errors')}")
+
+if __name__ == '__main__':
+    main()
@@ -2,21 +2,62 @@
 FastAPI ML Service for Career Recommendations
 """
 
-from fastapi import FastAPI, HTTPException
+import time
+
+_startup_began = time.perf_counter()  # Start of the startup timing report
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, ValidationError, field_validator, model_validator
+from typing import List, Dict, Literal, Optional, Union
+import asyncio
+import hmac
+import os
 import uvicorn
 
+from .models.catalog_index import CatalogIndex
+from .models.collaborative import create_collaborative_model
 from .models.hybrid import HybridRecommender
 from .models.placement import PlacementPredictor
-from .utils.data_loader import load_careers_data
+from .models.profile_context import ProfileContext
+from .models.retrieval import create_retriever
+from .models.scoring_session import ScoringSession
+from .models.skill_gap import SkillGapAnalyzer
+from .utils.cache import create_result_cache
+from .utils.catalog_artifact import load_compiled_catalog
+from .utils.catalog_store import CatalogStore
+from .utils.data_loader import load_careers_data, get_careers_file
+from .utils.executor import Overloaded, create_scoring_executor
+from .utils.metrics import MetricsMiddleware, TimedJSONResponse, metrics
+from .utils.ndjson import NDJSONStreamResponse, iter_records
+from .utils.micro_batcher import MicroBatcher
+from .utils.pagination import StaleCursor, decode_cursor, next_cursor
+from .utils.serialization import parse_fields, render_object, render_recommendations
+from .utils.session_store import create_session_store
+from .utils.startup import StartupTracker
+
+startup = StartupTracker(_startup_began)
+startup.record('imports', time.perf_counter() - _startup_began)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up scoring and watch the careers catalog while the service is running"""
+    startup.warm_up_in_background(warm_up)
+    catalog_store.start_watching()
+    yield
+    catalog_store.stop_watching()
+    scoring_executor.shutdown()
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Career Recommendation ML Service",
     description="ML-powered career path recommendations and placement predictions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=TimedJSONResponse
 )
 
 # CORS middleware
@@ -28,13 +69,188 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and per-endpoint latency for /metrics
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Initialize ML models
 placement_predictor = PlacementPredictor()
-careers_data = load_careers_data()
+
+# Trained placement model (joblib or compiled .npz); heuristics are used when unset
+PLACEMENT_MODEL_PATH = os.getenv('ML_PLACEMENT_MODEL_PATH')
+if PLACEMENT_MODEL_PATH:
+    with startup.phase('model_load'):
+        try:
+            placement_predictor.load_model(PLACEMENT_MODEL_PATH)
+        except Exception as e:
+            print(f"Warning: Placement model not loaded, using heuristics: {e}")
+
+# Compiled catalog artifacts shared by all worker processes (disabled when unset)
+CATALOG_ARTIFACT_DIR = os.getenv('ML_CATALOG_ARTIFACT_DIR')
+
+def load_catalog(strict: bool = False):
+    """
+    Load the careers catalog, memory-mapping its compiled artifact when enabled.
+
+    The first worker compiles the artifact; the others attach to it without
+    parsing the catalog file.
+    """
+    if not CATALOG_ARTIFACT_DIR:
+        return load_careers_data(strict=strict)
+    
+    try:
+        return load_compiled_catalog(CATALOG_ARTIFACT_DIR, get_careers_file(),
+                                     lambda: load_careers_data(strict=strict))
+    except Exception as e:
+        if strict:
+            raise
+        print(f"Warning: Compiled catalog unavailable, loading in memory: {e}")
+        return load_careers_data()
+
+def build_recommender(careers_data) -> HybridRecommender:
+    """Recommender for a catalog, reusing the index of a compiled artifact"""
+    index = getattr(careers_data, 'catalog_index', None)
+    if index is None:
+        index = CatalogIndex(careers_data)
+    return HybridRecommender(
+        careers_data,
+        index=index,
+        collaborative=create_collaborative_model(careers_data),
+        retriever=create_retriever(index)
+    )
+
+with startup.phase('catalog_load'):
+    initial_careers = load_catalog()
+
+# Catalog snapshot (careers + recommender index), hot-reloaded on change
+# Only the initial load may fall back to mock data; reloads keep the current catalog on error
+with startup.phase('index_build'):
+    catalog_store = CatalogStore(
+        loader=lambda: load_catalog(strict=True),
+        builder=build_recommender,
+        initial_data=initial_careers,
+        watch_path=get_careers_file(),
+        poll_interval=float(os.getenv('ML_CATALOG_WATCH_SECONDS', '5'))
+    )
+
+# Result cache keyed on profile fingerprint + catalog version
+result_cache = create_result_cache(catalog_store.current.version)
+catalog_store.on_swap(lambda snapshot: result_cache.set_catalog_version(snapshot.version))
+
+# Incremental scoring sessions for profiles being edited (onboarding wizard)
+session_store = create_session_store()
+
+# Worker pool that scores off the event loop, with a bounded admission queue
+scoring_executor = create_scoring_executor()
+
+def recommender_ref(snapshot):
+    """
+    How queued requests refer to a snapshot's recommender.
+    
+    Thread workers share the recommender object; process workers get the
+    catalog version instead (the recommender is far too big to pickle per
+    request) and resolve it against their own catalog copy.
+    """
+    return snapshot.version if scoring_executor.kind == 'process' else snapshot.recommender
+
+def resolve_recommender(ref) -> HybridRecommender:
+    """Recommender for a reference made by recommender_ref()"""
+    if not isinstance(ref, str):
+        return ref
+    
+    # A process worker forked before the last catalog swap catches up on demand
+    if catalog_store.current.version != ref:
+        catalog_store.reload()
+    if catalog_store.current.version != ref:
+        raise RuntimeError(f"Catalog version {ref} is not available in this worker")
+    return catalog_store.current.recommender
+
+def score_recommendation_batch(items: List[tuple]) -> List[List[Dict]]:
+    """
+    Score queued (recommender, profile or ProfileContext, offset, limit) requests.
+    
+    Requests are grouped by the catalog snapshot they were served from and
+    each group is ranked as one matrix pass; a lone request takes the
+    pruned single-profile path.
+    """
+    if len(items) == 1:
+        ref, profile, offset, limit = items[0]
+        return [resolve_recommender(ref).recommend(profile, top_n=limit, offset=offset)]
+    
+    groups = {}
+    for position, item in enumerate(items):
+        groups.setdefault(item[0] if isinstance(item[0], str) else id(item[0]), []).append(position)
+    
+    results = [None] * len(items)
+    for positions in groups.values():
+        recommender = resolve_recommender(items[positions[0]][0])
+        pages = recommender.recommend_batch(
+            [items[i][1] for i in positions],
+            pages=[(items[i][2], items[i][3]) for i in positions]
+        )
+        for position, recommendations in zip(positions, pages):
+            results[position] = recommendations
+    return results
+
+def score_placement_batch(profiles: List[Union[Dict, ProfileContext]]) -> List[Dict]:
+    """Predict queued placement requests in one vectorized pass"""
+    if len(profiles) == 1:
+        return [placement_predictor.predict_probability(profiles[0])]
+    return placement_predictor.predict_probability_batch(profiles)
+
+# Micro-batchers coalescing concurrent scoring requests (ML_BATCH_MAX_SIZE=1 disables)
+BATCH_MAX_SIZE = int(os.getenv('ML_BATCH_MAX_SIZE', '32'))
+BATCH_MAX_WAIT_MS = float(os.getenv('ML_BATCH_MAX_WAIT_MS', '2'))
+recommendation_batcher = MicroBatcher(score_recommendation_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS,
+                                      executor=scoring_executor)
+placement_batcher = MicroBatcher(score_placement_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS,
+                                 executor=scoring_executor)
+
+# Scrape-time gauges for /metrics
+metrics.add_gauge('ml_ready', 'Whether warm-up has completed (1) or not (0)', lambda: int(startup.ready))
+metrics.add_gauge('ml_catalog_size', 'Careers in the current catalog snapshot',
+                  lambda: len(catalog_store.current.careers_data))
+metrics.add_gauge('ml_catalog_info', 'Current catalog version', lambda: {(catalog_store.current.version,): 1},
+                  labels=('version',))
+metrics.add_gauge('ml_cache_lookups_total', 'Result cache lookups by outcome', lambda: {
+    ('local_hit',): result_cache.stats['localHits'],
+    ('remote_hit',): result_cache.stats['remoteHits'],
+    ('miss',): result_cache.stats['misses']
+}, kind='counter', labels=('result',))
+metrics.add_gauge('ml_cache_hit_ratio', 'Result cache hit ratio since startup',
+                  lambda: result_cache.get_stats()['hitRatio'])
+metrics.add_gauge('ml_requests_coalesced_total', 'Cache misses that awaited an identical request already in flight',
+                  lambda: result_cache.in_flight.stats['coalesced'], kind='counter')
+metrics.add_gauge('ml_requests_in_flight', 'Distinct uncached computations running', lambda: len(result_cache.in_flight))
+metrics.add_gauge('ml_executor_queue_depth', 'Scoring tasks waiting for a worker', scoring_executor.queue_depth)
+metrics.add_gauge('ml_executor_in_flight', 'Scoring tasks running or queued',
+                  lambda: scoring_executor.get_stats()['inFlight'])
+metrics.add_gauge('ml_executor_rejected_total', 'Scoring tasks rejected because the queue was full',
+                  lambda: scoring_executor.stats['rejected'], kind='counter')
+metrics.add_gauge('ml_batches_total', 'Micro-batches flushed', lambda: {
+    ('recommendations',): recommendation_batcher.stats['batches'],
+    ('placement',): placement_batcher.stats['batches']
+}, kind='counter', labels=('batcher',))
+metrics.add_gauge('ml_interactions_folded_total', 'Interaction events folded into collaborative filtering',
+                  lambda: getattr(catalog_store.current.recommender.collaborative, 'stats', {}).get('events', 0),
+                  kind='counter')
+metrics.add_gauge('ml_sessions_active', 'Incremental scoring sessions held', lambda: len(session_store))
+metrics.add_gauge('ml_session_bytes', 'Memory held by scoring sessions', lambda: session_store.get_stats()['bytes'])
+metrics.add_gauge('ml_sessions_evicted_total', 'Scoring sessions dropped to stay within the memory budget',
+                  lambda: session_store.stats['evicted'], kind='counter')
+metrics.add_gauge('ml_batch_items_total', 'Requests scored through micro-batches', lambda: {
+    ('recommendations',): recommendation_batcher.stats['items'],
+    ('placement',): placement_batcher.stats['items']
+}, kind='counter', labels=('batcher',))
+
+# Records scored per pass by the NDJSON streaming endpoint (bounds its memory)
+STREAM_CHUNK_SIZE = int(os.getenv('ML_STREAM_CHUNK_SIZE', '256'))
 
 # ===== Request/Response Models =====
 
 class UserProfile(BaseModel):
+    # Interaction history key for collaborative filtering
+    userId: Optional[str] = None
+    
     # Basic Info
     educationLevel: str
     fieldOfStudy: str
@@ -71,19 +287,108 @@ class UserProfile(BaseModel):
     problemSolvingApproach: Optional[str] = None
     learningPace: Optional[str] = None
     leadershipAspirations: bool = False
+    
+    @model_validator(mode='wrap')
+    @classmethod
+    def time_validation(cls, data, handler):
+        """Record request body validation time as the validation stage"""
+        start = time.perf_counter()
+        try:
+            return handler(data)
+        finally:
+            metrics.observe_stage('validation', time.perf_counter() - start)
 
 class RecommendationResponse(BaseModel):
     success: bool
     recommendations: List[Dict]
+    total: Optional[int] = None
+    nextCursor: Optional[str] = None
+    catalogVersion: Optional[str] = None
+    message: Optional[str] = None
+
+class BatchRecommendationRequest(BaseModel):
+    profiles: List[UserProfile]
+    topN: int = 5
+
+class BatchRecommendationResponse(BaseModel):
+    success: bool
+    results: List[List[Dict]]
+    count: int
+    elapsedMs: float
+    profilesPerSecond: float
+    catalogVersion: Optional[str] = None
     message: Optional[str] = None
 
 class PlacementPredictionResponse(BaseModel):
     success: bool
     prediction: Dict
+    catalogVersion: Optional[str] = None
+    message: Optional[str] = None
+
+class BatchPlacementRequest(BaseModel):
+    profiles: List[UserProfile]
+
+class InteractionEvent(BaseModel):
+    userId: str
+    careerId: str
+    event: Literal['view', 'save', 'plan_start']
+    ts: Optional[float] = None
+
+class InteractionsRequest(BaseModel):
+    events: List[InteractionEvent]
+
+class ProfileDelta(BaseModel):
+    # Skills & interests to add or remove (case-insensitive)
+    addSkills: List[str] = []
+    removeSkills: List[str] = []
+    addInterests: List[str] = []
+    removeInterests: List[str] = []
+    
+    # Replacements (unchanged when omitted)
+    educationLevel: Optional[str] = None
+    fieldOfStudy: Optional[str] = None
+    targetIndustries: Optional[List[str]] = None
+    
+    # Any other UserProfile fields, replaced as-is (validated with the edited profile)
+    updates: Dict = {}
+    
+    @field_validator('updates')
+    @classmethod
+    def known_fields(cls, updates: Dict) -> Dict:
+        """Only UserProfile fields may be replaced"""
+        unknown = sorted(set(updates) - set(UserProfile.model_fields))
+        if unknown:
+            raise ValueError(f"Unknown profile fields: {', '.join(unknown)}")
+        return updates
+
+class SessionResponse(BaseModel):
+    success: bool
+    sessionId: str
+    recommendations: List[Dict]
+    total: Optional[int] = None
+    rescoredCareers: Optional[int] = None
+    catalogVersion: Optional[str] = None
+    message: Optional[str] = None
+
+class BatchPlacementResponse(BaseModel):
+    success: bool
+    predictions: List[Dict]
+    count: int
+    elapsedMs: float
+    profilesPerSecond: float
     message: Optional[str] = None
 
 # ===== API Endpoints =====
 
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request, exc: Overloaded):
+    """Shed load when the scoring queue is full instead of queueing without bound"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -95,43 +400,204 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint (liveness; see /ready for readiness)"""
+    snapshot = catalog_store.current
     return {
         "status": "healthy",
         "service": "ml-recommendation",
-        "models_loaded": True
+        "models_loaded": startup.ready,
+        "catalogVersion": snapshot.version,
+        "catalogSize": len(snapshot.careers_data),
+        "catalogReloadError": catalog_store.last_error,
+        "startup": startup.report()
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness endpoint.
+    
+    Returns 503 until the warm-up scoring pass has completed, so load
+    balancers never route a cold first request to this worker.
+    """
+    report = startup.report()
+    if not startup.ready:
+        return JSONResponse(status_code=503, content={"status": "warming_up", **report})
+    
+    return {"status": "ready", **report}
+
 @app.post("/api/ml/recommendations", response_model=RecommendationResponse)
-async def get_recommendations(profile: UserProfile):
+async def get_recommendations(
+    profile: UserProfile,
+    limit: int = Query(5, ge=1, le=100),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated career fields to include (default: all)")
+):
     """
-    Get top 5 career recommendations based on user profile.
+    Get top career recommendations based on user profile (top 5 by default).
     
     Uses hybrid recommendation system combining:
     - Content-based filtering (skills, education, interests)
     - Collaborative filtering (similar user patterns)
+    
+    Pass the returned `nextCursor` back as `cursor` to page deeper into
+    the ranked catalog; only the requested page is built. A cursor from
+    before a catalog reload is rejected with 410. Pass `fields` (e.g.
+    `id,title,category`) to trim each embedded career record.
     """
+    snapshot = catalog_store.current
     try:
-        # Initialize recommender with current data
-        recommender = HybridRecommender(careers_data)
+        offset = decode_cursor(cursor, snapshot.version, len(snapshot.careers_data))
+        career_fields = parse_fields(fields)
+    except StaleCursor as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        profile_data = profile.dict()
         
-        # Get recommendations
-        recommendations = recommender.recommend(
-            profile.dict(),
-            top_n=5
+        # Get recommendations (scored together with concurrent requests)
+        recommendations = await result_cache.get_or_compute_async(
+            f"recommendations:{offset}:{limit}{history_key(snapshot, profile_data)}",
+            profile_data,
+            lambda: recommendation_batcher.submit((recommender_ref(snapshot), profile_data, offset, limit)),
+            catalog_version=snapshot.version
         )
         
-        return RecommendationResponse(
-            success=True,
-            recommendations=recommendations
-        )
+        total = len(snapshot.careers_data)
+        
+        return recommendations_response(snapshot, {
+            "success": True,
+            "recommendations": None,
+            "total": total,
+            "nextCursor": next_cursor(offset, limit, total, snapshot.version),
+            "catalogVersion": snapshot.version,
+            "message": None
+        }, career_fields, recommendations=recommendations)
     
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Recommendation generation failed: {str(e)}"
         )
 
+@app.post("/api/ml/recommendations/batch", response_model=BatchRecommendationResponse)
+async def get_batch_recommendations(
+    request: BatchRecommendationRequest,
+    fields: Optional[str] = Query(None, description="Comma-separated career fields to include (default: all)")
+):
+    """
+    Get top career recommendations for many profiles in one call.
+    
+    Intended for offline re-ranking jobs: all profiles are scored against
+    the catalog as one matrix, and each result list matches what
+    /api/ml/recommendations returns for that profile.
+    """
+    try:
+        career_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        snapshot = catalog_store.current
+        start = time.perf_counter()
+        
+        ref = recommender_ref(snapshot)
+        
+        # One matrix pass on the scoring pool (items share a snapshot, so they form one group)
+        results = await scoring_executor.run(
+            score_recommendation_batch,
+            [(ref, profile.dict(), 0, request.topN) for profile in request.profiles]
+        )
+        
+        elapsed = time.perf_counter() - start
+        
+        return recommendations_response(snapshot, {
+            "success": True,
+            "results": None,
+            "count": len(results),
+            "elapsedMs": round(elapsed * 1000, 2),
+            "profilesPerSecond": round(len(results) / elapsed, 1) if elapsed > 0 else 0.0,
+            "catalogVersion": snapshot.version,
+            "message": None
+        }, career_fields, results=results)
+    
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch recommendation generation failed: {str(e)}"
+        )
+
+@app.post("/api/ml/score/stream", response_class=NDJSONStreamResponse)
+async def score_stream(
+    request: Request,
+    limit: int = Query(5, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated career fields to include (default: all)")
+):
+    """
+    Bulk-score a streamed NDJSON body of UserProfile records.
+    
+    Streams back one NDJSON line per input record, in input order:
+    `{"line", "success": true, "recommendations", "placement"}`, or
+    `{"line", "success": false, "errors"}` for records that fail to parse
+    or validate (the stream carries on). A final `{"done": true, ...}`
+    line summarizes the run. Records are parsed, scored and written
+    ML_STREAM_CHUNK_SIZE at a time, so memory stays flat for any upload size.
+    """
+    try:
+        career_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    snapshot = catalog_store.current
+    
+    async def generate():
+        ref = recommender_ref(snapshot)
+        counts = {"records": 0, "failed": 0}
+        start = time.perf_counter()
+        
+        try:
+            async for batch in iter_records(request.stream(), STREAM_CHUNK_SIZE):
+                # Validation runs on the pool with the scoring, never on the event loop
+                scored = await run_scoring(score_stream_chunk, ref, batch, limit)
+                
+                output = []
+                for line_no, errors, page, placement in scored:
+                    counts["records"] += 1
+                    if errors is not None:
+                        counts["failed"] += 1
+                        output.append(render_object({"line": line_no, "success": False, "errors": errors}, {}))
+                        continue
+                    
+                    output.append(render_object(
+                        {"line": line_no, "success": True, "recommendations": None, "placement": placement},
+                        {"recommendations": render_recommendations(page, snapshot.fragments, career_fields)}
+                    ))
+                yield b'\n'.join(output) + b'\n'
+        
+        except ClientDisconnect:
+            return
+        except Exception as e:
+            # Headers are already sent: report the failure as the last line
+            yield render_object({"done": False, **counts, "error": f"Scoring failed: {e}"}, {}) + b'\n'
+            return
+        
+        elapsed = time.perf_counter() - start
+        yield render_object({
+            "done": True,
+            **counts,
+            "elapsedMs": round(elapsed * 1000, 2),
+            "recordsPerSecond": round(counts["records"] / elapsed, 1) if elapsed > 0 else 0.0,
+            "catalogVersion": snapshot.version
+        }, {}) + b'\n'
+    
+    return NDJSONStreamResponse(generate())
+
 @app.post("/api/ml/placement-probability", response_model=PlacementPredictionResponse)
 async def predict_placement(profile: UserProfile):
     """
@@ -144,62 +610,529 @@ async def predict_placement(profile: UserProfile):
     - Improvement suggestions
     """
     try:
-        prediction = placement_predictor.predict_probability(profile.dict())
+        snapshot = catalog_store.current
+        profile_data = profile.dict()
+        prediction = await result_cache.get_or_compute_async(
+            "placement",
+            profile_data,
+            lambda: placement_batcher.submit(profile_data),
+            catalog_version=snapshot.version
+        )
         
         return PlacementPredictionResponse(
             success=True,
-            prediction=prediction
+            prediction=prediction,
+            catalogVersion=snapshot.version
         )
     
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Placement prediction failed: {str(e)}"
         )
 
+@app.post("/api/ml/placement-probability/batch", response_model=BatchPlacementResponse)
+async def predict_placement_batch(request: BatchPlacementRequest):
+    """
+    Predict placement probability for a cohort of profiles in one call.
+    
+    Intended for cohort dashboards: probabilities for all profiles are
+    computed in one vectorized pass, and each prediction matches what
+    /api/ml/placement-probability returns for that profile.
+    """
+    try:
+        start = time.perf_counter()
+        
+        predictions = await scoring_executor.run(
+            score_placement_batch,
+            [profile.dict() for profile in request.profiles]
+        )
+        
+        elapsed = time.perf_counter() - start
+        
+        return BatchPlacementResponse(
+            success=True,
+            predictions=predictions,
+            count=len(predictions),
+            elapsedMs=round(elapsed * 1000, 2),
+            profilesPerSecond=round(len(predictions) / elapsed, 1) if elapsed > 0 else 0.0
+        )
+    
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Batch placement prediction failed: {str(e)}"
+        )
+
 @app.post("/api/ml/analyze-profile")
 async def analyze_profile(profile: UserProfile):
     """
     Comprehensive profile analysis combining recommendations and placement prediction.
+    
+    Recommendations and placement are scored concurrently on the scoring
+    pool (each batched with other in-flight requests).
     """
     try:
-        # Get recommendations
-        recommender = HybridRecommender(careers_data)
-        recommendations = recommender.recommend(profile.dict(), top_n=5)
-        
-        # Get placement prediction
-        placement = placement_predictor.predict_probability(profile.dict())
+        snapshot = catalog_store.current
+        profile_data = profile.dict()
+        analysis = await result_cache.get_or_compute_async(
+            f"analyze-profile{history_key(snapshot, profile_data)}",
+            profile_data,
+            lambda: analyze_profile_async(profile_data, recommender_ref(snapshot)),
+            catalog_version=snapshot.version
+        )
         
-        return {
-            "success": True,
-            "recommendations": recommendations,
-            "placement": placement,
-            "profileStrength": calculate_profile_strength(profile.dict())
-        }
+        return {**analysis, "catalogVersion": snapshot.version}
     
+    except Overloaded:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Profile analysis failed: {str(e)}"
         )
 
+@app.post("/api/ml/skill-gap")
+async def skill_gap(
+    profile: UserProfile,
+    k: int = Query(10, ge=1, le=50, description="Top careers the match gain is measured over"),
+    pool: int = Query(50, ge=1, le=200, description="Top careers whose missing skills are evaluated")
+):
+    """
+    Skill gap ROI: the measured effect of each skill or improvement the user could add.
+    
+    Every skill the user lacks among their top `pool` careers, and each
+    profile improvement (portfolio, certification, projects, experience),
+    is evaluated as a counterfactual profile. Reports the change in hybrid
+    match over the current top `k` careers and in placement probability,
+    with all counterfactuals scored in one batched pass.
+    """
+    try:
+        snapshot = catalog_store.current
+        profile_data = profile.dict()
+        analysis = await result_cache.get_or_compute_async(
+            f"skill-gap:{k}:{pool}{history_key(snapshot, profile_data)}",
+            profile_data,
+            lambda: scoring_executor.run(analyze_skill_gap, recommender_ref(snapshot), profile_data, k, pool),
+            catalog_version=snapshot.version
+        )
+        
+        return {"success": True, **analysis, "catalogVersion": snapshot.version}
+    
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Skill gap analysis failed: {str(e)}"
+        )
+
+@app.post("/api/ml/sessions", response_model=SessionResponse)
+async def create_session(
+    profile: UserProfile,
+    limit: int = Query(5, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated career fields to include (default: all)")
+):
+    """
+    Start an incremental scoring session for a profile that is being edited.
+    
+    Scores the whole catalog once and keeps the per-career components
+    under the returned `sessionId`. Send later edits to
+    PATCH /api/ml/sessions/{sessionId} as deltas: only the careers they
+    affect are rescored, and results match /api/ml/recommendations with
+    exact retrieval.
+    """
+    try:
+        career_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    snapshot = catalog_store.current
+    try:
+        session, recommendations = await scoring_executor.run_local(
+            start_session, snapshot.recommender, profile.dict(), limit
+        )
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Session scoring failed: {str(e)}")
+    
+    session_id = session_store.add(session)
+    return session_response(snapshot, session_id, session, recommendations, career_fields)
+
+@app.patch("/api/ml/sessions/{session_id}", response_model=SessionResponse)
+async def update_session(
+    session_id: str,
+    delta: ProfileDelta,
+    limit: int = Query(5, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated career fields to include (default: all)")
+):
+    """
+    Apply profile changes to a scoring session and return its updated recommendations.
+    
+    Returns 404 once the session has expired or been evicted; start a new
+    one with POST /api/ml/sessions.
+    """
+    try:
+        career_fields = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    session = session_store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired session")
+    
+    snapshot = catalog_store.current
+    try:
+        recommendations = await scoring_executor.run_local(
+            rescore_session, session, snapshot.recommender, delta, limit
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=[
+            {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+            for error in e.errors()
+        ])
+    except Overloaded:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Session scoring failed: {str(e)}")
+    
+    # A catalog swap may have resized the session
+    session_store.put(session_id, session)
+    return session_response(snapshot, session_id, session, recommendations, career_fields)
+
+@app.delete("/api/ml/sessions/{session_id}")
+async def delete_session(session_id: str):
+    """End a scoring session and free its memory"""
+    return {
+        "success": True,
+        "deleted": session_store.delete(session_id)
+    }
+
+@app.post("/api/ml/interactions")
+async def record_interactions(request: InteractionsRequest):
+    """
+    Log user interactions (views, saves, plan starts) for collaborative filtering.
+    
+    Events are appended to the ML_INTERACTIONS_PATH log and folded into
+    this worker's model right away; other workers pick them up from the log
+    within ML_INTERACTIONS_REFRESH_SECONDS. Recommendations for profiles
+    with a matching userId then blend in careers similar to the ones the
+    user engaged with.
+    """
+    model = catalog_store.current.recommender.collaborative
+    if model is None:
+        raise HTTPException(status_code=403, detail="Interaction logging is disabled (ML_INTERACTIONS_PATH not set)")
+    
+    now = time.time()
+    events = [{**event.dict(), "ts": event.ts or now} for event in request.events]
+    try:
+        await scoring_executor.run_local(log_interactions, model, events)
+    except Overloaded:
+        raise
+    except OSError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to log interactions: {e}")
+    
+    return {
+        "success": True,
+        "recorded": len(events),
+        "collaborative": model.get_stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """
+    Prometheus metrics (text exposition format).
+    
+    Request counts, 5xx errors, per-endpoint and per-stage latency
+    histograms, catalog size, cache hit ratio and scoring pool queue depth.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/ml/cache/stats")
+async def cache_stats():
+    """Result cache hit/miss counters"""
+    return {
+        "success": True,
+        "cache": result_cache.get_stats()
+    }
+
+@app.get("/api/ml/sessions/stats")
+async def sessions_stats():
+    """Scoring session counters (created, evicted, expired) and memory held"""
+    return {
+        "success": True,
+        "sessions": session_store.get_stats()
+    }
+
+@app.get("/api/ml/batching/stats")
+async def batching_stats():
+    """Micro-batching counters (batches flushed, items, mean/max batch size) and scoring pool load"""
+    return {
+        "success": True,
+        "recommendations": recommendation_batcher.get_stats(),
+        "placement": placement_batcher.get_stats(),
+        "executor": scoring_executor.get_stats()
+    }
+
+@app.post("/api/ml/admin/reload-catalog", status_code=202)
+async def reload_catalog(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload the careers catalog in the background.
+    
+    Requires the X-Admin-Token header to match ML_ADMIN_TOKEN. The new
+    snapshot is built off to the side and swapped in atomically; poll
+    /health for the new catalogVersion.
+    """
+    admin_token = os.getenv('ML_ADMIN_TOKEN')
+    if not admin_token:
+        raise HTTPException(status_code=403, detail="Catalog reload is disabled (ML_ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    
+    catalog_store.reload_in_background()
+    
+    return {
+        "success": True,
+        "message": "Catalog reload started",
+        "catalogVersion": catalog_store.current.version
+    }
+
 # ===== Helper Functions =====
 
-def calculate_profile_strength(profile: Dict) -> Dict:
+def validate_stream_record(record) -> Union[Dict, List[Dict]]:
+    """A streamed record as a validated profile dict, or its list of errors"""
+    if isinstance(record, Exception):
+        return [{"loc": [], "msg": str(record), "type": "json_invalid"}]
+    if not isinstance(record, dict):
+        return [{"loc": [], "msg": "Record must be a JSON object", "type": "model_type"}]
+    
+    try:
+        return UserProfile(**record).dict()
+    except ValidationError as e:
+        return [
+            {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+            for error in e.errors()
+        ]
+
+def score_stream_chunk(ref, records: List[tuple], limit: int) -> List[tuple]:
+    """
+    Validate and score one chunk of streamed (line number, record) pairs.
+    
+    Runs on the scoring pool. Returns (line number, errors, recommendations,
+    placement) per record, in input order; errors is None for records that
+    validated, and the other two are None for records that didn't.
+    """
+    validated = [(line_no, validate_stream_record(record)) for line_no, record in records]
+    profiles = [v for _, v in validated if isinstance(v, dict)]
+    
+    recommendations, placements = [], []
+    if profiles:
+        recommendations = score_recommendation_batch([(ref, p, 0, limit) for p in profiles])
+        placements = score_placement_batch(profiles)
+    
+    scored = iter(zip(recommendations, placements))
+    return [
+        (line_no, None, *next(scored)) if isinstance(v, dict) else (line_no, v, None, None)
+        for line_no, v in validated
+    ]
+
+async def run_scoring(fn, *args):
+    """
+    Run a scoring function on the pool, waiting for room instead of failing.
+    
+    For streams that have already started responding and can no longer
+    turn into a 503.
+    """
+    while True:
+        try:
+            return await scoring_executor.run(fn, *args)
+        except Overloaded as e:
+            await asyncio.sleep(min(e.retry_after, 1))
+
+def history_key(snapshot, profile: Dict) -> str:
+    """Cache namespace suffix that changes whenever the user's interaction history does"""
+    model = snapshot.recommender.collaborative
+    if model is None or profile.get('userId') is None:
+        return ""
+    
+    model.maybe_refresh()
+    return f":history={model.user_version(profile['userId'])}"
+
+def recommendations_response(snapshot, envelope: Dict, career_fields: Optional[tuple],
+                             recommendations: List[Dict] = None, results: List[List[Dict]] = None) -> Response:
+    """
+    JSON response with recommendations rendered from cached career fragments.
+    
+    The envelope's "recommendations" (one list) or "results" (one list per
+    profile) placeholder is filled with pre-rendered bytes; everything
+    else is encoded as given. Skips response_model validation, which
+    would re-walk every career record.
+    """
+    start = time.perf_counter()
+    
+    raw = {}
+    if recommendations is not None:
+        raw["recommendations"] = render_recommendations(recommendations, snapshot.fragments, career_fields)
+    if results is not None:
+        raw["results"] = b'[' + b','.join(
+            render_recommendations(page, snapshot.fragments, career_fields) for page in results
+        ) + b']'
+    
+    content = render_object(envelope, raw)
+    metrics.observe_stage('serialization', time.perf_counter() - start)
+    return Response(content=content, media_type="application/json")
+
+def analyze_skill_gap(ref, profile: Dict, top_k: int, pool: int) -> Dict:
+    """Skill gap ROI for a profile, run on the scoring pool (see SkillGapAnalyzer)"""
+    return SkillGapAnalyzer(resolve_recommender(ref), placement_predictor).analyze(profile, top_k=top_k, pool=pool)
+
+def log_interactions(model, events: List[Dict]):
+    """
+    Append events to the interaction log and fold them into this worker's model.
+    
+    Both are blocking (file I/O, then CPU work), so this runs on a thread of
+    the scoring pool rather than the event loop; one task, so an overloaded
+    pool rejects the request before anything is logged.
+    """
+    model.log.append(events)
+    model.refresh(True)
+
+def start_session(recommender: HybridRecommender, profile: Dict, limit: int):
+    """A new scoring session for a profile, and its first page of recommendations"""
+    session = ScoringSession(recommender, profile)
+    return session, session.recommend(top_n=limit)
+
+def rescore_session(session: ScoringSession, recommender: HybridRecommender, delta: ProfileDelta,
+                    limit: int) -> List[Dict]:
+    """
+    Apply a delta to a session and return its first page of recommendations.
+    
+    The delta is applied to the session's current profile under its lock,
+    so concurrent edits build on each other instead of overwriting.
+    Raises ValidationError when the edited profile is invalid.
+    """
+    with session.lock:
+        profile = UserProfile(**apply_profile_delta(session.profile, delta)).dict()
+        session.update(recommender, profile)
+        return session.recommend(top_n=limit)
+
+def apply_profile_delta(profile: Dict, delta: ProfileDelta) -> Dict:
+    """A session's profile with a delta's changes applied"""
+    updated = {**profile, **delta.updates}
+    
+    for field, added, removed in (('skills', delta.addSkills, delta.removeSkills),
+                                  ('interests', delta.addInterests, delta.removeInterests)):
+        dropped = {value.lower() for value in removed}
+        values = [value for value in updated.get(field, []) if value.lower() not in dropped]
+        present = {value.lower() for value in values}
+        for value in added:
+            if value.lower() not in present:
+                present.add(value.lower())
+                values.append(value)
+        updated[field] = values
+    
+    for field in ('educationLevel', 'fieldOfStudy', 'targetIndustries'):
+        value = getattr(delta, field)
+        if value is not None:
+            updated[field] = value
+    return updated
+
+def session_response(snapshot, session_id: str, session: ScoringSession, recommendations: List[Dict],
+                     career_fields: Optional[tuple]) -> Response:
+    """JSON response for a scoring session's recommendations (see recommendations_response)"""
+    return recommendations_response(snapshot, {
+        "success": True,
+        "sessionId": session_id,
+        "recommendations": None,
+        "total": len(snapshot.careers_data),
+        "rescoredCareers": session.rescored,
+        "catalogVersion": snapshot.version,
+        "message": None
+    }, career_fields, recommendations=recommendations)
+
+# Representative onboarding profile used to warm up every scoring path
+WARM_UP_PROFILE = {
+    "educationLevel": "Undergraduate",
+    "fieldOfStudy": "Computer Science",
+    "currentStatus": "Student",
+    "experienceLevel": "beginner",
+    "skills": ["Python", "React", "SQL"],
+    "interests": ["Coding", "Problem Solving"],
+    "primaryObjectives": ["Get a job"],
+    "preferredDomains": ["Technology"],
+    "learningStyle": "hands-on",
+    "timeCommitment": "10–20 hours",
+    "yearsExperience": 1,
+    "targetIndustries": ["Technology & Software"],
+    "careerTimeline": "1year",
+    "workStyle": "collaborative",
+    "learningPace": "fast"
+}
+
+def warm_up():
+    """Run one pass through validation and every scoring path"""
+    profile = UserProfile(**WARM_UP_PROFILE).dict()
+    recommender = catalog_store.current.recommender
+    
+    build_profile_analysis(profile, recommender)
+    recommender.recommend_batch([profile], top_n=5)
+
+async def analyze_profile_async(profile: Dict, ref) -> Dict:
+    """build_profile_analysis() with recommendations and placement scored concurrently"""
+    # Preprocess the profile once for all three consumers (process workers get a pickled copy)
+    context = ProfileContext(profile)
+    
+    recommendations, placement = await asyncio.gather(
+        recommendation_batcher.submit((ref, context, 0, 5)),
+        placement_batcher.submit(context)
+    )
+    
+    return {
+        "success": True,
+        "recommendations": recommendations,
+        "placement": placement,
+        "profileStrength": calculate_profile_strength(context)
+    }
+
+def build_profile_analysis(profile: Dict, recommender: HybridRecommender) -> Dict:
+    """Combine recommendations, placement prediction and profile strength"""
+    # Preprocess the profile once for all three consumers
+    context = ProfileContext(profile)
+    
+    # Get recommendations
+    recommendations = recommender.recommend(context, top_n=5)
+    
+    # Get placement prediction
+    placement = placement_predictor.predict_probability(context)
+    
+    return {
+        "success": True,
+        "recommendations": recommendations,
+        "placement": placement,
+        "profileStrength": calculate_profile_strength(context)
+    }
+
+def calculate_profile_strength(profile: Union[Dict, ProfileContext]) -> Dict:
     """Calculate overall profile strength score"""
+    context = ProfileContext.of(profile)
     score = 0
     max_score = 100
     
     # Skills (30 points)
-    if len(profile.get('skills', [])) >= 5:
+    if context.skill_count >= 5:
         score += 30
-    elif len(profile.get('skills', [])) >= 3:
+    elif context.skill_count >= 3:
         score += 20
     else:
         score += 10
     
     # Experience (25 points)
-    years = profile.get('yearsExperience', 0)
+    years = context.years_experience
     if years >= 3:
         score += 25
     elif years >= 1:
@@ -215,18 +1148,18 @@ def calculate_profile_strength(profile: Dict) -> Dict:
         'Diploma': 12,
         'High School': 8
     }
-    score += edu_scores.get(profile.get('educationLevel', ''), 10)
+    score += edu_scores.get(context.education_level, 10)
     
     # Clarity of goals (15 points)
-    if profile.get('careerTimeline') and profile.get('targetIndustries'):
+    if context.career_timeline and context.industries:
         score += 15
-    elif profile.get('primaryObjectives'):
+    elif context.get('primaryObjectives'):
         score += 10
     else:
         score += 5
     
     # Completeness (10 points)
-    if profile.get('workStyle') and profile.get('learningPace'):
+    if context.work_style and context.learning_pace:
         score += 10
     else:
         score += 5
@@ -235,9 +1168,9 @@ def calculate_profile_strength(profile: Dict) -> Dict:
         "score": min(score, max_score),
         "level": "Strong" if score >= 75 else "Good" if score >= 50 else "Developing",
         "breakdown": {
-            "skills": len(profile.get('skills', [])),
+            "skills": context.skill_count,
             "experience": years,
-            "education": profile.get('educationLevel', 'Unknown')
+            "education": context.get('educationLevel', 'Unknown')
         }
     }
 
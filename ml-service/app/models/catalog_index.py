@@ -0,0 +1,666 @@
+"""
+Catalog Scoring Index
+Compiles the careers catalog into sparse matrices for vectorized scoring
+"""
+
+import time
+
+import numpy as np
+from scipy import sparse
+from typing import List, Dict, Iterable, Tuple, Union
+
+from .lookup_tables import CategoricalTables, distinct_rows
+from .profile_context import EDU_HIERARCHY, ProfileContext
+from .vocabulary import BitsetRows, TermVocabulary
+from ..utils.metrics import metrics
+from ..utils.serialization import CareerRecord
+
+def build_binary_matrix(rows: List[Iterable], vocab: Dict = None) -> Tuple[sparse.csr_matrix, Dict]:
+    """
+    Build a sparse binary (rows x terms) matrix from per-row term collections.
+
+    Terms are assigned column IDs in order of first appearance unless a
+    vocabulary is supplied. Duplicate terms in a row are counted once.
+    """
+    vocab = {} if vocab is None else vocab
+    indptr = [0]
+    indices = []
+
+    for terms in rows:
+        row_ids = set()
+        for term in terms:
+            term_id = vocab.get(term)
+            if term_id is None:
+                term_id = len(vocab)
+                vocab[term] = term_id
+            row_ids.add(term_id)
+        indices.extend(sorted(row_ids))
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(rows), len(vocab))
+    )
+    return matrix, vocab
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Equivalent to a stable descending sort truncated to k (ties keep the
+    lower index first), but uses argpartition-style selection so only the
+    entries tied with or above the k-th score get sorted.
+    """
+    n = len(scores)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+
+    kth_score = np.partition(scores, n - k)[n - k]
+    candidates = np.flatnonzero(scores >= kth_score)
+    order = np.argsort(-scores[candidates], kind='stable')[:k]
+    return candidates[order]
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Row-wise top_k_indices for a (profiles x careers) score matrix.
+
+    Uses one argpartition over the whole matrix; only rows whose k-th score
+    is tied with careers left outside the partition are re-selected, so
+    ties still go to the lower career index.
+    """
+    n_rows, n = scores.shape
+    if k <= 0:
+        return np.empty((n_rows, 0), dtype=np.int64)
+    if k >= n:
+        return np.argsort(-scores, axis=1, kind='stable')
+
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top.sort(axis=1)
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+
+    # Rows where the partition had to break a tie at the k-th score
+    kth_scores = np.take_along_axis(scores, top[:, -1:], axis=1)
+    tied_total = (scores == kth_scores).sum(axis=1)
+    tied_kept = (np.take_along_axis(scores, top, axis=1) == kth_scores).sum(axis=1)
+    for row in np.flatnonzero(tied_total > tied_kept):
+        top[row] = top_k_indices(scores[row], k)
+
+    return top
+
+def _known_ids(vocab: Dict, terms: Iterable) -> np.ndarray:
+    """Sorted vocabulary IDs of the terms that appear in the vocabulary"""
+    return np.array(sorted(vocab[t] for t in terms if t in vocab), dtype=np.int64)
+
+def _id_matrix(id_lists: List[np.ndarray], n_terms: int) -> sparse.csr_matrix:
+    """Sparse binary (profiles x terms) matrix from per-profile term IDs"""
+    indptr = np.zeros(len(id_lists) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(ids) for ids in id_lists])
+    indices = np.concatenate(id_lists) if id_lists else np.empty(0, dtype=np.int64)
+    return sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), indices, indptr),
+        shape=(len(id_lists), n_terms)
+    )
+
+def _take(values, rows: np.ndarray):
+    """Restrict an array or sparse matrix to the given career rows"""
+    return values if rows is None else values[rows]
+
+class CatalogIndex:
+    """
+    Precompiled scoring structures for a careers catalog.
+
+    Built once per catalog:
+    - Canonical skill / interest vocabularies (see TermVocabulary)
+    - Binary career x skill / interest / industry matrices
+    - Packed skill / interest bitsets per career, for per-career lookups
+    - Codes into the distinct education levels, field sets, experience
+      ranges and work-style sets, scored through CategoricalTables
+
+    Scores a profile against every career in a handful of matrix ops and
+    reproduces HybridRecommender's per-career scores exactly.
+
+    Postings lists (term -> careers) back an exact pruned top-k search, so
+    only careers sharing a skill or interest with the profile are scored
+    unless the rest of the catalog could still reach the top k.
+
+    With a CollaborativeModel attached (collaborative), a user's
+    interaction history is blended into the collaborative component; its
+    scores are sparse, so they join the pruned search as extra candidates.
+    """
+
+    # Cap on profiles x careers cells materialized per batch scoring chunk
+    BATCH_CELLS = 4_000_000
+
+    # Slack on bound comparisons so float rounding never prunes a true top-k career
+    BOUND_EPSILON = 1e-9
+
+    # Compiled state, as persisted by the catalog artifact (see utils.catalog_artifact)
+    MATRIX_FIELDS = ('skill_matrix', 'interest_matrix', 'industry_matrix', 'field_set_matrix',
+                     'style_set_matrix', 'skill_postings', 'interest_postings')
+    ARRAY_FIELDS = ('skill_counts', 'interest_counts', 'industry_counts',
+                    'edu_values', 'edu_codes', 'exp_ranges', 'exp_codes', 'field_codes', 'style_codes',
+                    'skill_bit_indptr', 'skill_bit_words', 'skill_bit_masks',
+                    'interest_bit_indptr', 'interest_bit_words', 'interest_bit_masks')
+    VOCAB_FIELDS = ('skill_vocab', 'interest_vocab', 'industry_vocab', 'work_style_vocab', 'field_vocab')
+
+    def __init__(self, careers_data: List[Dict]):
+        self.careers_data = careers_data
+        self.size = len(careers_data)
+
+        education = [career.get('requiredEducation', {}) for career in careers_data]
+
+        # Skills and interests are matched by canonical term (case, spelling variants and aliases folded)
+        self.skill_vocabulary = TermVocabulary()
+        self.skill_vocabulary.add_all(s for career in careers_data for s in career.get('requiredSkills', []))
+        self.skill_matrix, self.skill_vocab = build_binary_matrix(
+            [[self.skill_vocabulary.canonical(s) for s in career.get('requiredSkills', [])] for career in careers_data],
+            vocab=self.skill_vocabulary.ids
+        )
+        self.interest_vocabulary = TermVocabulary()
+        self.interest_vocabulary.add_all(i for career in careers_data for i in career.get('relatedInterests', []))
+        self.interest_matrix, self.interest_vocab = build_binary_matrix(
+            [[self.interest_vocabulary.canonical(i) for i in career.get('relatedInterests', [])] for career in careers_data],
+            vocab=self.interest_vocabulary.ids
+        )
+
+        # Industries are matched as-is
+        self.industry_matrix, self.industry_vocab = build_binary_matrix(
+            [career.get('industries', []) for career in careers_data]
+        )
+
+        # Work styles and fields are categorical: each career keeps the code of its distinct set
+        work_style_matrix, self.work_style_vocab = build_binary_matrix(
+            [career.get('suitableWorkStyles', []) for career in careers_data]
+        )
+        self.style_set_matrix, self.style_codes = distinct_rows(work_style_matrix)
+
+        # Fields use substring matching, resolved per field of study over the vocabulary
+        field_matrix, self.field_vocab = build_binary_matrix(
+            [[f.lower() for f in edu.get('fields', [])] for edu in education]
+        )
+        self.field_set_matrix, self.field_codes = distinct_rows(field_matrix)
+        self.field_terms = list(self.field_vocab)
+
+        # Per-career row sizes (distinct terms)
+        self.skill_counts = np.diff(self.skill_matrix.indptr).astype(np.float64)
+        self.interest_counts = np.diff(self.interest_matrix.indptr).astype(np.float64)
+        self.industry_counts = np.diff(self.industry_matrix.indptr)
+
+        # Postings lists: column j of the CSC form lists the careers holding term j
+        self.skill_postings = self.skill_matrix.tocsc()
+        self.interest_postings = self.interest_matrix.tocsc()
+
+        # Packed bitsets of each career's skills and interests
+        skill_bits = BitsetRows.from_matrix(self.skill_matrix)
+        self.skill_bit_indptr, self.skill_bit_words, self.skill_bit_masks = (
+            skill_bits.indptr, skill_bits.words, skill_bits.masks
+        )
+        interest_bits = BitsetRows.from_matrix(self.interest_matrix)
+        self.interest_bit_indptr, self.interest_bit_words, self.interest_bit_masks = (
+            interest_bits.indptr, interest_bits.words, interest_bits.masks
+        )
+
+        # Required education levels and experience ranges, as codes into their distinct values
+        edu_levels = np.array(
+            [EDU_HIERARCHY.get(edu.get('level', '').lower(), 0) for edu in education],
+            dtype=np.int64
+        )
+        self.edu_values, edu_codes = np.unique(edu_levels, return_inverse=True)
+        self.edu_codes = edu_codes.reshape(-1).astype(np.int32)
+        experience = [career.get('experienceRange', {}) for career in careers_data]
+        exp_ranges = np.array(
+            [(exp.get('min', 0), exp.get('max', 50)) for exp in experience], dtype=np.float64
+        ).reshape(-1, 2)
+        self.exp_ranges, exp_codes = np.unique(exp_ranges, axis=0, return_inverse=True)
+        self.exp_codes = exp_codes.reshape(-1).astype(np.int32)
+        self.style_codes = self.style_codes.astype(np.int32)
+        self.field_codes = self.field_codes.astype(np.int32)
+
+        # Interaction-based collaborative filtering, attached by HybridRecommender
+        self.collaborative = None
+        self._attach_lookups()
+
+    @classmethod
+    def from_compiled(cls, careers_data: List[Dict], matrices: Dict, arrays: Dict, vocabs: Dict) -> 'CatalogIndex':
+        """
+        Rebuild an index from previously compiled state without re-reading the catalog.
+
+        Takes the MATRIX_FIELDS, ARRAY_FIELDS and VOCAB_FIELDS values (vocabs
+        as term lists in ID order). Arrays may be read-only memory maps.
+        """
+        index = cls.__new__(cls)
+        index.careers_data = careers_data
+        index.size = len(careers_data)
+
+        for name in cls.MATRIX_FIELDS:
+            setattr(index, name, matrices[name])
+        for name in cls.ARRAY_FIELDS:
+            setattr(index, name, arrays[name])
+        for name in cls.VOCAB_FIELDS:
+            setattr(index, name, {term: term_id for term_id, term in enumerate(vocabs[name])})
+
+        # Compiled vocabularies are already canonical; rebuilding them restores alias and fuzzy lookup
+        index.skill_vocabulary = TermVocabulary(vocabs['skill_vocab'])
+        index.interest_vocabulary = TermVocabulary(vocabs['interest_vocab'])
+        index.skill_vocab = index.skill_vocabulary.ids
+        index.interest_vocab = index.interest_vocabulary.ids
+
+        index.field_terms = list(vocabs['field_vocab'])
+        index.collaborative = None
+        index._attach_lookups()
+        return index
+
+    def _attach_lookups(self):
+        """Views over the compiled state: bitset rows and the categorical score tables"""
+        self.skill_bits = BitsetRows(self.skill_bit_indptr, self.skill_bit_words, self.skill_bit_masks)
+        self.interest_bits = BitsetRows(self.interest_bit_indptr, self.interest_bit_words, self.interest_bit_masks)
+        self.tables = CategoricalTables(
+            self.edu_values, self.exp_ranges, self.field_set_matrix, self.field_terms,
+            self.style_set_matrix, self.work_style_vocab, int(self.skill_counts.max(initial=0))
+        )
+        self._positions = None
+        self._code_groups = {}
+        self._industry_postings = None
+
+    def position(self, career: Dict):
+        """Row of a career object in this catalog, or None if it came from elsewhere"""
+        if isinstance(career, CareerRecord):
+            return career.position if career.catalog is self.careers_data else None
+
+        if self._positions is None:
+            # In-memory catalogs hand out the same dicts every time, so identity finds them
+            self._positions = {id(c): i for i, c in enumerate(self.careers_data)}
+        position = self._positions.get(id(career))
+        if position is None or self.careers_data[position] is not career:
+            return None
+        return position
+
+    def careers_with_codes(self, name: str, values: np.ndarray) -> np.ndarray:
+        """
+        Sorted careers whose code is one of the given values.
+
+        name is one of the code arrays ('edu_codes', 'field_codes',
+        'exp_codes', 'style_codes'); careers are grouped by code on first use.
+        """
+        groups = self._code_groups.get(name)
+        if groups is None:
+            codes = getattr(self, name)
+            offsets = np.zeros(int(codes.max(initial=-1)) + 2, dtype=np.int64)
+            offsets[1:] = np.cumsum(np.bincount(codes, minlength=len(offsets) - 1))
+            groups = self._code_groups[name] = (np.argsort(codes, kind='stable'), offsets)
+
+        order, offsets = groups
+        if not len(values):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([order[offsets[v]:offsets[v + 1]] for v in values.tolist()]))
+
+    def industry_careers(self, industry_ids: np.ndarray) -> np.ndarray:
+        """Sorted careers holding any of the given industries"""
+        if self._industry_postings is None:
+            self._industry_postings = self.industry_matrix.tocsc()
+        return self._postings_overlap(self._industry_postings, industry_ids)[0]
+
+    def profile_terms(self, context: ProfileContext) -> Dict:
+        """
+        A profile's integer term IDs in this catalog's vocabularies.
+
+        Skills and interests resolve through the canonical vocabularies
+        (aliases, spelling variants and typos included) and also come as
+        packed bitsets ('skill_bits', 'interest_bits'). The profile's rows of
+        the categorical score tables ('edu_row', 'field_row', 'exp_row',
+        'style_row') come along. Encoded once per (profile, catalog) and
+        cached on the context, along with the user's collaborative scores
+        ('history': see CollaborativeModel.user_scores; None without history).
+        """
+        terms = context.catalog_terms.get(self)
+        if terms is None:
+            skills = self.skill_vocabulary.encode(context.skill_set)
+            interests = self.interest_vocabulary.encode(context.interest_set)
+            terms = {
+                'skills': skills,
+                'interests': interests,
+                'skill_bits': self.skill_vocabulary.bitset(skills),
+                'interest_bits': self.interest_vocabulary.bitset(interests),
+                'industries': _known_ids(self.industry_vocab, context.industries),
+                'edu_row': self.tables.edu_row(context),
+                'field_row': self.tables.field_row(context),
+                'exp_row': self.tables.exp_row(context),
+                'style_row': self.tables.style_row(context),
+                'history': (
+                    self.collaborative.user_scores(context.user_id)
+                    if self.collaborative is not None and context.user_id is not None else None
+                )
+            }
+            context.catalog_terms[self] = terms
+        return terms
+
+    def _term_vector(self, vocab: Dict, term_ids: np.ndarray) -> np.ndarray:
+        """Binary indicator vector over a vocabulary"""
+        vector = np.zeros(len(vocab), dtype=np.float64)
+        vector[term_ids] = 1.0
+        return vector
+
+    def _blend_history(self, scores: np.ndarray, history, rows: np.ndarray = None) -> np.ndarray:
+        """Heuristic collaborative scores blended with the user's interaction-based scores"""
+        if history is None:
+            return scores
+
+        indices, values, blend = history
+        scores = (1 - blend) * scores
+        if rows is None:
+            scores[indices] += blend * values
+        elif len(indices):
+            positions = np.minimum(np.searchsorted(indices, rows), len(indices) - 1)
+            hits = indices[positions] == rows
+            scores[hits] += blend * values[positions[hits]]
+        return scores
+
+    def _overlap_ratio(self, matrix: sparse.csr_matrix, counts: np.ndarray, user_vector: np.ndarray) -> np.ndarray:
+        """|user & career| / |career| per career, 0 where the career has no terms"""
+        overlap = matrix @ user_vector
+        return np.divide(overlap, counts, out=np.zeros(len(counts)), where=counts > 0)
+
+    def content_scores(self, user_profile: Union[Dict, ProfileContext], rows: np.ndarray = None) -> np.ndarray:
+        """
+        Content-based scores for every career (or only the given rows).
+
+        Mirrors HybridRecommender.content_based_score:
+        - Education match (25%)
+        - Field of study match (20%)
+        - Skills overlap (30%)
+        - Interests alignment (25%)
+
+        Education and field scores are gathered from the profile's lookup
+        table rows (see CategoricalTables).
+        """
+        start = time.perf_counter()
+        context = ProfileContext.of(user_profile)
+        terms = self.profile_terms(context)
+
+        # 1. Education Match (25%)
+        scores = terms['edu_row'][_take(self.edu_codes, rows)]
+
+        # 2. Field Match (20%)
+        scores = scores + terms['field_row'][_take(self.field_codes, rows)]
+
+        # 3. Skills Match (30%)
+        skill_vector = self._term_vector(self.skill_vocab, terms['skills'])
+        scores = scores + 0.30 * self._overlap_ratio(
+            _take(self.skill_matrix, rows), _take(self.skill_counts, rows), skill_vector
+        )
+
+        # 4. Interests Match (25%)
+        interest_vector = self._term_vector(self.interest_vocab, terms['interests'])
+        scores = scores + 0.25 * self._overlap_ratio(
+            _take(self.interest_matrix, rows), _take(self.interest_counts, rows), interest_vector
+        )
+
+        metrics.observe_stage('content', time.perf_counter() - start)
+        return scores
+
+    def collaborative_scores(self, user_profile: Union[Dict, ProfileContext], rows: np.ndarray = None) -> np.ndarray:
+        """
+        Collaborative scores for every career (or only the given rows).
+
+        Mirrors HybridRecommender.collaborative_score:
+        - Industry alignment (40%)
+        - Experience level alignment (30%)
+        - Work style compatibility (30%)
+        - Blended with interaction history, when the user has any
+
+        Experience and work style scores are gathered from the profile's
+        lookup table rows (see CategoricalTables).
+        """
+        start = time.perf_counter()
+        context = ProfileContext.of(user_profile)
+        terms = self.profile_terms(context)
+        scores = np.zeros(self.size if rows is None else len(rows))
+
+        # Industry alignment (40%)
+        user_industries = context.industries
+        if user_industries:
+            industry_vector = self._term_vector(self.industry_vocab, terms['industries'])
+            industry_match = (_take(self.industry_matrix, rows) @ industry_vector) / len(user_industries)
+            scores = scores + np.where(_take(self.industry_counts, rows) > 0, 0.40 * industry_match, 0.0)
+
+        # Experience level alignment (30%), under-experience penalty included
+        scores = scores + terms['exp_row'][_take(self.exp_codes, rows)]
+
+        # Work style compatibility (30%)
+        scores = scores + terms['style_row'][_take(self.style_codes, rows)]
+
+        scores = self._blend_history(scores, terms['history'], rows)
+
+        metrics.observe_stage('collaborative', time.perf_counter() - start)
+        return scores
+
+    def score(self, user_profile: Union[Dict, ProfileContext], rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (content, collaborative) score arrays for every career (or the given rows)"""
+        context = ProfileContext.of(user_profile)
+        return self.content_scores(context, rows), self.collaborative_scores(context, rows)
+
+    def score_batch(self, user_profiles: List[Union[Dict, ProfileContext]],
+                    rows: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many profiles at once, against every career (or only the given rows).
+
+        Returns (content, collaborative) score matrices of shape
+        (profiles x careers), equal row by row to score() for each profile.
+        """
+        start = time.perf_counter()
+        contexts = [ProfileContext.of(p) for p in user_profiles]
+        terms = [self.profile_terms(context) for context in contexts]
+
+        n = self.size if rows is None else len(rows)
+        industry_sizes = np.array([len(c.industries) for c in contexts], dtype=np.float64)[:, None]
+
+        skill_users = _id_matrix([t['skills'] for t in terms], len(self.skill_vocab))
+        interest_users = _id_matrix([t['interests'] for t in terms], len(self.interest_vocab))
+        industry_users = _id_matrix([t['industries'] for t in terms], len(self.industry_vocab))
+
+        # Lookup table rows stacked per profile (profiles x distinct values)
+        def table_rows(name: str, width: int) -> np.ndarray:
+            return np.array([t[name] for t in terms], dtype=np.float64).reshape(len(contexts), width)
+
+        # 1. Education Match (25%)
+        content = table_rows('edu_row', len(self.edu_values))[:, _take(self.edu_codes, rows)]
+
+        # 2. Field Match (20%)
+        content = content + table_rows('field_row', self.field_set_matrix.shape[0])[:, _take(self.field_codes, rows)]
+
+        # 3. Skills Match (30%)
+        skill_counts = _take(self.skill_counts, rows)
+        skill_overlap = (skill_users @ _take(self.skill_matrix, rows).T).toarray()
+        content = content + 0.30 * np.divide(
+            skill_overlap, skill_counts, out=np.zeros_like(skill_overlap), where=skill_counts > 0
+        )
+
+        # 4. Interests Match (25%)
+        interest_counts = _take(self.interest_counts, rows)
+        interest_overlap = (interest_users @ _take(self.interest_matrix, rows).T).toarray()
+        content = content + 0.25 * np.divide(
+            interest_overlap, interest_counts, out=np.zeros_like(interest_overlap), where=interest_counts > 0
+        )
+
+        # Shared profile preprocessing is billed to the content stage
+        content_done = time.perf_counter()
+        metrics.observe_stage('content', content_done - start)
+
+        # Industry alignment (40%)
+        industry_match = np.divide(
+            (industry_users @ _take(self.industry_matrix, rows).T).toarray(), industry_sizes,
+            out=np.zeros((len(contexts), n)), where=industry_sizes > 0
+        )
+        collab = np.where((industry_sizes > 0) & (_take(self.industry_counts, rows) > 0), 0.40 * industry_match, 0.0)
+
+        # Experience level alignment (30%), under-experience penalty included
+        collab = collab + table_rows('exp_row', len(self.exp_ranges))[:, _take(self.exp_codes, rows)]
+
+        # Work style compatibility (30%)
+        collab = collab + table_rows('style_row', self.style_set_matrix.shape[0])[:, _take(self.style_codes, rows)]
+
+        # Interaction history, only for the profiles that have any
+        for row, t in enumerate(terms):
+            if t['history'] is not None:
+                collab[row] = self._blend_history(collab[row], t['history'], rows)
+
+        metrics.observe_stage('collaborative', time.perf_counter() - content_done)
+        return content, collab
+
+    def top_k_batch(self, user_profiles: List[Union[Dict, ProfileContext]], k: int, content_weight: float,
+                    collab_weight: float) -> List[Tuple[np.ndarray, ...]]:
+        """
+        Exact top-k careers for many profiles.
+
+        Profiles are scored in chunks of at most BATCH_CELLS score cells;
+        each chunk is one (profiles x careers) matrix pass followed by a
+        row-wise argpartition. Returns one top_k()-style tuple per profile.
+        """
+        results = []
+        chunk_size = max(1, self.BATCH_CELLS // max(self.size, 1))
+
+        for start in range(0, len(user_profiles), chunk_size):
+            content, collab = self.score_batch(user_profiles[start:start + chunk_size])
+            hybrid = content_weight * content + collab_weight * collab
+            top = top_k_rows(hybrid, k)
+
+            for row, indices in enumerate(top):
+                results.append((indices, content[row, indices], collab[row, indices], hybrid[row, indices]))
+
+        return results
+
+    def _postings_overlap(self, postings: sparse.csc_matrix, term_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Walk the postings lists of a user's terms.
+
+        Returns (careers, overlap counts) for careers sharing at least one
+        term, touching only those postings rather than the whole catalog.
+        """
+        if not len(term_ids):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        hits = np.concatenate([
+            postings.indices[postings.indptr[j]:postings.indptr[j + 1]]
+            for j in term_ids
+        ])
+        return np.unique(hits, return_counts=True)
+
+    def _sparse_bounds(self, context: ProfileContext, content_weight: float,
+                       collab_weight: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact hybrid contribution of the skill, interest and interaction history components.
+
+        Returns (candidate careers, their summed contribution). Careers
+        outside the candidate set contribute zero for all three.
+        """
+        terms = self.profile_terms(context)
+        skill_rows, skill_hits = self._postings_overlap(self.skill_postings, terms['skills'])
+        interest_rows, interest_hits = self._postings_overlap(self.interest_postings, terms['interests'])
+        history = terms['history']
+        history_rows = history[0] if history is not None else np.empty(0, dtype=np.int64)
+
+        candidates = np.union1d(np.union1d(skill_rows, interest_rows), history_rows)
+        partial = np.zeros(len(candidates))
+        partial[np.searchsorted(candidates, skill_rows)] += (
+            content_weight * 0.30 * skill_hits / self.skill_counts[skill_rows]
+        )
+        partial[np.searchsorted(candidates, interest_rows)] += (
+            content_weight * 0.25 * interest_hits / self.interest_counts[interest_rows]
+        )
+        if history is not None:
+            partial[np.searchsorted(candidates, history_rows)] += collab_weight * history[2] * history[1]
+
+        return candidates, partial
+
+    def _dense_bound(self, context: ProfileContext, content_weight: float, collab_weight: float) -> float:
+        """
+        Upper bound on what industry, education, field, experience and work
+        style can add to any career's hybrid score for this user.
+
+        Industry postings are long (every career lists a few of a handful of
+        industries), so like stop words in WAND they are bounded rather than
+        walked.
+        """
+        terms = self.profile_terms(context)
+
+        # Lookup table rows span exactly the values careers have, so their maxima are attained
+        edu_bound = terms['edu_row'].max(initial=0.0)
+        field_bound = terms['field_row'].max(initial=0.0)
+        exp_bound = terms['exp_row'].max(initial=0.0)
+        style_bound = terms['style_row'].max(initial=0.0)
+
+        industry_bound = 0.40 if len(terms['industries']) else 0.0
+
+        # Interaction history replaces part of the heuristic component (its own part is exact)
+        heuristic_share = 1 - terms['history'][2] if terms['history'] is not None else 1.0
+
+        return (content_weight * (edu_bound + field_bound)
+                + collab_weight * heuristic_share * (industry_bound + exp_bound + style_bound))
+
+    def categorical_scores(self, user_profile: Union[Dict, ProfileContext], content_weight: float,
+                           collab_weight: float) -> np.ndarray:
+        """Hybrid-weighted education, field, experience and work style score of every career"""
+        terms = self.profile_terms(ProfileContext.of(user_profile))
+        return (content_weight * (terms['edu_row'][self.edu_codes] + terms['field_row'][self.field_codes])
+                + collab_weight * (terms['exp_row'][self.exp_codes] + terms['style_row'][self.style_codes]))
+
+    def top_k_among(self, user_profile: Union[Dict, ProfileContext], rows: np.ndarray, k: int, content_weight: float,
+                    collab_weight: float) -> Tuple[np.ndarray, ...]:
+        """
+        Exact top-k careers by hybrid score among the given (sorted) career rows.
+
+        Used to re-rank an approximate shortlist; returns the same tuple as top_k().
+        """
+        context = ProfileContext.of(user_profile)
+        content_scores, collab_scores = self.score(context, rows)
+        hybrid_scores = content_weight * content_scores + collab_weight * collab_scores
+
+        order = top_k_indices(hybrid_scores, k)
+        return rows[order], content_scores[order], collab_scores[order], hybrid_scores[order]
+
+    def top_k(self, user_profile: Union[Dict, ProfileContext], k: int, content_weight: float, collab_weight: float) -> Tuple[np.ndarray, ...]:
+        """
+        Exact top-k careers by hybrid score, pruning with per-component bounds.
+
+        1. Walk the postings of the user's skills and interests, plus the
+           careers their interaction history scores. Only these candidates
+           get a non-zero skill/interest/history contribution, which is
+           computed exactly; adding the user's dense bound (the most every
+           other component can add) gives each career's upper bound.
+        2. Score the most promising candidates exactly; their k-th best
+           score is the threshold to beat.
+        3. Skip candidates whose upper bound misses the threshold, and every
+           non-candidate when the dense bound alone misses it. Survivors are
+           scored exactly and ranked like a stable full sort.
+
+        Falls back to scoring the whole catalog when the bounds can't rule
+        out non-candidates. Returns (career indices, content, collaborative,
+        hybrid scores), best first.
+        """
+        context = ProfileContext.of(user_profile)
+        rows = None
+
+        if 0 < k < self.size:
+            candidates, partial = self._sparse_bounds(context, content_weight, collab_weight)
+            dense_bound = self._dense_bound(context, content_weight, collab_weight) + self.BOUND_EPSILON
+
+            if len(candidates) >= k:
+                # Seed the threshold from the candidates with the best sparse contribution
+                seeds = candidates[top_k_indices(partial, min(len(candidates), max(4 * k, 64)))]
+                content_scores, collab_scores = self.score(context, seeds)
+                seed_scores = content_weight * content_scores + collab_weight * collab_scores
+                threshold = np.partition(seed_scores, len(seeds) - k)[len(seeds) - k] - self.BOUND_EPSILON
+
+                # Non-candidates can't reach the threshold: score surviving candidates only
+                if dense_bound < threshold:
+                    rows = candidates[partial + dense_bound >= threshold]
+
+        content_scores, collab_scores = self.score(context, rows)
+        hybrid_scores = content_weight * content_scores + collab_weight * collab_scores
+
+        order = top_k_indices(hybrid_scores, k)
+        indices = order if rows is None else rows[order]
+        return indices, content_scores[order], collab_scores[order], hybrid_scores[order]
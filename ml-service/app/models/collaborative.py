@@ -0,0 +1,364 @@
+"""
+Collaborative Filtering
+Item-item similarity over a sparse user x career interaction matrix, folded in incrementally
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Implicit feedback strength per event type
+EVENT_WEIGHTS = {
+    'view': 1.0,
+    'save': 3.0,
+    'plan_start': 5.0
+}
+
+# Co-occurrence entries below this are float residue from incremental updates
+EPSILON = 1e-9
+
+# Similarities are kept to 12 decimals (an integer sort key holds row and similarity)
+SIM_SCALE = 10 ** 12
+
+class InteractionLog:
+    """
+    Append-only JSONL file of interaction events.
+
+    One event per line: {"userId", "careerId", "event", "ts"}. Writers
+    append whole lines; readers pick up where they left off by byte offset,
+    so every process sharing the file sees every event exactly once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, events: List[Dict]):
+        if not events:
+            return
+        data = ''.join(json.dumps(event, separators=(',', ':')) + '\n' for event in events).encode('utf-8')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, 'ab') as f:
+            f.write(data)
+
+    def size(self) -> int:
+        try:
+            return os.stat(self.path).st_size
+        except OSError:
+            return 0
+
+    def read_from(self, offset: int) -> Tuple[List[Dict], int]:
+        """
+        Events appended since byte `offset`, and the offset to resume from.
+
+        A trailing line without its newline yet is left for the next read.
+        Malformed lines are skipped.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], 0
+
+        end = data.rfind(b'\n') + 1
+        events, skipped = [], 0
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                skipped += 1
+                continue
+            if isinstance(event, dict):
+                events.append(event)
+            else:
+                skipped += 1
+
+        if skipped:
+            print(f"Warning: skipped {skipped} malformed interaction log line(s) in {self.path}")
+        return events, offset + end
+
+class _ModelState:
+    """
+    One published version of the model; replaced whole, never mutated.
+
+    events (events folded in per user) is published with the matrices, so a
+    user's history version never runs ahead of the scores it keys.
+    """
+
+    def __init__(self, users: Dict[str, int], interactions: sparse.csr_matrix, neighbors: sparse.csr_matrix,
+                 events: Optional[Dict[str, int]] = None):
+        self.users = users
+        self.interactions = interactions
+        self.neighbors = neighbors
+        self.events = events if events is not None else {}
+
+class CollaborativeModel:
+    """
+    Item-item collaborative filtering from implicit feedback.
+
+    Interactions live in a CSR user x career matrix of log-damped event
+    weights (views, saves, plan starts). Career-career cosine similarity
+    comes from the co-occurrence matrix R^T R, and each career keeps only
+    its top `neighbors` most similar careers as one sparse row.
+
+    New events are folded in incrementally. Co-occurrence is updated with
+    the outer products of just the affected users' rows, and only careers
+    whose similarities changed get their neighbor lists recomputed. The
+    result matches a rebuild from the full log up to float rounding.
+
+    At request time a user's score for career j is the weight-averaged
+    similarity of j to the careers they interacted with (1 for those
+    careers themselves). That is a sparse lookup of a few neighbor rows, in
+    [0, 1] and non-zero only on those neighborhoods. It comes with a blend
+    weight, history / (history + prior_strength), saying how much of the
+    collaborative component it replaces, so users with little history stay
+    close to the heuristics.
+    """
+
+    def __init__(self, careers_data: List[Dict], log: Optional[InteractionLog] = None, neighbors: int = 50,
+                 prior_strength: float = 5.0, refresh_seconds: float = 5.0):
+        self.log = log
+        self.k = neighbors
+        self.prior_strength = prior_strength
+        self.refresh_seconds = refresh_seconds
+
+        self.size = len(careers_data)
+        self.career_index = {}
+        for position, career_id in enumerate(career_ids(careers_data)):
+            self.career_index.setdefault(career_id, position)
+
+        self._raw = sparse.csr_matrix((0, self.size))
+        self._cooccurrence = sparse.csr_matrix((self.size, self.size))
+        self.state = _ModelState({}, sparse.csr_matrix((0, self.size)), sparse.csr_matrix((self.size, self.size)))
+
+        self._offset = 0
+        self._checked_at = 0.0
+        self._fold_lock = threading.Lock()
+        self.stats = {'events': 0, 'ignored': 0, 'folds': 0, 'lastFoldMs': 0.0}
+
+        if log is not None:
+            self.refresh(force=True)
+
+    # ===== Updates =====
+
+    def maybe_refresh(self):
+        """
+        Pick up newly logged events, at most once per refresh_seconds.
+
+        Never blocks, so it is cheap to call per request (from the event
+        loop too): the fold runs on a background thread and callers keep
+        the current state until the new one is published.
+        """
+        if self.log is None or time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        if self._fold_lock.locked():
+            return
+        self._checked_at = time.monotonic()
+        threading.Thread(target=self.refresh, name='interaction-refresh', daemon=True).start()
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Fold in events appended to the log since the last refresh.
+
+        Returns the number of events folded in. Concurrent callers don't
+        wait: while one thread folds, others keep serving the previous
+        state (unless force is set).
+        """
+        if self.log is None:
+            return 0
+        if not self._fold_lock.acquire(blocking=force):
+            return 0
+        try:
+            self._checked_at = time.monotonic()
+            if self.log.size() < self._offset:
+                # The log was truncated or rotated: start over from its beginning
+                self._reset()
+
+            events, self._offset = self.log.read_from(self._offset)
+            return self._fold(events)
+        finally:
+            self._fold_lock.release()
+
+    def fold_in(self, events: List[Dict]) -> int:
+        """Fold in events directly (without the log); returns the number applied"""
+        with self._fold_lock:
+            return self._fold(events)
+
+    def _reset(self):
+        self._raw = sparse.csr_matrix((0, self.size))
+        self._cooccurrence = sparse.csr_matrix((self.size, self.size))
+        self.state = _ModelState({}, sparse.csr_matrix((0, self.size)), sparse.csr_matrix((self.size, self.size)))
+        self._offset = 0
+
+    def _fold(self, events: List[Dict]) -> int:
+        start = time.perf_counter()
+        users = dict(self.state.users)
+        user_events = dict(self.state.events)
+        rows, cols, weights = [], [], []
+
+        for event in events:
+            position = self.career_index.get(str(event.get('careerId')))
+            weight = EVENT_WEIGHTS.get(event.get('event'))
+            user_id = event.get('userId')
+            if position is None or weight is None or user_id is None:
+                self.stats['ignored'] += 1
+                continue
+
+            user_id = str(user_id)
+            row = users.setdefault(user_id, len(users))
+            user_events[user_id] = user_events.get(user_id, 0) + 1
+            rows.append(row)
+            cols.append(position)
+            weights.append(weight)
+
+        if not rows:
+            return 0
+
+        # 1. Add the events to the raw (undamped) interaction counts. The
+        #    private matrix grows in place (new users are empty rows); only
+        #    the affected users' old rows are copied out
+        shape = (len(users), self.size)
+        self._raw.resize(shape)
+        affected = np.unique(np.asarray(rows, dtype=np.int64))
+        old_rows = _damped(self._raw[affected])
+        delta = sparse.csr_matrix((weights, (rows, cols)), shape=shape)
+        new_raw = (self._raw + delta).tocsr()
+
+        # 2. Update co-occurrence with just the affected users' rows
+        new_rows = _damped(new_raw[affected])
+        cooccurrence = (self._cooccurrence + (new_rows.T @ new_rows) - (old_rows.T @ old_rows)).tocsr()
+        cooccurrence.data[np.abs(cooccurrence.data) < EPSILON] = 0.0
+        cooccurrence.eliminate_zeros()
+        cooccurrence.sort_indices()
+
+        # 3. Re-rank neighbors of every career whose similarities moved:
+        #    careers with new interactions, and everything that co-occurs with them
+        touched = np.union1d(old_rows.indices, new_rows.indices)
+        stale = np.union1d(touched, cooccurrence[touched].indices)
+        neighbors = self._replace_neighbor_rows(self.state.neighbors, cooccurrence, stale)
+
+        self._raw = new_raw
+        self._cooccurrence = cooccurrence
+        self.state = _ModelState(users, _damped(new_raw), neighbors, user_events)
+
+        self.stats['events'] += len(rows)
+        self.stats['folds'] += 1
+        self.stats['lastFoldMs'] = round((time.perf_counter() - start) * 1000, 2)
+        return len(rows)
+
+    def _replace_neighbor_rows(self, neighbors: sparse.csr_matrix, cooccurrence: sparse.csr_matrix,
+                               stale: np.ndarray) -> sparse.csr_matrix:
+        """Neighbor matrix with the `stale` rows recomputed from co-occurrence"""
+        norms = np.sqrt(np.maximum(cooccurrence.diagonal(), 0.0))
+
+        # Cosine similarity of each stale career to everything it co-occurs with
+        block = cooccurrence[stale].tocoo()
+        row_ids = stale[block.row]
+        denominator = norms[row_ids] * norms[block.col]
+        keep = (block.col != row_ids) & (denominator > 0)
+        row_ids, col_ids = row_ids[keep], block.col[keep]
+        # Quantized so float residue from incremental updates can't reorder ties
+        quantized = np.rint(block.data[keep] / denominator[keep] * SIM_SCALE).astype(np.int64)
+
+        # Top k per row: one integer sort by (row, descending similarity); the
+        # stable sort keeps ties in column order, so they go to the lower career index
+        order = np.argsort(row_ids.astype(np.int64) * (SIM_SCALE + 1) + (SIM_SCALE - quantized), kind='stable')
+        row_ids, col_ids, sims = row_ids[order], col_ids[order], quantized[order] / SIM_SCALE
+        starts = np.flatnonzero(np.diff(row_ids, prepend=-1))
+        firsts = np.repeat(starts, np.diff(np.append(starts, len(row_ids))))
+        top = (np.arange(len(row_ids)) - firsts) < self.k
+        fresh = sparse.csr_matrix((sims[top], (row_ids[top], col_ids[top])), shape=neighbors.shape)
+
+        # Keep all other rows as they were
+        kept = np.ones(self.size)
+        kept[stale] = 0.0
+        result = (sparse.diags(kept) @ neighbors + fresh).tocsr()
+        result.eliminate_zeros()
+        result.sort_indices()
+        return result
+
+    # ===== Scoring =====
+
+    def user_version(self, user_id: Optional[str]) -> int:
+        """Events folded in for a user; changes whenever their scores may have"""
+        return self.state.events.get(str(user_id), 0) if user_id is not None else 0
+
+    def user_scores(self, user_id: Optional[str]) -> Optional[Tuple[np.ndarray, np.ndarray, float]]:
+        """
+        A user's collaborative scores as (career indices, scores, blend).
+
+        Indices are sorted; careers outside them score 0. None when the user
+        has no history.
+        """
+        state = self.state
+        row = state.users.get(str(user_id)) if user_id is not None else None
+        if row is None:
+            return None
+
+        interactions = state.interactions
+        start, end = interactions.indptr[row], interactions.indptr[row + 1]
+        history = interactions.indices[start:end]
+        weights = interactions.data[start:end]
+        total = float(weights.sum())
+        if total <= 0:
+            return None
+
+        neighbors = state.neighbors
+        starts, ends = neighbors.indptr[history], neighbors.indptr[history + 1]
+        careers = np.concatenate([history] + [neighbors.indices[s:e] for s, e in zip(starts, ends)])
+        contributions = np.concatenate(
+            [weights] + [neighbors.data[s:e] * w for s, e, w in zip(starts, ends, weights)]
+        )
+
+        indices, inverse = np.unique(careers, return_inverse=True)
+        scores = np.bincount(inverse, weights=contributions, minlength=len(indices)) / total
+        return indices, np.minimum(scores, 1.0), total / (total + self.prior_strength)
+
+    def get_stats(self) -> Dict:
+        state = self.state
+        stats = dict(self.stats)
+        stats['users'] = len(state.users)
+        stats['interactions'] = int(state.interactions.nnz)
+        stats['neighborEntries'] = int(state.neighbors.nnz)
+        return stats
+
+def career_ids(careers_data: List[Dict]) -> List[str]:
+    """Career IDs as strings, in catalog order (compiled catalogs list them without decoding records)"""
+    ids = getattr(careers_data, 'career_ids', None)
+    return ids if ids is not None else [str(career.get('id')) for career in careers_data]
+
+def _damped(raw: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Interaction strengths with repeated events damped: log(1 + summed event weight)"""
+    damped = raw.tocsr(copy=True)
+    damped.data = np.log1p(damped.data)
+    return damped
+
+def create_collaborative_model(careers_data: List[Dict]) -> Optional[CollaborativeModel]:
+    """
+    Collaborative model for a catalog from environment settings (None when disabled).
+
+    - ML_INTERACTIONS_PATH: interaction log (JSONL); unset keeps the heuristics
+    - ML_CF_NEIGHBORS: similar careers kept per career (default 50)
+    - ML_CF_PRIOR_STRENGTH: history weight at which CF gets half the component (default 5)
+    - ML_INTERACTIONS_REFRESH_SECONDS: how often the log is checked for new events (default 5)
+    """
+    path = os.getenv('ML_INTERACTIONS_PATH')
+    if not path:
+        return None
+
+    return CollaborativeModel(
+        careers_data,
+        log=InteractionLog(path),
+        neighbors=int(os.getenv('ML_CF_NEIGHBORS', '50')),
+        prior_strength=float(os.getenv('ML_CF_PRIOR_STRENGTH', '5')),
+        refresh_seconds=float(os.getenv('ML_INTERACTIONS_REFRESH_SECONDS', '5'))
+    )
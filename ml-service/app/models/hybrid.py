@@ -3,10 +3,18 @@ Hybrid Recommendation System
 Combines collaborative filtering and content-based filtering
 """
 
+import time
+
 import numpy as np
-from typing import List, Dict, Tuple
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler
+from typing import List, Dict, Tuple, Union
+
+from .catalog_index import CatalogIndex
+from .collaborative import CollaborativeModel
+from .lookup_tables import format_timeline, timeline_months
+from .profile_context import EDU_HIERARCHY, ProfileContext
+from .retrieval import AnnRetriever
+from .vocabulary import BitsetRows, TermVocabulary, term_key
+from ..utils.metrics import metrics
 
 class HybridRecommender:
     """
@@ -15,17 +23,44 @@ class HybridRecommender:
     Combines:
     1. Content-based filtering (skills, education, interests match)
     2. Collaborative filtering (similar user patterns)
+    
+    Collaborative scores come from heuristics, blended with item-item
+    collaborative filtering over logged interactions when a
+    CollaborativeModel is given and the profile carries a userId.
+    
+    Ranking is exact by default. With an AnnRetriever, careers are first
+    shortlisted by embedding similarity and only the shortlist is scored
+    exactly (approximate, for catalogs too large to score per request).
     """
     
-    def __init__(self, careers_data: List[Dict]):
+    def __init__(self, careers_data: List[Dict], index: CatalogIndex = None,
+                 collaborative: CollaborativeModel = None, retriever: AnnRetriever = None):
         self.careers_data = careers_data
-        self.scaler = StandardScaler()
+        self._scaler = None
+        
+        # Compiled scoring structures, built once per catalog
+        self.index = index if index is not None else CatalogIndex(careers_data)
+        
+        # Interaction-based collaborative filtering (None: heuristics only)
+        self.collaborative = collaborative
+        self.index.collaborative = collaborative
+        
+        # Approximate candidate generation (None: exact ranking over the whole catalog)
+        self.retriever = retriever
         
         # Weights for hybrid scoring
         self.CONTENT_WEIGHT = 0.7
         self.COLLAB_WEIGHT = 0.3
     
-    def content_based_score(self, user_profile: Dict, career: Dict) -> float:
+    @property
+    def scaler(self):
+        """Feature scaler, created on first use (sklearn is slow to import)"""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+    
+    def content_based_score(self, user_profile: Union[Dict, ProfileContext], career: Dict) -> float:
         """
         Calculate content-based similarity score.
         
@@ -35,22 +70,14 @@ class HybridRecommender:
         - Skills overlap (30%)
         - Interests alignment (25%)
         """
+        context = ProfileContext.of(user_profile)
         score = 0.0
         
         # 1. Education Match (25%)
-        user_edu = user_profile.get('educationLevel', '').lower()
         req_edu = career.get('requiredEducation', {}).get('level', '').lower()
         
-        edu_hierarchy = {
-            'high school': 1,
-            'diploma': 2,
-            'undergraduate': 3,
-            'postgraduate': 4,
-            'phd': 5
-        }
-        
-        user_edu_level = edu_hierarchy.get(user_edu, 0)
-        req_edu_level = edu_hierarchy.get(req_edu, 0)
+        user_edu_level = context.edu_rank
+        req_edu_level = EDU_HIERARCHY.get(req_edu, 0)
         
         if user_edu_level >= req_edu_level:
             score += 0.25
@@ -58,48 +85,77 @@ class HybridRecommender:
             score += 0.15  # Close enough
         
         # 2. Field Match (20%)
-        user_field = user_profile.get('fieldOfStudy', '').lower()
+        user_field = context.field_of_study
         req_fields = [f.lower() for f in career.get('requiredEducation', {}).get('fields', [])]
         
         if any(user_field in f or f in user_field for f in req_fields):
             score += 0.20
         
-        # 3. Skills Match (30%)
-        user_skills = set(s.lower() for s in user_profile.get('skills', []))
-        req_skills = set(s.lower() for s in career.get('requiredSkills', []))
+        # 3. Skills Match (30%), by canonical skill
+        terms = self.index.profile_terms(context)
+        skill_hits, skill_count = self._term_overlap(
+            career, 'requiredSkills', self.index.skill_vocabulary, self.index.skill_bits, terms['skill_bits']
+        )
         
-        if req_skills:
-            skill_overlap = len(user_skills & req_skills) / len(req_skills)
-            score += 0.30 * skill_overlap
+        if skill_count:
+            score += 0.30 * skill_hits / skill_count
         
-        # 4. Interests Match (25%)
-        user_interests = set(i.lower() for i in user_profile.get('interests', []))
-        career_interests = set(i.lower() for i in career.get('relatedInterests', []))
+        # 4. Interests Match (25%), by canonical interest
+        interest_hits, interest_count = self._term_overlap(
+            career, 'relatedInterests', self.index.interest_vocabulary, self.index.interest_bits, terms['interest_bits']
+        )
         
-        if career_interests:
-            interest_overlap = len(user_interests & career_interests) / len(career_interests)
-            score += 0.25 * interest_overlap
+        if interest_count:
+            score += 0.25 * interest_hits / interest_count
         
         return score
     
-    def collaborative_score(self, user_profile: Dict, career: Dict) -> float:
+    def _term_overlap(self, career: Dict, field: str, vocabulary: TermVocabulary, career_bits: BitsetRows,
+                      profile_bits: np.ndarray) -> Tuple[int, int]:
+        """(career terms the profile has, distinct career terms) for a career's skills or interests"""
+        position = self.index.position(career)
+        if position is not None:
+            return career_bits.overlap(position, profile_bits), career_bits.size(position)
+        
+        # A career from outside the catalog is encoded on the fly; terms the catalog lacks can't match
+        terms = career.get(field, [])
+        ids = vocabulary.encode(terms, fuzzy=False)
+        unknown = {term_key(t) for t in terms if vocabulary.resolve(t, fuzzy=False) is None}
+        hits = np.bitwise_count(vocabulary.bitset(ids) & profile_bits).sum()
+        return int(hits), len(ids) + len(unknown)
+    
+    def _career_spellings(self, career: Dict, skill_ids: np.ndarray) -> List[str]:
+        """A career's own spellings of the given canonical skill IDs, in the career's order"""
+        wanted = set(skill_ids.tolist())
+        spellings = []
+        for skill in career.get('requiredSkills', []):
+            if not wanted:
+                break
+            skill_id = self.index.skill_vocabulary.resolve(skill, fuzzy=False)
+            if skill_id in wanted:
+                wanted.discard(skill_id)
+                spellings.append(skill)
+        return spellings
+    
+    def collaborative_score(self, user_profile: Union[Dict, ProfileContext], career: Dict) -> float:
         """
         Calculate collaborative filtering score.
         
-        In a production system, this would use:
-        - User-item interaction matrix
-        - Similar users' career choices
-        - Success rates of similar profiles
-        
-        For now, using simplified heuristics based on:
+        Heuristics based on:
         - Career popularity in target industries
         - Experience level alignment
         - Work style compatibility
+        
+        For users with logged interactions (views, saves, plan starts), the
+        heuristic score is blended with item-item collaborative filtering:
+        how similar the career is to the careers they engaged with, judged by
+        which careers other users engage with together.
         """
+        context = ProfileContext.of(user_profile)
         score = 0.0
         
         # Industry alignment (40%)
-        user_industries = set(user_profile.get('targetIndustries', []))
+        user_industries = context.industries
         career_industries = set(career.get('industries', []))
         
         if user_industries and career_industries:
@@ -107,7 +163,7 @@ class HybridRecommender:
             score += 0.40 * industry_match
         
         # Experience level alignment (30%)
-        user_exp = user_profile.get('yearsExperience', 0)
+        user_exp = context.years_experience
         career_exp_range = career.get('experienceRange', {})
         min_exp = career_exp_range.get('min', 0)
         max_exp = career_exp_range.get('max', 50)
@@ -120,7 +176,7 @@ class HybridRecommender:
             score += max(0, 0.30 - (gap * 0.05))
         
         # Work style compatibility (30%)
-        user_work_style = user_profile.get('workStyle', '')
+        user_work_style = context.work_style
         career_work_styles = career.get('suitableWorkStyles', [])
         
         if user_work_style in career_work_styles:
@@ -128,49 +184,35 @@ class HybridRecommender:
         elif career_work_styles:  # Partial match
             score += 0.15
         
+        # Interaction history (blended in proportion to how much there is)
+        history = self.index.profile_terms(context)['history'] if self.collaborative is not None else None
+        if history is not None:
+            indices, values, blend = history
+            score = (1 - blend) * score
+            position = self.collaborative.career_index.get(str(career.get('id')))
+            if position is not None:
+                found = np.searchsorted(indices, position)
+                if found < len(indices) and indices[found] == position:
+                    score += blend * values[found]
+        
         return score
     
-    def calculate_timeline(self, user_profile: Dict, career: Dict, missing_skills: List[str]) -> str:
+    def calculate_timeline(self, user_profile: Union[Dict, ProfileContext], career: Dict, missing_skills: List[str]) -> str:
         """
         Calculate estimated timeline to career readiness.
         """
-        base_months = 6
-        
-        # Add time for missing skills
-        base_months += len(missing_skills) * 2
-        
-        # Adjust for experience level
-        if user_profile.get('experienceLevel') == 'beginner':
-            base_months += 3
-        elif user_profile.get('experienceLevel') == 'advanced':
-            base_months -= 2
-        
-        # Adjust for time commitment
-        time_commitment = user_profile.get('timeCommitment', '')
-        if 'Full-time' in time_commitment:
-            base_months = int(base_months * 0.7)
-        elif 'Less than 5' in time_commitment:
-            base_months = int(base_months * 1.5)
-        
-        # Adjust for learning pace
-        learning_pace = user_profile.get('learningPace', '')
-        if learning_pace == 'fast':
-            base_months = int(base_months * 0.8)
-        elif learning_pace == 'thorough':
-            base_months = int(base_months * 1.2)
-        
-        base_months = max(3, min(base_months, 24))  # Clamp between 3-24 months
-        
-        if base_months <= 6:
-            return f"{base_months} months"
-        else:
-            years = base_months / 12
-            return f"{years:.1f} years ({base_months} months)"
+        context = ProfileContext.of(user_profile)
+        return format_timeline(timeline_months(
+            len(missing_skills), context.experience_level, context.time_commitment, context.learning_pace
+        ))
     
-    def recommend(self, user_profile: Dict, top_n: int = 5) -> List[Dict]:
+    def recommend(self, user_profile: Union[Dict, ProfileContext], top_n: int = 5, offset: int = 0) -> List[Dict]:
         """
         Generate hybrid recommendations.
         
+        Ranks on raw scores first and only builds full recommendation
+        objects for the requested page (ranks offset .. offset + top_n).
+        
         Returns list of career recommendations with:
         - Career details
         - Match percentage
@@ -178,29 +220,94 @@ class HybridRecommender:
         - Required/missing skills
         - Timeline estimate
         """
-        recommendations = []
+        context = ProfileContext.of(user_profile)
+        top_indices, content_scores, collab_scores, hybrid_scores = self.rank(context, offset + top_n)
+        page = slice(offset, offset + top_n)
         
-        for career in self.careers_data:
-            # Calculate scores
-            content_score = self.content_based_score(user_profile, career)
-            collab_score = self.collaborative_score(user_profile, career)
-            
-            # Hybrid score (weighted combination)
-            hybrid_score = (
-                self.CONTENT_WEIGHT * content_score +
-                self.COLLAB_WEIGHT * collab_score
+        return self._build_recommendations(
+            context, top_indices[page], content_scores[page], collab_scores[page], hybrid_scores[page]
+        )
+    
+    def rank(self, user_profile: Union[Dict, ProfileContext], depth: int) -> Tuple[np.ndarray, ...]:
+        """
+        Rank careers without building recommendation objects.
+        
+        Returns (career indices, content, collaborative, hybrid scores) for
+        the best `depth` careers, best first.
+        """
+        if self.collaborative is not None:
+            self.collaborative.maybe_refresh()
+        
+        if self.retriever is not None and self.retriever.applies(depth):
+            # Re-rank the embedding shortlist exactly; careers from the user's history always qualify
+            context = ProfileContext.of(user_profile)
+            rows = self.retriever.shortlist(context, depth, self.CONTENT_WEIGHT, self.COLLAB_WEIGHT)
+            history = self.index.profile_terms(context)['history']
+            if history is not None:
+                rows = np.union1d(rows, history[0])
+            return self.index.top_k_among(context, rows, depth, self.CONTENT_WEIGHT, self.COLLAB_WEIGHT)
+        
+        # Exact top N by hybrid score; the index prunes careers that can't make the cut
+        return self.index.top_k(user_profile, depth, self.CONTENT_WEIGHT, self.COLLAB_WEIGHT)
+    
+    def recommend_batch(self, user_profiles: List[Union[Dict, ProfileContext]], top_n: int = 5,
+                        pages: List[Tuple[int, int]] = None) -> List[List[Dict]]:
+        """
+        Generate hybrid recommendations for many profiles at once.
+        
+        Scores all profiles against the catalog as one matrix pass (in
+        bounded chunks) and returns, per profile, the same list recommend()
+        would. Pass pages as one (offset, top_n) pair per profile to page
+        each profile independently; the batch is ranked to the deepest page.
+        """
+        contexts = [ProfileContext.of(p) for p in user_profiles]
+        if self.collaborative is not None:
+            self.collaborative.maybe_refresh()
+        if pages is None:
+            pages = [(0, top_n)] * len(contexts)
+        depth = max((offset + n for offset, n in pages), default=0)
+        
+        if self.retriever is not None and self.retriever.applies(depth):
+            # Shortlists differ per profile, so each is re-ranked on its own
+            ranked = [self.rank(context, depth) for context in contexts]
+        else:
+            ranked = self.index.top_k_batch(
+                contexts, depth, self.CONTENT_WEIGHT, self.COLLAB_WEIGHT
             )
+        
+        # A stable top-k is a prefix of any deeper one, so each page is a slice of the shared ranking
+        recommendations = []
+        for context, scores, (offset, n) in zip(contexts, ranked, pages):
+            page = slice(offset, offset + n)
+            recommendations.append(self._build_recommendations(context, *(s[page] for s in scores)))
+        return recommendations
+    
+    def _build_recommendations(self, context: ProfileContext, top_indices: np.ndarray, content_scores: np.ndarray,
+                               collab_scores: np.ndarray, hybrid_scores: np.ndarray) -> List[Dict]:
+        """Build recommendation objects for ranked careers"""
+        skill_bits = self.index.profile_terms(context)['skill_bits']
+        timelines = self.index.tables.timeline_labels(context)
+        recommendations = []
+        timeline_seconds = 0.0
+        
+        for i, content_score, collab_score, hybrid_score in zip(
+            top_indices.tolist(), content_scores.tolist(), collab_scores.tolist(), hybrid_scores.tolist()
+        ):
+            career = self.careers_data[i]
             
-            # Calculate missing skills
-            user_skills = set(s.lower() for s in user_profile.get('skills', []))
-            req_skills = set(s.lower() for s in career.get('requiredSkills', []))
-            missing_skills = list(req_skills - user_skills)
+            # Calculate missing skills (the required skills the user lacks, as the career spells them)
+            missing_skills = self._career_spellings(career, self.index.skill_bits.missing(i, skill_bits))
             
-            # Calculate timeline
-            timeline = self.calculate_timeline(user_profile, career, missing_skills)
+            # Calculate timeline (tabulated per catalog, see CategoricalTables)
+            timeline_start = time.perf_counter()
+            if len(missing_skills) < len(timelines):
+                timeline = timelines[len(missing_skills)]
+            else:
+                timeline = self.calculate_timeline(context, career, missing_skills)
+            timeline_seconds += time.perf_counter() - timeline_start
             
             # Build recommendation object
-            recommendation = {
+            recommendations.append({
                 'career': career,
                 'matchPercentage': round(hybrid_score * 100, 2),
                 'breakdown': {
@@ -215,14 +322,11 @@ class HybridRecommender:
                 'targetCompanies': career.get('topCompanies', [])[:8],
                 'growthPotential': career.get('growthRate', 'Moderate'),
                 'demandLevel': career.get('demand', 'Medium')
-            }
-            
-            recommendations.append((hybrid_score, recommendation))
-        
-        # Sort by score and return top N
-        recommendations.sort(key=lambda x: x[0], reverse=True)
+            })
         
-        return [rec[1] for rec in recommendations[:top_n]]
+        # One observation per recommendation page
+        metrics.observe_stage('calculate_timeline', timeline_seconds)
+        return recommendations
 
 # Example usage
 if __name__ == "__main__":
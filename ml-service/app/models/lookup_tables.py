@@ -0,0 +1,176 @@
+"""
+Categorical Lookup Tables
+Per-catalog score tables for the components driven by low-cardinality profile attributes
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from .profile_context import EDU_HIERARCHY, ProfileContext
+
+def distinct_rows(matrix: sparse.csr_matrix) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Distinct rows of a binary matrix, in order of first appearance, and each row's code.
+
+    Returns (distinct rows as a binary matrix, code per original row).
+    """
+    indices, indptr = matrix.indices.tolist(), matrix.indptr.tolist()
+    distinct = {}
+    codes = np.fromiter(
+        (distinct.setdefault(tuple(indices[indptr[i]:indptr[i + 1]]), len(distinct)) for i in range(matrix.shape[0])),
+        dtype=np.int64, count=matrix.shape[0]
+    )
+
+    rows = list(distinct)
+    set_indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    set_indptr[1:] = np.cumsum([len(row) for row in rows])
+    set_indices = np.array([term for row in rows for term in row], dtype=np.int32)
+    set_matrix = sparse.csr_matrix(
+        (np.ones(len(set_indices), dtype=np.float64), set_indices, set_indptr),
+        shape=(len(rows), matrix.shape[1])
+    )
+    return set_matrix, codes
+
+def timeline_months(missing_count: int, experience_level: str, time_commitment: str, learning_pace: str) -> int:
+    """Estimated months to career readiness (see HybridRecommender.calculate_timeline)"""
+    base_months = 6
+
+    # Add time for missing skills
+    base_months += missing_count * 2
+
+    # Adjust for experience level
+    if experience_level == 'beginner':
+        base_months += 3
+    elif experience_level == 'advanced':
+        base_months -= 2
+
+    # Adjust for time commitment
+    if 'Full-time' in time_commitment:
+        base_months = int(base_months * 0.7)
+    elif 'Less than 5' in time_commitment:
+        base_months = int(base_months * 1.5)
+
+    # Adjust for learning pace
+    if learning_pace == 'fast':
+        base_months = int(base_months * 0.8)
+    elif learning_pace == 'thorough':
+        base_months = int(base_months * 1.2)
+
+    return max(3, min(base_months, 24))  # Clamp between 3-24 months
+
+def format_timeline(months: int) -> str:
+    if months <= 6:
+        return f"{months} months"
+    years = months / 12
+    return f"{years:.1f} years ({months} months)"
+
+class CategoricalTables:
+    """
+    Score tables for education, field, experience and work style, plus timelines.
+
+    Each of these components pairs a profile attribute with few possible
+    values with a career attribute with few distinct values. Careers carry
+    a code per attribute (the position of their value among the distinct
+    ones), and each component is tabulated once per catalog as (profile
+    value x distinct career value):
+    - education: education rank x required level
+    - field: field of study x required field set (substring match); rows
+      for the catalog's own field names are precomputed, others on first use
+    - experience: years of experience x experience range, with the
+      under-experience penalty baked in
+    - work style: work style x suitable style set
+
+    A profile's score for every career is then its table row gathered
+    through the codes. Timeline labels are tabulated by (experience level,
+    time commitment, learning pace) x number of missing skills.
+    """
+
+    # Cap on cached rows for field names outside the catalog's vocabulary (cleared when reached)
+    MAX_FIELD_ROWS = 10_000
+
+    def __init__(self, edu_values: np.ndarray, exp_ranges: np.ndarray, field_set_matrix: sparse.csr_matrix,
+                 field_terms: List[str], style_set_matrix: sparse.csr_matrix, work_style_vocab: Dict,
+                 max_skills: int):
+        # 1. Education: every possible rank against every required level
+        ranks = np.arange(max(EDU_HIERARCHY.values()) + 1)[:, None]
+        self.edu_table = np.where(ranks >= edu_values, 0.25, np.where(ranks == edu_values - 1, 0.15, 0.0))
+
+        # 2. Field of study
+        self.field_set_matrix = field_set_matrix
+        self.field_terms = field_terms
+        self._field_rows = {}
+        self._known_fields = {field: self._field_row(field) for field in [''] + field_terms}
+
+        # 3. Experience: years 0 .. cap; from the cap on, users exceed every range
+        exp_min, exp_max = exp_ranges[:, 0], exp_ranges[:, 1]
+        self.exp_cap = int(math.ceil(max(exp_min.max(initial=0), exp_max.max(initial=0)))) + 1
+        years = np.arange(self.exp_cap + 1, dtype=np.float64)[:, None]
+        self.exp_ranges = exp_ranges
+        self.exp_table = self._exp_rows(years)
+
+        # 4. Work style: one row per known style, then one for any other value
+        self.work_style_vocab = work_style_vocab
+        style_counts = np.diff(style_set_matrix.indptr)
+        self.style_table = np.vstack([
+            np.where(style_set_matrix[:, style_id].toarray().ravel() > 0, 0.30, np.where(style_counts > 0, 0.15, 0.0))
+            for style_id in range(len(work_style_vocab))
+        ] + [np.where(style_counts > 0, 0.15, 0.0)])
+
+        # 5. Timelines per (experience level, time commitment, learning pace) class
+        self._timelines = {
+            (level, commitment, pace): [
+                format_timeline(timeline_months(missing, level, commitment, pace)) for missing in range(max_skills + 1)
+            ]
+            for level in ('beginner', 'advanced', '')
+            for commitment in ('Full-time', 'Less than 5', '')
+            for pace in ('fast', 'thorough', '')
+        }
+
+    def _exp_rows(self, years: np.ndarray) -> np.ndarray:
+        exp_min, exp_max = self.exp_ranges[:, 0], self.exp_ranges[:, 1]
+        under_experienced = np.maximum(0, 0.30 - (exp_min - years) * 0.05)
+        return np.where((exp_min <= years) & (years <= exp_max), 0.30, np.where(years < exp_min, under_experienced, 0.0))
+
+    def _field_row(self, user_field: str) -> np.ndarray:
+        hits = np.array([user_field in f or f in user_field for f in self.field_terms], dtype=np.float64)
+        return np.where(self.field_set_matrix @ hits > 0, 0.20, 0.0)
+
+    def edu_row(self, context: ProfileContext) -> np.ndarray:
+        """Education score per distinct required level"""
+        return self.edu_table[context.edu_rank]
+
+    def field_row(self, context: ProfileContext) -> np.ndarray:
+        """Field-of-study score per distinct required field set"""
+        user_field = context.field_of_study
+        row = self._known_fields.get(user_field)
+        if row is None:
+            row = self._field_rows.get(user_field)
+            if row is None:
+                row = self._field_row(user_field)
+                if len(self._field_rows) >= self.MAX_FIELD_ROWS:
+                    self._field_rows.clear()
+                self._field_rows[user_field] = row
+        return row
+
+    def exp_row(self, context: ProfileContext) -> np.ndarray:
+        """Experience score per distinct experience range"""
+        years = context.years_experience
+        if isinstance(years, (int, np.integer)) and years >= 0:
+            return self.exp_table[min(years, self.exp_cap)]
+        # Negative or fractional years fall outside the table
+        return self._exp_rows(np.array([[float(years)]]))[0]
+
+    def style_row(self, context: ProfileContext) -> np.ndarray:
+        """Work style score per distinct suitable style set"""
+        return self.style_table[self.work_style_vocab.get(context.work_style, len(self.work_style_vocab))]
+
+    def timeline_labels(self, context: ProfileContext) -> List[str]:
+        """Timeline label by number of missing skills (up to the catalog's largest skill list)"""
+        level = context.experience_level if context.experience_level in ('beginner', 'advanced') else ''
+        commitment = context.time_commitment
+        commitment = 'Full-time' if 'Full-time' in commitment else 'Less than 5' if 'Less than 5' in commitment else ''
+        pace = context.learning_pace if context.learning_pace in ('fast', 'thorough') else ''
+        return self._timelines[level, commitment, pace]
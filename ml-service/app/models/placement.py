@@ -3,10 +3,14 @@ Placement Probability Prediction Model
 Predicts job placement success probability based on user profile
 """
 
+import time
+
 import numpy as np
-from typing import Dict, List
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
+from typing import Dict, List, Union
+
+from .compiled_forest import CompiledForest
+from .profile_context import ProfileContext
+from ..utils.metrics import metrics
 
 class PlacementPredictor:
     """
@@ -22,36 +26,97 @@ class PlacementPredictor:
     - Learning commitment
     """
     
+    # Feature encodings (extract_features)
+    EDU_FEATURE_SCORES = {
+        'High School': 1,
+        'Diploma': 2,
+        'Undergraduate': 3,
+        'Postgraduate': 4,
+        'PhD': 5,
+        'Self-Taught / Bootcamp': 2.5
+    }
+    TIME_FEATURE_SCORES = {
+        'Less than 5 hours': 1,
+        '5–10 hours': 2,
+        '10–20 hours': 3,
+        'Full-time learning': 4
+    }
+    TIMELINE_FEATURE_SCORES = {
+        '6months': 4,
+        '1year': 3,
+        '2years': 2,
+        '5years': 1
+    }
+    
+    # Heuristic education points (calculate_base_probability)
+    EDU_POINTS = {
+        'PhD': 20,
+        'Postgraduate': 18,
+        'Undergraduate': 15,
+        'Diploma': 12,
+        'High School': 8,
+        'Self-Taught / Bootcamp': 14
+    }
+    
+    # Batches at least this large go to sklearn's own predict_proba when the
+    # sklearn model is loaded (its per-row cost is lower once its fixed
+    # per-call overhead is amortized); both paths give identical probabilities
+    COMPILED_BATCH_LIMIT = 512
+    
     def __init__(self):
         self.model = None  # In production, load pre-trained model
-        self.scaler = StandardScaler()
+        self.compiled_model = None
+        self._scaler = None
         self.is_trained = False
     
-    def extract_features(self, profile: Dict) -> np.ndarray:
+    def load_model(self, path: str):
+        """
+        Load a persisted placement model.
+        
+        Accepts a joblib-pickled sklearn forest (compiled on load) or an
+        .npz written by CompiledForest.save (no sklearn import needed).
+        """
+        if path.endswith('.npz'):
+            self.model = None
+            self.compiled_model = CompiledForest.load(path)
+        else:
+            import joblib
+            self.model = joblib.load(path)
+            self.compiled_model = CompiledForest.from_sklearn(self.model)
+        self.is_trained = True
+    
+    def predict_proba_features(self, features: np.ndarray) -> np.ndarray:
+        """Placement probability (positive class) for each row of a feature matrix"""
+        if self.compiled_model is not None and (self.model is None or len(features) < self.COMPILED_BATCH_LIMIT):
+            return self.compiled_model.predict_proba(features)[:, 1]
+        return self.model.predict_proba(features)[:, 1]
+    
+    @property
+    def scaler(self):
+        """Feature scaler, created on first use (sklearn is slow to import)"""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+    
+    def extract_features(self, profile: Union[Dict, ProfileContext]) -> np.ndarray:
         """
         Extract numerical features from user profile.
         
         Returns feature vector for ML model.
         """
+        context = ProfileContext.of(profile)
         features = []
         
         # 1. Education Score (0-5)
-        edu_scores = {
-            'High School': 1,
-            'Diploma': 2,
-            'Undergraduate': 3,
-            'Postgraduate': 4,
-            'PhD': 5,
-            'Self-Taught / Bootcamp': 2.5
-        }
-        features.append(edu_scores.get(profile.get('educationLevel', ''), 2))
+        features.append(self.EDU_FEATURE_SCORES.get(context.education_level, 2))
         
         # 2. Skills Count (0-20+)
-        skills_count = len(profile.get('skills', []))
+        skills_count = context.skill_count
         features.append(min(skills_count, 20))
         
         # 3. Average Skill Proficiency (0-5)
-        skill_prof = profile.get('skillProficiency', [])
+        skill_prof = context.get('skillProficiency', [])
         if skill_prof:
             avg_prof = np.mean([sp.get('level', 3) for sp in skill_prof])
         else:
@@ -59,66 +124,47 @@ class PlacementPredictor:
         features.append(avg_prof)
         
         # 4. Years of Experience (0-20+)
-        years_exp = min(profile.get('yearsExperience', 0), 20)
+        years_exp = min(context.years_experience, 20)
         features.append(years_exp)
         
         # 5. Certifications Count (0-10+)
-        cert_count = len(profile.get('certifications', []))
+        cert_count = context.certification_count
         features.append(min(cert_count, 10))
         
         # 6. Projects Completed (0-20+)
-        projects = min(profile.get('projectsCompleted', 0), 20)
+        projects = min(context.projects_completed, 20)
         features.append(projects)
         
         # 7. Portfolio Presence (0 or 1)
-        has_portfolio = 1 if profile.get('portfolioUrl') else 0
+        has_portfolio = 1 if context.has_portfolio else 0
         features.append(has_portfolio)
         
         # 8. Time Commitment Score (1-4)
-        time_scores = {
-            'Less than 5 hours': 1,
-            '5–10 hours': 2,
-            '10–20 hours': 3,
-            'Full-time learning': 4
-        }
-        features.append(time_scores.get(profile.get('timeCommitment', ''), 2))
+        features.append(self.TIME_FEATURE_SCORES.get(context.time_commitment, 2))
         
         # 9. Career Timeline Urgency (1-4)
-        timeline_scores = {
-            '6months': 4,
-            '1year': 3,
-            '2years': 2,
-            '5years': 1
-        }
-        features.append(timeline_scores.get(profile.get('careerTimeline', ''), 2))
+        features.append(self.TIMELINE_FEATURE_SCORES.get(context.career_timeline, 2))
         
         # 10. Leadership Aspirations (0 or 1)
-        features.append(1 if profile.get('leadershipAspirations') else 0)
+        features.append(1 if context.get('leadershipAspirations') else 0)
         
         return np.array(features).reshape(1, -1)
     
-    def calculate_base_probability(self, profile: Dict) -> float:
+    def calculate_base_probability(self, profile: Union[Dict, ProfileContext]) -> float:
         """
         Calculate base probability using heuristics.
         
         This is used when ML model is not trained.
         """
+        context = ProfileContext.of(profile)
         score = 0.0
         max_score = 100.0
         
         # Education (20 points)
-        edu_scores = {
-            'PhD': 20,
-            'Postgraduate': 18,
-            'Undergraduate': 15,
-            'Diploma': 12,
-            'High School': 8,
-            'Self-Taught / Bootcamp': 14
-        }
-        score += edu_scores.get(profile.get('educationLevel', ''), 10)
+        score += self.EDU_POINTS.get(context.education_level, 10)
         
         # Skills (25 points)
-        skills_count = len(profile.get('skills', []))
+        skills_count = context.skill_count
         if skills_count >= 7:
             score += 25
         elif skills_count >= 5:
@@ -129,7 +175,7 @@ class PlacementPredictor:
             score += 10
         
         # Experience (20 points)
-        years = profile.get('yearsExperience', 0)
+        years = context.years_experience
         if years >= 5:
             score += 20
         elif years >= 3:
@@ -140,7 +186,7 @@ class PlacementPredictor:
             score += 6
         
         # Projects & Portfolio (15 points)
-        projects = profile.get('projectsCompleted', 0)
+        projects = context.projects_completed
         if projects >= 5:
             score += 10
         elif projects >= 3:
@@ -148,15 +194,15 @@ class PlacementPredictor:
         elif projects >= 1:
             score += 4
         
-        if profile.get('portfolioUrl'):
+        if context.has_portfolio:
             score += 5
         
         # Certifications (10 points)
-        certs = len(profile.get('certifications', []))
+        certs = context.certification_count
         score += min(certs * 3, 10)
         
         # Time Commitment (10 points)
-        time_commitment = profile.get('timeCommitment', '')
+        time_commitment = context.time_commitment
         if 'Full-time' in time_commitment:
             score += 10
         elif '10–20' in time_commitment:
@@ -170,32 +216,128 @@ class PlacementPredictor:
         probability = score / max_score
         
         # Add some variance based on profile completeness
-        completeness_bonus = self.calculate_completeness_bonus(profile)
+        completeness_bonus = self.calculate_completeness_bonus(context)
         probability = min(probability + completeness_bonus, 0.95)
         
         return probability
     
-    def calculate_completeness_bonus(self, profile: Dict) -> float:
+    def extract_features_batch(self, profiles: List[Union[Dict, ProfileContext]]) -> np.ndarray:
+        """
+        Feature matrix (profiles x 10) for many profiles.
+
+        Row i equals extract_features(profiles[i]).
+        """
+        contexts = [ProfileContext.of(p) for p in profiles]
+        features = np.empty((len(contexts), 10), dtype=np.float64)
+        
+        # 1. Education Score (0-5)
+        features[:, 0] = [self.EDU_FEATURE_SCORES.get(c.education_level, 2) for c in contexts]
+        
+        # 2. Skills Count (0-20+)
+        features[:, 1] = np.minimum([c.skill_count for c in contexts], 20)
+        
+        # 3. Average Skill Proficiency (0-5)
+        features[:, 2] = [
+            np.mean([sp.get('level', 3) for sp in c.get('skillProficiency')]) if c.get('skillProficiency') else 3
+            for c in contexts
+        ]
+        
+        # 4-6. Years of Experience, Certifications, Projects
+        features[:, 3] = np.minimum([c.years_experience for c in contexts], 20)
+        features[:, 4] = np.minimum([c.certification_count for c in contexts], 10)
+        features[:, 5] = np.minimum([c.projects_completed for c in contexts], 20)
+        
+        # 7. Portfolio Presence (0 or 1)
+        features[:, 6] = [c.has_portfolio for c in contexts]
+        
+        # 8-9. Time Commitment Score, Career Timeline Urgency
+        features[:, 7] = [self.TIME_FEATURE_SCORES.get(c.time_commitment, 2) for c in contexts]
+        features[:, 8] = [self.TIMELINE_FEATURE_SCORES.get(c.career_timeline, 2) for c in contexts]
+        
+        # 10. Leadership Aspirations (0 or 1)
+        features[:, 9] = [bool(c.get('leadershipAspirations')) for c in contexts]
+        
+        return features
+    
+    def calculate_base_probability_batch(self, profiles: List[Union[Dict, ProfileContext]]) -> np.ndarray:
+        """
+        Heuristic probabilities for many profiles.
+
+        Same point scheme as calculate_base_probability: profile fields are
+        gathered into columns in one pass, then each threshold chain is an
+        np.digitize bucket lookup over all profiles. Element i equals
+        calculate_base_probability(profiles[i]) exactly.
+        """
+        contexts = [ProfileContext.of(p) for p in profiles]
+        columns = np.array([
+            (self.EDU_POINTS.get(c.education_level, 10), c.skill_count, c.years_experience,
+             c.projects_completed, c.has_portfolio, c.certification_count,
+             bool(c.work_style), bool(c.get('problemSolvingApproach')), bool(c.industries), bool(c.career_timeline))
+            for c in contexts
+        ], dtype=np.float64).reshape(len(contexts), 10)
+        (edu_points, skills, years, projects, has_portfolio, certs,
+         has_work_style, has_approach, has_industries, has_timeline) = columns.T
+        
+        # Education (20 points)
+        score = edu_points
+        
+        # Skills (25 points)
+        score = score + np.array([10, 15, 20, 25])[np.digitize(skills, [3, 5, 7])]
+        
+        # Experience (20 points)
+        score = score + np.array([6, 12, 16, 20])[np.digitize(years, [1, 3, 5])]
+        
+        # Projects & Portfolio (15 points)
+        score = score + np.array([0, 4, 7, 10])[np.digitize(projects, [1, 3, 5])]
+        score = score + np.where(has_portfolio > 0, 5, 0)
+        
+        # Certifications (10 points)
+        score = score + np.minimum(certs * 3, 10)
+        
+        # Time Commitment (10 points), resolved once per distinct answer
+        codes = {}
+        inverse = np.array([codes.setdefault(c.time_commitment, len(codes)) for c in contexts], dtype=np.int64)
+        commitments = np.array(list(codes), dtype=str)
+        commitment_points = np.select(
+            [np.char.find(commitments, 'Full-time') >= 0,
+             np.char.find(commitments, '10–20') >= 0,
+             np.char.find(commitments, '5–10') >= 0],
+            [10, 7, 5],
+            3
+        )
+        score = score + commitment_points[inverse]
+        
+        # Normalize to 0-1, then add the completeness bonus in the scalar path's order
+        probability = score / 100.0
+        bonus = np.zeros(len(contexts))
+        for present in (has_work_style, has_approach, has_industries, has_timeline):
+            bonus = bonus + np.where(present > 0, 0.02, 0.0)
+        
+        return np.minimum(probability + bonus, 0.95)
+    
+    def calculate_completeness_bonus(self, profile: Union[Dict, ProfileContext]) -> float:
         """Calculate bonus for profile completeness"""
+        context = ProfileContext.of(profile)
         bonus = 0.0
         
-        if profile.get('workStyle'):
+        if context.work_style:
             bonus += 0.02
-        if profile.get('problemSolvingApproach'):
+        if context.get('problemSolvingApproach'):
             bonus += 0.02
-        if profile.get('targetIndustries'):
+        if context.industries:
             bonus += 0.02
-        if profile.get('careerTimeline'):
+        if context.career_timeline:
             bonus += 0.02
         
         return bonus
     
-    def generate_insights(self, profile: Dict, probability: float) -> List[str]:
+    def generate_insights(self, profile: Union[Dict, ProfileContext], probability: float) -> List[str]:
         """Generate personalized insights based on profile"""
+        context = ProfileContext.of(profile)
         insights = []
         
         # Skills-based insights
-        skills_count = len(profile.get('skills', []))
+        skills_count = context.skill_count
         if skills_count >= 5:
             insights.append("✓ Strong skill portfolio increases your marketability")
         elif skills_count >= 3:
@@ -204,7 +346,7 @@ class PlacementPredictor:
             insights.append("⚠ Limited skills may reduce opportunities")
         
         # Experience insights
-        years = profile.get('yearsExperience', 0)
+        years = context.years_experience
         if years >= 3:
             insights.append("✓ Solid work experience is a major advantage")
         elif years >= 1:
@@ -213,28 +355,29 @@ class PlacementPredictor:
             insights.append("→ Hands-on projects can compensate for limited experience")
         
         # Portfolio insights
-        if profile.get('portfolioUrl'):
+        if context.has_portfolio:
             insights.append("✓ Portfolio showcases your work effectively")
         else:
             insights.append("⚠ Missing portfolio - this is crucial for standing out")
         
         # Certifications
-        if profile.get('certifications'):
+        if context.certification_count:
             insights.append("✓ Certifications validate your expertise")
         
         # Projects
-        projects = profile.get('projectsCompleted', 0)
+        projects = context.projects_completed
         if projects >= 3:
             insights.append("✓ Multiple projects demonstrate practical skills")
         
         return insights[:5]  # Return top 5 insights
     
-    def suggest_improvements(self, profile: Dict, probability: float) -> List[Dict]:
+    def suggest_improvements(self, profile: Union[Dict, ProfileContext], probability: float) -> List[Dict]:
         """Suggest specific improvements to increase placement probability"""
+        context = ProfileContext.of(profile)
         improvements = []
         
         # Skills improvement
-        skills_count = len(profile.get('skills', []))
+        skills_count = context.skill_count
         if skills_count < 5:
             improvements.append({
                 'area': 'Skills',
@@ -246,7 +389,7 @@ class PlacementPredictor:
             })
         
         # Portfolio
-        if not profile.get('portfolioUrl'):
+        if not context.has_portfolio:
             improvements.append({
                 'area': 'Portfolio',
                 'current': 'No portfolio',
@@ -257,7 +400,7 @@ class PlacementPredictor:
             })
         
         # Projects
-        projects = profile.get('projectsCompleted', 0)
+        projects = context.projects_completed
         if projects < 3:
             improvements.append({
                 'area': 'Projects',
@@ -269,7 +412,7 @@ class PlacementPredictor:
             })
         
         # Certifications
-        if not profile.get('certifications'):
+        if not context.certification_count:
             improvements.append({
                 'area': 'Certifications',
                 'current': 'No certifications',
@@ -280,7 +423,7 @@ class PlacementPredictor:
             })
         
         # Experience
-        years = profile.get('yearsExperience', 0)
+        years = context.years_experience
         if years == 0:
             improvements.append({
                 'area': 'Experience',
@@ -306,7 +449,7 @@ class PlacementPredictor:
         else:
             return "low"
     
-    def predict_probability(self, profile: Dict) -> Dict:
+    def predict_probability(self, profile: Union[Dict, ProfileContext]) -> Dict:
         """
         Main prediction function.
         
@@ -316,18 +459,56 @@ class PlacementPredictor:
         - Personalized insights
         - Improvement suggestions
         """
+        start = time.perf_counter()
+        context = ProfileContext.of(profile)
+        
         # Calculate probability
-        if self.is_trained and self.model:
+        if self.is_trained and (self.model or self.compiled_model):
             # Use trained ML model
-            features = self.extract_features(profile)
-            probability = self.model.predict_proba(features)[0][1]
+            features = self.extract_features(context)
+            probability = self.predict_proba_features(features)[0]
         else:
             # Use heuristic-based calculation
-            probability = self.calculate_base_probability(profile)
+            probability = self.calculate_base_probability(context)
         
+        prediction = self._build_prediction(context, probability)
+        metrics.observe_stage('placement', time.perf_counter() - start)
+        return prediction
+    
+    def predict_probability_batch(self, profiles: List[Union[Dict, ProfileContext]]) -> List[Dict]:
+        """
+        Predict placement for many profiles at once.
+
+        Probabilities for all profiles come from one pass: a single
+        predict_proba call on the feature matrix when a model is trained,
+        otherwise the vectorized heuristic. Result i equals
+        predict_probability(profiles[i]).
+        """
+        start = time.perf_counter()
+        contexts = [ProfileContext.of(p) for p in profiles]
+        if not contexts:
+            return []
+        
+        probabilities = self.predict_proba_batch(contexts)
+        
+        predictions = [
+            self._build_prediction(context, probability)
+            for context, probability in zip(contexts, probabilities.tolist())
+        ]
+        metrics.observe_stage('placement', time.perf_counter() - start)
+        return predictions
+    
+    def predict_proba_batch(self, profiles: List[Union[Dict, ProfileContext]]) -> np.ndarray:
+        """Placement probability (0-1) for each profile: the trained model when loaded, else the heuristic"""
+        if self.is_trained and (self.model or self.compiled_model):
+            return self.predict_proba_features(self.extract_features_batch(profiles))
+        return self.calculate_base_probability_batch(profiles)
+    
+    def _build_prediction(self, context: ProfileContext, probability: float) -> Dict:
+        """Prediction payload (insights, suggestions, strength) for one probability"""
         # Generate insights and suggestions
-        insights = self.generate_insights(profile, probability)
-        improvements = self.suggest_improvements(profile, probability)
+        insights = self.generate_insights(context, probability)
+        improvements = self.suggest_improvements(context, probability)
         
         return {
             'probability': round(probability * 100, 1),
@@ -335,10 +516,10 @@ class PlacementPredictor:
             'insights': insights,
             'improvementAreas': improvements,
             'profileStrength': {
-                'skills': len(profile.get('skills', [])),
-                'experience': profile.get('yearsExperience', 0),
-                'projects': profile.get('projectsCompleted', 0),
-                'certifications': len(profile.get('certifications', []))
+                'skills': context.skill_count,
+                'experience': context.years_experience,
+                'projects': context.projects_completed,
+                'certifications': context.certification_count
             }
         }
 
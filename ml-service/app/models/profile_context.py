@@ -0,0 +1,73 @@
+"""
+Profile Context
+Normalized, precomputed view of a user profile shared by all scorers
+"""
+
+from typing import Any, Dict, Union
+
+# Education levels used by content-based scoring
+EDU_HIERARCHY = {
+    'high school': 1,
+    'diploma': 2,
+    'undergraduate': 3,
+    'postgraduate': 4,
+    'phd': 5
+}
+
+class ProfileContext:
+    """
+    User profile preprocessed once per request.
+
+    Holds the lower-cased skill/interest sets, counts and numeric features
+    that HybridRecommender, PlacementPredictor and profile strength scoring
+    would otherwise each re-derive. Catalog indexes cache the profile's
+    integer term IDs on it (see catalog_terms), so a context scored
+    against the same catalog twice only encodes once.
+
+    Every scorer also accepts a plain profile dict and wraps it with
+    ProfileContext.of(). get() falls through to the raw profile for
+    fields that have no precomputed attribute.
+    """
+
+    def __init__(self, profile: Dict):
+        self.profile = profile
+
+        # Interaction history key for collaborative filtering (optional)
+        user_id = profile.get('userId')
+        self.user_id = str(user_id) if user_id is not None else None
+
+        # Education
+        self.education_level = profile.get('educationLevel', '')
+        self.edu_rank = EDU_HIERARCHY.get(self.education_level.lower(), 0)
+        self.field_of_study = profile.get('fieldOfStudy', '').lower()
+
+        # Skills & interests
+        self.skill_count = len(profile.get('skills', []))
+        self.skill_set = set(s.lower() for s in profile.get('skills', []))
+        self.interest_set = set(i.lower() for i in profile.get('interests', []))
+        self.industries = set(profile.get('targetIndustries', []))
+
+        # Experience & portfolio
+        self.years_experience = profile.get('yearsExperience', 0)
+        self.experience_level = profile.get('experienceLevel')
+        self.projects_completed = profile.get('projectsCompleted', 0)
+        self.certification_count = len(profile.get('certifications', []))
+        self.has_portfolio = bool(profile.get('portfolioUrl'))
+
+        # Goals & personality
+        self.work_style = profile.get('workStyle', '')
+        self.time_commitment = profile.get('timeCommitment', '')
+        self.learning_pace = profile.get('learningPace', '')
+        self.career_timeline = profile.get('careerTimeline', '')
+
+        # Per-catalog integer term IDs, filled in lazily by CatalogIndex
+        self.catalog_terms = {}
+
+    @classmethod
+    def of(cls, profile: Union[Dict, 'ProfileContext']) -> 'ProfileContext':
+        """Wrap a profile dict, or return an existing context unchanged"""
+        return profile if isinstance(profile, cls) else cls(profile)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Raw profile field lookup, like dict.get"""
+        return self.profile.get(key, default)
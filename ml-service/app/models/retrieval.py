@@ -0,0 +1,186 @@
+"""
+Approximate Retrieval
+Dense career/profile embeddings and an IVF index that shortlists careers for exact re-ranking
+"""
+
+import os
+import time
+from typing import Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import svds
+
+from .catalog_index import CatalogIndex
+from .profile_context import ProfileContext
+
+class CareerEmbedder:
+    """
+    Encodes careers and profiles into the same dense space.
+
+    Works on a CatalogIndex's canonical skill, interest and industry IDs.
+    A career's row weights each term the way the scorer does (a skill is
+    worth 0.30 / its number of skills, an interest 0.25 / its number of
+    interests, an industry 0.40), so a profile's term indicators times that
+    row is the term part of its score. Rows are projected onto the top
+    `dim` singular vectors of the catalog matrix (truncated SVD); inner
+    products in that space approximate the term score.
+    """
+
+    def __init__(self, index: CatalogIndex, dim: int = 64):
+        self.index = index
+        matrix = sparse.hstack([
+            sparse.diags(0.30 / np.maximum(index.skill_counts, 1)) @ index.skill_matrix,
+            sparse.diags(0.25 / np.maximum(index.interest_counts, 1)) @ index.interest_matrix,
+            0.40 * index.industry_matrix
+        ]).tocsr()
+        # Column offsets of the interest and industry blocks
+        self.offsets = (index.skill_matrix.shape[1], index.skill_matrix.shape[1] + index.interest_matrix.shape[1])
+
+        self.dim = max(1, min(dim, min(matrix.shape) - 1))
+        _, _, vt = svds(matrix, k=self.dim, random_state=0)
+        self.components = np.ascontiguousarray(vt.T, dtype=np.float32)  # terms x dim
+        self.career_vectors = np.ascontiguousarray(matrix @ self.components, dtype=np.float32)
+
+    def encode_profile(self, context: ProfileContext, content_weight: float, collab_weight: float) -> np.ndarray:
+        """A profile's query vector: its inner product with a career vector approximates that career's term score"""
+        terms = self.index.profile_terms(context)
+        industries = terms['industries']
+        columns = np.concatenate([terms['skills'], terms['interests'] + self.offsets[0], industries + self.offsets[1]])
+        values = np.concatenate([
+            np.full(len(terms['skills']) + len(terms['interests']), content_weight, dtype=np.float32),
+            # Industry overlap is normalized by the profile's own industry count
+            np.full(len(industries), collab_weight / max(1, len(context.industries)), dtype=np.float32)
+        ])
+        return values @ self.components[columns]
+
+class IVFIndex:
+    """
+    Inverted-file index over career vectors.
+
+    k-means splits the vectors into n_lists clusters whose members are
+    stored contiguously. A query scans only the lists most likely to hold
+    high scorers: lists are ranked by centroid inner product plus the best
+    per-career offset among their members.
+    """
+
+    def __init__(self, vectors: np.ndarray, n_lists: int = None, iterations: int = 10,
+                 sample_size: int = 20000, seed: int = 0):
+        self.vectors = vectors
+        n = len(vectors)
+        self.n_lists = max(1, min(n, n_lists or int(4 * np.sqrt(n))))
+
+        # 1. Train centroids on a sample
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(n, min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest(sample, centroids)
+            counts = np.bincount(assignment, minlength=self.n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            # Keep centroids that lost all their points
+            centroids = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids)
+        self.centroids = centroids.astype(np.float32)
+
+        # 2. Assign every vector; members of each list are stored contiguously
+        assignment = self._nearest(vectors, self.centroids)
+        self.members = np.argsort(assignment, kind='stable')
+        self.offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        self.offsets[1:] = np.cumsum(np.bincount(assignment, minlength=self.n_lists))
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 8192) -> np.ndarray:
+        # Squared distance up to a per-vector constant: |c|^2 - 2 v.c
+        norms = (centroids * centroids).sum(axis=1)
+        return np.concatenate([
+            np.argmin(norms - 2 * (vectors[start:start + chunk] @ centroids.T), axis=1)
+            for start in range(0, len(vectors), chunk)
+        ])
+
+    def search(self, query: np.ndarray, k: int, nprobe: int = 8, offsets: np.ndarray = None) -> np.ndarray:
+        """
+        Indices of up to k vectors with the highest query inner product (plus
+        offsets, per vector, when given) among the probed lists, unordered.
+        """
+        priority = self.centroids @ query
+        if offsets is not None:
+            members = offsets[self.members]
+            nonempty = self.offsets[:-1] < self.offsets[1:]
+            best = np.full(self.n_lists, -np.inf)
+            best[nonempty] = np.maximum.reduceat(members, self.offsets[:-1][nonempty])
+            priority = priority + best
+
+        list_order = np.argsort(-priority, kind='stable')
+        sizes = self.offsets[list_order + 1] - self.offsets[list_order]
+        # Probe at least nprobe lists, and enough of them to hold k vectors
+        probes = max(nprobe, int(np.searchsorted(np.cumsum(sizes), k)) + 1)
+
+        candidates = np.concatenate([
+            self.members[self.offsets[j]:self.offsets[j + 1]] for j in list_order[:probes]
+        ])
+        if len(candidates) <= k:
+            return candidates
+        scores = self.vectors[candidates] @ query
+        if offsets is not None:
+            scores = scores + offsets[candidates]
+        return candidates[np.argpartition(-scores, k - 1)[:k]]
+
+class AnnRetriever:
+    """
+    Candidate generation for HybridRecommender's 'ann' retrieval mode.
+
+    Estimates each probed career's score as its embedding inner product
+    (term overlap, approximate) plus its categorical score (exact, see
+    CatalogIndex.categorical_scores), and
+    returns the best `candidates` careers; the exact hybrid scorer then
+    ranks only those. Catalogs smaller than min_catalog_size are always
+    scored exhaustively.
+    """
+
+    def __init__(self, index: CatalogIndex, candidates: int = 500, nprobe: int = 64, dim: int = 64,
+                 min_catalog_size: int = 5000):
+        start = time.perf_counter()
+        self.candidates = candidates
+        self.nprobe = nprobe
+        self.catalog = index
+        self.size = index.size
+        self.enabled = self.size >= min_catalog_size
+
+        self.embedder = CareerEmbedder(index, dim=dim) if self.enabled else None
+        self.index = IVFIndex(self.embedder.career_vectors) if self.enabled else None
+        self.build_seconds = time.perf_counter() - start
+
+    def applies(self, depth: int) -> bool:
+        """Whether a ranking to `depth` should use the shortlist"""
+        return self.enabled and max(depth, self.candidates) < self.size
+
+    def shortlist(self, context: ProfileContext, depth: int, content_weight: float, collab_weight: float) -> np.ndarray:
+        """Sorted career indices to score exactly (at least depth of them)"""
+        query = self.embedder.encode_profile(context, content_weight, collab_weight)
+        offsets = self.catalog.categorical_scores(context, content_weight, collab_weight)
+        return np.sort(self.index.search(query, max(depth, self.candidates), self.nprobe, offsets))
+
+def create_retriever(index: CatalogIndex) -> Optional[AnnRetriever]:
+    """
+    Retriever for a catalog's index from environment settings (None in exact mode).
+
+    - ML_RETRIEVAL: 'exact' (default) or 'ann'
+    - ML_ANN_CANDIDATES: shortlist size re-ranked exactly (default 500)
+    - ML_ANN_NPROBE: IVF lists scanned per query (default 64)
+    - ML_ANN_DIM: embedding dimensions (default 64)
+    - ML_ANN_MIN_CATALOG: smaller catalogs stay exact (default 5000)
+    """
+    mode = os.getenv('ML_RETRIEVAL', 'exact')
+    if mode not in ('exact', 'ann'):
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    if mode == 'exact':
+        return None
+
+    return AnnRetriever(
+        index,
+        candidates=int(os.getenv('ML_ANN_CANDIDATES', '500')),
+        nprobe=int(os.getenv('ML_ANN_NPROBE', '64')),
+        dim=int(os.getenv('ML_ANN_DIM', '64')),
+        min_catalog_size=int(os.getenv('ML_ANN_MIN_CATALOG', '5000'))
+    )
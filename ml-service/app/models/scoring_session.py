@@ -0,0 +1,159 @@
+"""
+Scoring Sessions
+A profile's per-career score components, kept between edits and rescored incrementally
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .catalog_index import _take, top_k_indices
+from .profile_context import ProfileContext
+
+def _ratio(hits: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """hits / counts per career, 0 where the career has no terms (as CatalogIndex._overlap_ratio)"""
+    return np.divide(hits, counts, out=np.zeros(len(counts)), where=counts > 0)
+
+def _union(rows: List[np.ndarray]) -> np.ndarray:
+    return np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+class ScoringSession:
+    """
+    One profile's scores against a catalog, for a user editing their answers.
+
+    Keeps each career's skill, interest and industry hit counts and its
+    hybrid score. update() diffs an edited profile against the current one
+    and rescores only the careers a change can affect:
+    - skills / interests: careers in the postings of the added or removed terms
+    - education, field, experience, work style: careers whose distinct value
+      scores differently in the new lookup table row (see CategoricalTables)
+    - industries: careers holding an old or new industry
+    Table-driven components are gathered on demand rather than stored.
+    Scores are composed with the same arithmetic as CatalogIndex.score(),
+    so they equal a full recompute; a catalog swap or a change in the
+    user's interaction history rescores the whole catalog.
+    """
+
+    def __init__(self, recommender, profile: Dict):
+        # Serializes updates and reads of one session
+        self.lock = threading.Lock()
+        self.rebuild(recommender, profile)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the per-career arrays"""
+        return self.skill_hits.nbytes + self.interest_hits.nbytes + self.industry_hits.nbytes + self.hybrid.nbytes
+
+    def _history_version(self, context: ProfileContext) -> Optional[Tuple[str, int]]:
+        model = self.recommender.collaborative
+        if model is None or context.user_id is None:
+            return None
+        model.maybe_refresh()
+        return context.user_id, model.user_version(context.user_id)
+
+    def _set_profile(self, profile: Dict, context: ProfileContext = None):
+        self.profile = profile
+        self.context = context if context is not None else ProfileContext(profile)
+        self.history_version = self._history_version(self.context)
+        self.terms = self.index.profile_terms(self.context)
+
+    def rebuild(self, recommender, profile: Dict):
+        """Score every career from scratch"""
+        self.recommender = recommender
+        self.index = recommender.index
+        self._set_profile(profile)
+
+        self.skill_hits = self._hits(self.index.skill_postings, self.terms['skills'])
+        self.interest_hits = self._hits(self.index.interest_postings, self.terms['interests'])
+        self.industry_hits = np.zeros(self.index.size, dtype=np.int32)
+        self.industry_hits[:] = self.index.industry_matrix @ self._industry_vector()
+
+        content, collab = self._compose(None)
+        self.hybrid = recommender.CONTENT_WEIGHT * content + recommender.COLLAB_WEIGHT * collab
+        self.rescored = self.index.size
+
+    def _hits(self, postings, term_ids: np.ndarray) -> np.ndarray:
+        hits = np.zeros(self.index.size, dtype=np.int32)
+        careers, counts = self.index._postings_overlap(postings, term_ids)
+        hits[careers] = counts
+        return hits
+
+    def _industry_vector(self) -> np.ndarray:
+        vector = np.zeros(len(self.index.industry_vocab))
+        vector[self.terms['industries']] = 1.0
+        return vector
+
+    def _compose(self, rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """(content, collaborative) scores of the given careers (None: all), as CatalogIndex.score() computes them"""
+        index, terms = self.index, self.terms
+
+        # Content: education, field, skills, interests
+        content = terms['edu_row'][_take(index.edu_codes, rows)]
+        content = content + terms['field_row'][_take(index.field_codes, rows)]
+        content = content + 0.30 * _ratio(_take(self.skill_hits, rows), _take(index.skill_counts, rows))
+        content = content + 0.25 * _ratio(_take(self.interest_hits, rows), _take(index.interest_counts, rows))
+
+        # Collaborative: industries, experience, work style, interaction history
+        collab = np.zeros(len(content))
+        if self.context.industries:
+            industry_match = _take(self.industry_hits, rows) / len(self.context.industries)
+            collab = collab + np.where(_take(index.industry_counts, rows) > 0, 0.40 * industry_match, 0.0)
+        collab = collab + terms['exp_row'][_take(index.exp_codes, rows)]
+        collab = collab + terms['style_row'][_take(index.style_codes, rows)]
+        collab = index._blend_history(collab, terms['history'], rows)
+
+        return content, collab
+
+    def _shift_hits(self, hits: np.ndarray, postings, old_ids: np.ndarray, new_ids: np.ndarray) -> List[np.ndarray]:
+        """Apply added and removed terms to per-career hit counts; returns the careers touched"""
+        touched = []
+        for term_ids, sign in ((np.setdiff1d(new_ids, old_ids), 1), (np.setdiff1d(old_ids, new_ids), -1)):
+            careers, counts = self.index._postings_overlap(postings, term_ids)
+            hits[careers] += sign * counts.astype(np.int32)
+            touched.append(careers)
+        return touched
+
+    def update(self, recommender, profile: Dict) -> int:
+        """
+        Move the session to an edited profile.
+
+        Returns the number of careers rescored.
+        """
+        context = ProfileContext(profile)
+        if recommender is not self.recommender or self._history_version(context) != self.history_version:
+            self.rebuild(recommender, profile)
+            return self.rescored
+
+        previous_context, previous = self.context, self.terms
+        self._set_profile(profile, context)
+        terms, index = self.terms, self.index
+
+        # 1. Skills and interests: walk the postings of the terms that came or went
+        rows = self._shift_hits(self.skill_hits, index.skill_postings, previous['skills'], terms['skills'])
+        rows += self._shift_hits(self.interest_hits, index.interest_postings, previous['interests'], terms['interests'])
+
+        # 2. Table-driven components: careers whose distinct value now scores differently
+        for name in ('edu', 'field', 'exp', 'style'):
+            changed = np.flatnonzero(terms[f'{name}_row'] != previous[f'{name}_row'])
+            if len(changed):
+                rows.append(index.careers_with_codes(f'{name}_codes', changed))
+
+        # 3. Industries: the overlap's denominator may have changed too, so every holder of an old or new one
+        if context.industries != previous_context.industries:
+            careers = index.industry_careers(np.union1d(previous['industries'], terms['industries']))
+            self.industry_hits[careers] = _take(index.industry_matrix, careers) @ self._industry_vector()
+            rows.append(careers)
+
+        rows = _union(rows)
+        if len(rows):
+            content, collab = self._compose(rows)
+            self.hybrid[rows] = recommender.CONTENT_WEIGHT * content + recommender.COLLAB_WEIGHT * collab
+        self.rescored = len(rows)
+        return self.rescored
+
+    def recommend(self, top_n: int = 5, offset: int = 0) -> List[Dict]:
+        """Recommendations for the current profile (ranks offset .. offset + top_n), as HybridRecommender.recommend()"""
+        top = top_k_indices(self.hybrid, offset + top_n)[offset:]
+        content, collab = self._compose(top)
+        return self.recommender._build_recommendations(self.context, top, content, collab, self.hybrid[top])
@@ -0,0 +1,301 @@
+"""
+Term Vocabulary
+Canonical skill/interest IDs with alias and typo-tolerant lookup, and packed bitsets over them
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Common alternative names -> canonical name (applies when the canonical name is in the catalog)
+ALIASES = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'golang': 'go',
+    'k8s': 'kubernetes',
+    'postgres': 'postgresql',
+    'py': 'python',
+    'cpp': 'c++',
+    'csharp': 'c#',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+    'ui': 'ui design',
+    'ux': 'ux design',
+    'seo': 'search engine optimization',
+    'pm': 'project management',
+    'stats': 'statistics',
+    'dataviz': 'data visualization',
+    'tf': 'tensorflow',
+    'sklearn': 'scikit-learn'
+}
+
+# Fuzzy lookup: candidates must share enough trigrams, then pass an edit-distance check
+MIN_TRIGRAM_SIMILARITY = 0.3
+FUZZY_CANDIDATES = 8
+
+_KEY_SEPARATORS = re.compile(r'[\s.\-_/]+')
+_DIGITS = re.compile(r'\d+')
+
+def term_key(term: str) -> str:
+    """Lookup key: lower-cased, without spaces, dots, hyphens, underscores or slashes ('React.js' -> 'reactjs')"""
+    return _KEY_SEPARATORS.sub('', term.strip().lower())
+
+def _variants(key: str) -> List[str]:
+    """Spellings that mean the same term: with/without a 'js' suffix, singular/plural"""
+    variants = [key[:-2]] if key.endswith('js') and len(key) > 4 else [key + 'js']
+    if key.endswith('s') and not key.endswith('ss') and len(key) > 4:
+        variants.append(key[:-1])
+    elif not key.endswith('s'):
+        variants.append(key + 's')
+    return variants
+
+def _trigrams(key: str) -> List[str]:
+    padded = f'  {key} '
+    return list({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+def _max_edits(key: str) -> int:
+    """
+    Typos tolerated for a key of this length.
+
+    Keys under 5 characters must match exactly (or through an alias): one
+    edit away from a short name is usually another skill ('rust' / 'rest',
+    'java' / 'jira'), not a typo.
+    """
+    return 0 if len(key) < 5 else 1 if len(key) < 8 else 2
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent transpositions count once), capped at limit + 1"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class TermVocabulary:
+    """
+    Canonical terms with dense integer IDs.
+
+    Catalog terms are added with add(): spellings that resolve to a known
+    term (same key, 'js' suffix or plural variant, or an ALIASES entry)
+    share its ID, anything else becomes a new canonical term. add_all()
+    adds a whole catalog's terms so that the result does not depend on
+    the order they appear in. User-entered
+    terms are looked up with resolve(), which additionally tolerates typos:
+    a trigram index shortlists similar canonical terms and the closest one
+    within a small edit distance wins. Terms under 5 characters and numbers
+    must match exactly, so 'Rust' never resolves to 'REST' nor 'Python 3'
+    to 'Python 2'.
+    """
+
+    # Cap on remembered resolve() results (cleared when reached)
+    MAX_RESOLVED = 100_000
+
+    def __init__(self, terms: Iterable[str] = (), aliases: Dict[str, str] = None):
+        self.terms = []    # ID -> canonical term
+        self.ids = {}      # canonical term -> ID
+        self._keys = {}    # key -> ID
+        self._variants = {}
+        self._aliases = {term_key(a): term_key(c) for a, c in (ALIASES if aliases is None else aliases).items()}
+        self._resolved = {}
+        self._trigram_index = None
+
+        # Terms given up front are canonical as-is (e.g. a compiled vocabulary, in ID order)
+        for term in terms:
+            self._register(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @property
+    def n_words(self) -> int:
+        """64-bit words in a packed bitset over this vocabulary"""
+        return (len(self.terms) + 63) // 64
+
+    def _register(self, term: str) -> int:
+        term_id = len(self.terms)
+        self.terms.append(term)
+        self.ids[term] = term_id
+        key = term_key(term)
+        self._keys.setdefault(key, term_id)
+        for variant in _variants(key):
+            self._variants.setdefault(variant, term_id)
+        self._resolved.clear()
+        self._trigram_index = None
+        return term_id
+
+    def _exact(self, term: str) -> Optional[int]:
+        term_id = self.ids.get(term)
+        if term_id is not None:
+            return term_id
+        key = term_key(term)
+        term_id = self._keys.get(key)
+        if term_id is None:
+            term_id = self._keys.get(self._aliases.get(key))
+        if term_id is None:
+            term_id = self._variants.get(key)
+        return term_id
+
+    def add(self, term: str) -> int:
+        """ID of a catalog term (lower-cased), registering it as canonical if it matches nothing known"""
+        term = term.lower()
+        term_id = self._exact(term)
+        return term_id if term_id is not None else self._register(term)
+
+    def add_all(self, terms: Iterable[str]):
+        """
+        Add catalog terms, preferred spellings first.
+
+        Which spelling of a group becomes canonical (and which groups merge)
+        depends on what is already registered, so terms are added in an
+        order fixed by the terms themselves: alias names after everything
+        else, then shorter keys before their variants, then alphabetically.
+        """
+        distinct = {term.lower() for term in terms}
+        for term in sorted(distinct, key=lambda t: (term_key(t) in self._aliases, len(term_key(t)), t)):
+            self.add(term)
+
+    def canonical(self, term: str) -> str:
+        """Canonical spelling of a catalog term (see add())"""
+        return self.terms[self.add(term)]
+
+    def resolve(self, term: str, fuzzy: bool = True) -> Optional[int]:
+        """ID of a user-entered term, or None when nothing in the vocabulary is close enough"""
+        term = term.lower()
+        term_id = self.ids.get(term)
+        if term_id is not None or not fuzzy:
+            return term_id if term_id is not None else self._exact(term)
+
+        if term in self._resolved:
+            return self._resolved[term]
+        term_id = self._exact(term)
+        if term_id is None:
+            term_id = self._closest(term_key(term))
+        if len(self._resolved) >= self.MAX_RESOLVED:
+            self._resolved.clear()
+        self._resolved[term] = term_id
+        return term_id
+
+    def encode(self, terms: Iterable[str], fuzzy: bool = True) -> np.ndarray:
+        """Sorted distinct IDs of the terms that resolve"""
+        ids = {self.resolve(term, fuzzy) for term in terms}
+        ids.discard(None)
+        return np.array(sorted(ids), dtype=np.int64)
+
+    def bitset(self, ids: np.ndarray) -> np.ndarray:
+        """Packed bitset (uint64 words) with the given IDs set"""
+        bits = np.zeros(self.n_words, dtype=np.uint64)
+        np.bitwise_or.at(bits, ids >> 6, np.left_shift(np.uint64(1), (ids & 63).astype(np.uint64)))
+        return bits
+
+    def _closest(self, key: str) -> Optional[int]:
+        limit = _max_edits(key)
+        if limit == 0:
+            return None
+        if self._trigram_index is None:
+            self._trigram_index = self._build_trigram_index()
+        postings, gram_ids, gram_counts, keys = self._trigram_index
+
+        # 1. Shortlist by shared trigrams (Dice coefficient)
+        query = [gram_ids[g] for g in _trigrams(key) if g in gram_ids]
+        if not query:
+            return None
+        shared = np.asarray(postings[query].sum(axis=0)).ravel()
+        similarity = 2 * shared / (len(_trigrams(key)) + gram_counts)
+        candidates = np.flatnonzero(similarity >= MIN_TRIGRAM_SIMILARITY)
+        candidates = candidates[np.argsort(-similarity[candidates], kind='stable')[:FUZZY_CANDIDATES]]
+
+        # 2. Closest within the edit budget; numbers must agree
+        digits = _DIGITS.findall(key)
+        best, best_distance = None, limit + 1
+        for candidate in candidates.tolist():
+            candidate_key = keys[candidate]
+            if _DIGITS.findall(candidate_key) != digits:
+                continue
+            distance = _edit_distance(key, candidate_key, limit)
+            if distance < best_distance:
+                best, best_distance = candidate, distance
+        return self._keys[keys[best]] if best is not None else None
+
+    def _build_trigram_index(self) -> Tuple:
+        """(key x trigram) postings matrix over the canonical keys long enough for fuzzy matching"""
+        keys = [key for key in self._keys if _max_edits(key) > 0]
+        gram_ids, rows, cols = {}, [], []
+        for row, key in enumerate(keys):
+            for gram in _trigrams(key):
+                rows.append(row)
+                cols.append(gram_ids.setdefault(gram, len(gram_ids)))
+        postings = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (cols, rows)), shape=(len(gram_ids), len(keys))
+        )
+        gram_counts = np.bincount(np.asarray(rows, dtype=np.int64), minlength=len(keys))
+        return postings, gram_ids, gram_counts, keys
+
+class BitsetRows:
+    """
+    Per-career packed bitsets over a vocabulary, stored sparsely.
+
+    Only each row's non-zero 64-bit words are kept (word index plus mask,
+    CSR-style), so memory follows the number of terms rather than the
+    vocabulary size. Against a profile's dense bitset, overlap is a
+    popcount of AND and missing terms come from AND-NOT.
+    """
+
+    def __init__(self, indptr: np.ndarray, words: np.ndarray, masks: np.ndarray):
+        self.indptr = indptr
+        self.words = words
+        self.masks = masks
+
+    @classmethod
+    def from_matrix(cls, matrix: sparse.csr_matrix) -> 'BitsetRows':
+        """Pack the rows of a binary (rows x terms) matrix"""
+        if not matrix.has_sorted_indices:
+            matrix = matrix.sorted_indices()
+        words = (matrix.indices >> 6).astype(np.int32)
+
+        # With sorted indices a row's terms in the same word are adjacent: each run is one mask
+        starts = np.ones(len(words), dtype=bool)
+        starts[1:] = words[1:] != words[:-1]
+        starts[matrix.indptr[:-1][np.diff(matrix.indptr) > 0]] = True
+        starts = np.flatnonzero(starts)
+
+        bits = np.left_shift(np.uint64(1), (matrix.indices & 63).astype(np.uint64))
+        masks = np.bitwise_or.reduceat(bits, starts) if len(starts) else np.empty(0, dtype=np.uint64)
+        indptr = np.searchsorted(starts, matrix.indptr).astype(np.int64)
+        return cls(indptr, words[starts], masks)
+
+    def size(self, row: int) -> int:
+        """Number of terms in a row"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return int(np.bitwise_count(self.masks[start:end]).sum())
+
+    def overlap(self, row: int, bits: np.ndarray) -> int:
+        """Number of the row's terms set in a profile bitset"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        return int(np.bitwise_count(self.masks[start:end] & bits[self.words[start:end]]).sum())
+
+    def missing(self, row: int, bits: np.ndarray) -> np.ndarray:
+        """IDs of the row's terms not set in a profile bitset, ascending"""
+        start, end = self.indptr[row], self.indptr[row + 1]
+        rest = self.masks[start:end] & ~bits[self.words[start:end]]
+        word_rows, bit_positions = np.nonzero(
+            np.unpackbits(rest.astype('<u8', copy=False).view(np.uint8).reshape(-1, 8), axis=1, bitorder='little')
+        )
+        return self.words[start:end][word_rows].astype(np.int64) * 64 + bit_positions
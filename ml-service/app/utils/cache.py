@@ -0,0 +1,304 @@
+"""
+Result Caching Utilities
+Profile-fingerprint keyed cache with an in-process LRU tier, optional Redis tier and in-flight request coalescing
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+def profile_fingerprint(profile: Dict) -> str:
+    """
+    Canonical hash of a user profile.
+
+    Keys are sorted and list fields are order-normalized (every consumer
+    treats them as sets or only counts them), so equivalent profiles share
+    a fingerprint. Values are otherwise kept as-is; skill and interest
+    case is normalized because all matching is case-insensitive.
+    """
+    normalized = {}
+    for key, value in profile.items():
+        if key in ('skills', 'interests'):
+            value = sorted(v.lower() for v in value)
+        elif isinstance(value, list):
+            value = sorted(value, key=lambda v: json.dumps(v, sort_keys=True))
+        normalized[key] = value
+
+    canonical = json.dumps(normalized, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class LRUCache:
+    """
+    Bounded in-process cache with least-recently-used eviction and a TTL.
+
+    Thread-safe; values are stored as-is, so callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 300):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class RedisCache:
+    """
+    Shared cache tier backed by Redis.
+
+    Works with any client exposing redis-py's get(key) and
+    set(key, value, ex=seconds), so an in-memory stand-in can replace a
+    real server. Values are stored as JSON. Redis errors are logged and
+    treated as misses so an outage never fails a request; after one, the
+    tier is skipped for retry_seconds so a dead server isn't waited on
+    (up to the client's socket timeout) by every request. Calls block, so
+    async callers run them on a thread (see ResultCache.get_async).
+    """
+
+    def __init__(self, client, ttl_seconds: float = 300, prefix: str = 'ml-cache', retry_seconds: float = 5.0):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.retry_seconds = retry_seconds
+        self._retry_at = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def _failed(self, operation: str, error: Exception):
+        print(f"Warning: Redis cache {operation} failed, skipping Redis for {self.retry_seconds:g}s: {error}")
+        self._retry_at = time.monotonic() + self.retry_seconds
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self._available():
+            return None
+        try:
+            raw = self.client.get(f"{self.prefix}:{key}")
+        except Exception as e:
+            self._failed('get', e)
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any):
+        if not self._available():
+            return
+        try:
+            self.client.set(f"{self.prefix}:{key}", json.dumps(value), ex=int(self.ttl_seconds))
+        except Exception as e:
+            self._failed('set', e)
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical async computations.
+
+    The first caller for a key starts the computation as its own task;
+    callers arriving while it runs await that same task instead of
+    recomputing. A caller that gives up (e.g. a cancelled request) does not
+    cancel the shared work. Keys are dropped once their task finishes, so
+    nothing is cached here. Bound to one event loop; not thread-safe.
+    """
+
+    def __init__(self):
+        self._tasks = {}
+        self.stats = {'leaders': 0, 'coalesced': 0}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(compute())
+            self._tasks[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.stats['leaders'] += 1
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the outcome as seen even when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+class ResultCache:
+    """
+    Two-tier result cache keyed on (namespace, catalog version, profile fingerprint).
+
+    Lookups try the local LRU first, then Redis (if configured), and a
+    Redis hit is copied into the local tier. Keys embed the catalog
+    version, so entries from an older catalog are never served; switching
+    versions also drops the local tier.
+
+    Async misses are coalesced (see SingleFlight): concurrent requests for
+    the same key share one computation, which stores the result for
+    later requests.
+    """
+
+    def __init__(self, local: LRUCache, remote: RedisCache = None, catalog_version: str = ''):
+        self.local = local
+        self.remote = remote
+        self.catalog_version = catalog_version
+        self._lock = threading.Lock()
+        self.stats = {'localHits': 0, 'remoteHits': 0, 'misses': 0}
+        self.in_flight = SingleFlight()
+
+    def key(self, namespace: str, profile: Dict, catalog_version: str = None) -> str:
+        version = self.catalog_version if catalog_version is None else catalog_version
+        return f"{namespace}:{version}:{profile_fingerprint(profile)}"
+
+    def set_catalog_version(self, catalog_version: str):
+        """Invalidate cached results when the careers catalog changes"""
+        if catalog_version != self.catalog_version:
+            self.catalog_version = catalog_version
+            self.local.clear()
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self._count('localHits')
+        return value
+
+    def _settle_remote(self, key: str, value: Optional[Any]) -> Optional[Any]:
+        """Count a lookup that missed the local tier; a Redis hit is copied into it"""
+        if value is None:
+            self._count('misses')
+            return None
+        self._count('remoteHits')
+        self.local.set(key, value)
+        return value
+
+    def get(self, key: str) -> Optional[Any]:
+        """Look a key up in both tiers (counted as a hit or a miss)"""
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        return self._settle_remote(key, self.remote.get(key) if self.remote is not None else None)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """get() for the event loop: the Redis lookup runs on a thread"""
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        remote_value = await asyncio.to_thread(self.remote.get, key) if self.remote is not None else None
+        return self._settle_remote(key, remote_value)
+
+    def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        if self.remote is not None:
+            self.remote.set(key, value)
+
+    def set_async(self, key: str, value: Any):
+        """set() for the event loop: the Redis write runs on a thread in the background"""
+        self.local.set(key, value)
+        if self.remote is not None:
+            asyncio.get_running_loop().run_in_executor(None, self.remote.set, key, value)
+
+    def get_or_compute(self, namespace: str, profile: Dict, compute: Callable[[], Any],
+                       catalog_version: str = None) -> Any:
+        """
+        Return the cached result for this profile, computing and storing it on a miss.
+
+        Pass the version of the catalog snapshot the request is served from,
+        so a request still running on an old snapshot never stores its
+        result under the new version.
+        """
+        key = self.key(namespace, profile, catalog_version)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    async def get_or_compute_async(self, namespace: str, profile: Dict, compute: Callable[[], Awaitable[Any]],
+                                   catalog_version: str = None) -> Any:
+        """
+        get_or_compute for an async compute function (e.g. a micro-batched scorer).
+
+        On a miss, identical requests already in flight are awaited instead
+        of computed again.
+        """
+        key = self.key(namespace, profile, catalog_version)
+        value = await self.get_async(key)
+        if value is None:
+            value = await self.in_flight.do(key, lambda: self._compute_and_store(key, compute))
+        return value
+
+    async def _compute_and_store(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        self.set_async(key, value)
+        return value
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['localHits'] + stats['remoteHits'] + stats['misses']
+        stats['hitRatio'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        stats['coalesced'] = self.in_flight.stats['coalesced']
+        stats['inFlight'] = len(self.in_flight)
+        stats['localEntries'] = len(self.local)
+        stats['remoteEnabled'] = self.remote is not None
+        stats['catalogVersion'] = self.catalog_version
+        return stats
+
+def create_result_cache(catalog_version: str) -> ResultCache:
+    """
+    Build the service cache from environment settings.
+
+    - ML_CACHE_MAX_ENTRIES: local LRU size (default 2048)
+    - ML_CACHE_TTL_SECONDS: entry lifetime for both tiers (default 300)
+    - REDIS_URL: enables the Redis tier when set
+    - ML_REDIS_TIMEOUT_SECONDS: Redis connect and socket timeout (default 0.1)
+    """
+    ttl_seconds = float(os.getenv('ML_CACHE_TTL_SECONDS', '300'))
+    local = LRUCache(int(os.getenv('ML_CACHE_MAX_ENTRIES', '2048')), ttl_seconds)
+
+    remote = None
+    redis_url = os.getenv('REDIS_URL')
+    if redis_url:
+        try:
+            import redis
+            timeout = float(os.getenv('ML_REDIS_TIMEOUT_SECONDS', '0.1'))
+            client = redis.Redis.from_url(redis_url, socket_timeout=timeout, socket_connect_timeout=timeout)
+            remote = RedisCache(client, ttl_seconds)
+        except Exception as e:
+            print(f"Warning: Redis cache disabled: {e}")
+
+    return ResultCache(local, remote, catalog_version)
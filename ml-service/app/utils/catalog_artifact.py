@@ -0,0 +1,218 @@
+"""
+Compiled Catalog Artifacts
+Versioned on-disk catalog snapshots that worker processes memory-map and share
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections.abc import Sequence
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from ..models.catalog_index import CatalogIndex
+from ..models.collaborative import career_ids
+from .data_loader import compute_catalog_version
+from .serialization import CareerRecord
+
+try:
+    import fcntl
+except ImportError:  # Windows: compiles are still published atomically, just not serialized
+    fcntl = None
+
+# Bump when the on-disk layout or CatalogIndex's compiled state changes
+ARTIFACT_FORMAT = 4
+
+MANIFEST_FILE = 'manifest.json'
+
+class CompiledCatalog(Sequence):
+    """
+    A careers catalog opened from a compiled artifact.
+
+    Behaves like the careers_data list: len() and indexing return career
+    dicts (CareerRecords), decoded on access from one memory-mapped JSON
+    blob, so workers share the records' pages instead of each holding its
+    own dicts. Also
+    carries the catalog version, the memory-mapped CatalogIndex
+    (catalog_index; Sequence already defines index()) and the career IDs
+    (career_ids), so models keyed by career need not decode every record.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.version = self.manifest['version']
+
+        self._blob = _load_array(path, 'careers_blob')
+        self._offsets = _load_array(path, 'careers_offsets')
+
+        with open(os.path.join(path, 'vocabs.json'), 'r', encoding='utf-8') as f:
+            vocabs = json.load(f)
+        matrices = {
+            name: _load_matrix(path, name, layout['format'], layout['shape'])
+            for name, layout in self.manifest['matrices'].items()
+        }
+        arrays = {name: _load_array(path, name) for name in CatalogIndex.ARRAY_FIELDS}
+        self.catalog_index = CatalogIndex.from_compiled(self, matrices, arrays, vocabs)
+        self._career_ids = None
+
+    @property
+    def career_ids(self) -> List[str]:
+        """Career IDs as strings, in catalog order (read on first use)"""
+        if self._career_ids is None:
+            with open(os.path.join(self.path, 'career_ids.json'), 'r', encoding='utf-8') as f:
+                self._career_ids = json.load(f)
+        return self._career_ids
+
+    def raw(self, i: int) -> bytes:
+        """Serialized JSON of one career"""
+        return self._blob[self._offsets[i]:self._offsets[i + 1]].tobytes()
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('career index out of range')
+        return CareerRecord(json.loads(self.raw(i)), self, i)
+
+def _load_array(path: str, name: str) -> np.ndarray:
+    # Read-only memory map; pages are shared with every other process mapping the file
+    return np.asarray(np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+def _load_matrix(path: str, name: str, fmt: str, shape: List[int]):
+    data, indices, indptr = (_load_array(path, f'{name}.{part}') for part in ('data', 'indices', 'indptr'))
+    matrix_class = sparse.csr_matrix if fmt == 'csr' else sparse.csc_matrix
+    matrix = matrix_class((data, indices, indptr), shape=tuple(shape))
+    # Compiled matrices are canonical; flag them so scipy never sorts the read-only buffers in place
+    matrix.has_sorted_indices = True
+    matrix.has_canonical_format = True
+    return matrix
+
+def source_key(careers_file: Optional[str]) -> Optional[str]:
+    """
+    Artifact key for a catalog file, from its path, size and mtime.
+
+    Lets a worker find an already compiled artifact with one stat() call
+    instead of parsing the catalog. None when the file doesn't exist.
+    """
+    if not careers_file:
+        return None
+    try:
+        stat = os.stat(careers_file)
+    except OSError:
+        return None
+    signature = f"{ARTIFACT_FORMAT}:{os.path.abspath(careers_file)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:16]
+
+def write_catalog_artifact(artifact_dir: str, careers_data: List[Dict], key: str) -> str:
+    """
+    Compile a catalog and write it as artifact `key` under artifact_dir.
+
+    Files are written to a temporary directory and renamed into place, so
+    readers only ever see complete artifacts. Returns the artifact path.
+    """
+    path = os.path.join(artifact_dir, f'catalog-{key}')
+    if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+        return path
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    index = CatalogIndex(careers_data)
+    staging = tempfile.mkdtemp(prefix='.catalog-', dir=artifact_dir)
+
+    try:
+        # Career records as one JSON blob plus offsets
+        records = [json.dumps(career, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+                   for career in careers_data]
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(r) for r in records])
+        np.save(os.path.join(staging, 'careers_blob.npy'), np.frombuffer(b''.join(records), dtype=np.uint8))
+        np.save(os.path.join(staging, 'careers_offsets.npy'), offsets)
+
+        matrices = {}
+        for name in CatalogIndex.MATRIX_FIELDS:
+            matrix = getattr(index, name)
+            matrices[name] = {'format': matrix.format, 'shape': list(matrix.shape)}
+            for part in ('data', 'indices', 'indptr'):
+                np.save(os.path.join(staging, f'{name}.{part}.npy'), getattr(matrix, part))
+        for name in CatalogIndex.ARRAY_FIELDS:
+            np.save(os.path.join(staging, f'{name}.npy'), getattr(index, name))
+
+        with open(os.path.join(staging, 'vocabs.json'), 'w', encoding='utf-8') as f:
+            json.dump({name: list(getattr(index, name)) for name in CatalogIndex.VOCAB_FIELDS}, f)
+        with open(os.path.join(staging, 'career_ids.json'), 'w', encoding='utf-8') as f:
+            json.dump(career_ids(careers_data), f)
+
+        manifest = {
+            'format': ARTIFACT_FORMAT,
+            'key': key,
+            'version': compute_catalog_version(careers_data),
+            'size': len(careers_data),
+            'matrices': matrices
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        os.rename(staging, path)
+    except OSError:
+        # Another process published the same artifact first
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            raise
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    return path
+
+def prune_artifacts(artifact_dir: str, current: str, keep: int = 3):
+    """Delete all but the `keep` most recently written artifacts, never the current one"""
+    try:
+        names = [n for n in os.listdir(artifact_dir) if n.startswith('catalog-')]
+    except OSError:
+        return
+
+    paths = sorted((os.path.join(artifact_dir, n) for n in names), key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        if path == current:
+            continue
+        # Workers that still map an old artifact keep their pages until they unmap
+        shutil.rmtree(path, ignore_errors=True)
+
+def load_compiled_catalog(artifact_dir: str, careers_file: Optional[str],
+                          loader: Callable[[], List[Dict]], keep: int = 3) -> CompiledCatalog:
+    """
+    Open the compiled artifact for the current catalog file, compiling it first if needed.
+
+    The first worker to see a catalog file compiles it (under a lock, so
+    other workers wait and then attach to the same artifact); every later
+    worker only memory-maps it. Catalogs without a backing file (mock
+    data) are keyed by content version instead.
+    """
+    key = source_key(careers_file)
+    if key is not None:
+        path = os.path.join(artifact_dir, f'catalog-{key}')
+        if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            return CompiledCatalog(path)
+
+    os.makedirs(artifact_dir, exist_ok=True)
+    with open(os.path.join(artifact_dir, '.lock'), 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        careers_data = loader()
+        if key is None:
+            key = f'data-{compute_catalog_version(careers_data)}'
+        path = write_catalog_artifact(artifact_dir, careers_data, key)
+        prune_artifacts(artifact_dir, path, keep)
+
+    return CompiledCatalog(path)
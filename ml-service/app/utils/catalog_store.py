@@ -0,0 +1,139 @@
+"""
+Catalog Store
+Versioned careers catalog snapshots with background reload and atomic swap
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .data_loader import compute_catalog_version
+from .serialization import CareerFragments
+
+class CatalogSnapshot:
+    """
+    One immutable catalog version and the scoring structures built from it.
+
+    Handlers read the store's current snapshot once per request, so a
+    request that started before a reload finishes on the snapshot it began
+    with.
+    """
+
+    def __init__(self, careers_data: List[Dict], recommender: Any, version: str):
+        self.careers_data = careers_data
+        self.recommender = recommender
+        self.version = version
+        self.loaded_at = time.time()
+        # Serialized careers for responses, filled in as careers are first returned
+        self.fragments = CareerFragments(careers_data)
+
+class CatalogStore:
+    """
+    Double-buffered holder for the active catalog snapshot.
+
+    A reload loads the catalog and builds its scoring structures off to the
+    side, then publishes the new snapshot with a single reference swap;
+    readers never see a half-built catalog. An optional watcher thread polls
+    the catalog file's modification time and reloads on change.
+    """
+
+    def __init__(self, loader: Callable[[], List[Dict]], builder: Callable[[List[Dict]], Any],
+                 initial_data: Optional[List[Dict]] = None, watch_path: Optional[str] = None,
+                 poll_interval: float = 5.0):
+        self.loader = loader
+        self.builder = builder
+        self.watch_path = watch_path
+        self.poll_interval = poll_interval
+
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self._stop = threading.Event()
+        self._watcher = None
+        self._last_mtime = self._file_mtime()
+
+        self.current = self._build(loader() if initial_data is None else initial_data)
+        self.last_error = None
+
+    def _build(self, careers_data: List[Dict]) -> CatalogSnapshot:
+        # Compiled catalogs carry their version; hashing them would decode every record
+        version = getattr(careers_data, 'version', None) or compute_catalog_version(careers_data)
+        return CatalogSnapshot(careers_data, self.builder(careers_data), version)
+
+    def _file_mtime(self) -> Optional[float]:
+        if not self.watch_path:
+            return None
+        try:
+            return os.stat(self.watch_path).st_mtime
+        except OSError:
+            return None
+
+    def on_swap(self, listener: Callable[[CatalogSnapshot], None]):
+        """Register a callback run after each new snapshot is published"""
+        self._listeners.append(listener)
+
+    def reload(self) -> CatalogSnapshot:
+        """
+        Load and build a new snapshot, then swap it in.
+
+        Concurrent reloads are serialized. If the loaded catalog has the same
+        version as the current one, nothing is swapped. Loader or build
+        errors leave the current snapshot in place and are re-raised.
+        """
+        with self._reload_lock:
+            try:
+                snapshot = self._build(self.loader())
+            except Exception as e:
+                self.last_error = str(e)
+                raise
+
+            self.last_error = None
+            if snapshot.version == self.current.version:
+                return self.current
+
+            self.current = snapshot  # Atomic reference swap
+            for listener in self._listeners:
+                listener(snapshot)
+
+            print(f"Catalog reloaded: version {snapshot.version} ({len(snapshot.careers_data)} careers)")
+            return snapshot
+
+    def reload_in_background(self) -> threading.Thread:
+        """Run reload() on a background thread"""
+        def run():
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading careers catalog: {e}")
+
+        thread = threading.Thread(target=run, name='catalog-reload', daemon=True)
+        thread.start()
+        return thread
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            mtime = self._file_mtime()
+            # A missing file keeps the current catalog rather than swapping to fallback data
+            if mtime is None or mtime == self._last_mtime:
+                continue
+
+            self._last_mtime = mtime
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Error reloading careers catalog: {e}")
+
+    def start_watching(self):
+        """Start polling the catalog file for changes (no-op without a path or interval)"""
+        if not self.watch_path or self.poll_interval <= 0 or self._watcher is not None:
+            return
+
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name='catalog-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
@@ -3,19 +3,32 @@ Data Loading Utilities
 Loads career data from Next.js data files
 """
 
+import hashlib
 import json
 import os
 from typing import List, Dict
 
-def load_careers_data() -> List[Dict]:
+def get_careers_file() -> str:
     """
-    Load careers data from Next.js data directory.
+    Path of the careers catalog file.
     
-    Returns list of career objects with enhanced fields for ML.
+    Defaults to careers.json in the Next.js data directory; override with
+    the CAREERS_DATA_PATH environment variable.
     """
     # Path to Next.js data directory
     data_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'src', 'data')
-    careers_file = os.path.join(data_dir, 'careers.json')
+    return os.getenv('CAREERS_DATA_PATH', os.path.join(data_dir, 'careers.json'))
+
+def load_careers_data(strict: bool = False) -> List[Dict]:
+    """
+    Load careers data from Next.js data directory.
+    
+    Returns list of career objects with enhanced fields for ML. Falls back
+    to mock data when the file is missing or invalid, unless strict is set,
+    in which case the error is raised (used by reloads, which should keep
+    the current catalog rather than swap in mock data).
+    """
+    careers_file = get_careers_file()
     
     try:
         with open(careers_file, 'r', encoding='utf-8') as f:
@@ -30,14 +43,28 @@ def load_careers_data() -> List[Dict]:
         return careers_enhanced
     
     except FileNotFoundError:
+        if strict:
+            raise
         print(f"Warning: Careers file not found at {careers_file}")
         print("Using fallback mock data...")
         return get_mock_careers_data()
     
     except Exception as e:
+        if strict:
+            raise
         print(f"Error loading careers data: {e}")
         return get_mock_careers_data()
 
+def compute_catalog_version(careers: List[Dict]) -> str:
+    """
+    Content hash identifying a careers catalog snapshot.
+
+    Changes whenever any career changes, so caches keyed on it never
+    serve results computed from a different catalog.
+    """
+    canonical = json.dumps(careers, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
 def enhance_career_data(career: Dict) -> Dict:
     """
     Enhance career object with additional ML-relevant fields.
@@ -0,0 +1,133 @@
+"""
+Scoring Executor
+Bounded thread/process pool that keeps CPU-bound scoring off the event loop
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from .metrics import metrics
+
+class Overloaded(Exception):
+    """Raised when the scoring queue is full; the request should be retried later"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Scoring queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+class ScoringExecutor:
+    """
+    Runs scoring functions on a worker pool with a bounded admission queue.
+
+    At most max_workers tasks run at once and max_queue more may wait;
+    beyond that run() raises Overloaded immediately instead of letting
+    latency grow without limit. Retry-After is estimated from the queue
+    length and the recent mean task duration.
+
+    kind='process' sidesteps the GIL for pure-Python scoring; functions
+    and arguments must then be picklable (module-level functions, plain
+    data), and each worker process keeps its own catalog copy. Work that
+    must mutate objects in this process (scoring sessions) goes through
+    run_local(), which shares the admission limit but always uses threads.
+    Stage timings observed inside a worker process come back with the
+    result and are observed in this process, so /metrics sees them.
+    """
+
+    def __init__(self, kind: str = 'thread', max_workers: int = None, max_queue: int = 64):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+
+        pool_class = ProcessPoolExecutor if kind == 'process' else ThreadPoolExecutor
+        self._pool = pool_class(max_workers=self.max_workers)
+        self._local_pool = self._pool if kind == 'thread' else ThreadPoolExecutor(max_workers=self.max_workers)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._mean_seconds = 0.0
+        self.stats = {'completed': 0, 'rejected': 0}
+
+    def _admit(self):
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.stats['rejected'] += 1
+                raise Overloaded(self.retry_after())
+            self._in_flight += 1
+
+    def _release(self, seconds: float):
+        with self._lock:
+            self._in_flight -= 1
+            self.stats['completed'] += 1
+            # Exponentially weighted mean task time, for Retry-After estimates
+            self._mean_seconds = seconds if self.stats['completed'] == 1 else 0.9 * self._mean_seconds + 0.1 * seconds
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue should have drained (at least 1)"""
+        waves = self._in_flight / self.max_workers
+        return max(1, math.ceil(waves * self._mean_seconds))
+
+    async def _submit(self, pool, fn: Callable, *args) -> Any:
+        self._admit()
+        start = time.perf_counter()
+        try:
+            if pool is self._local_pool:
+                return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+            result, stages = await asyncio.get_running_loop().run_in_executor(pool, _run_recording_stages, fn, *args)
+            metrics.observe_stages(stages)
+            return result
+        finally:
+            self._release(time.perf_counter() - start)
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the pool and await its result (raises Overloaded when saturated)"""
+        return await self._submit(self._pool, fn, *args)
+
+    async def run_local(self, fn: Callable, *args) -> Any:
+        """run() on a thread of this process, for fn that mutates in-process state"""
+        return await self._submit(self._local_pool, fn, *args)
+
+    def queue_depth(self) -> int:
+        """Tasks admitted but not yet running"""
+        return max(0, self._in_flight - self.max_workers)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['inFlight'] = self._in_flight
+        stats['queueDepth'] = self.queue_depth()
+        stats['kind'] = self.kind
+        stats['maxWorkers'] = self.max_workers
+        stats['maxQueue'] = self.max_queue
+        stats['meanTaskMs'] = round(self._mean_seconds * 1000, 2)
+        return stats
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        if self._local_pool is not self._pool:
+            self._local_pool.shutdown(wait=False, cancel_futures=True)
+
+def _run_recording_stages(fn: Callable, *args):
+    """Process worker entry point: fn's result and the stage timings observed while computing it"""
+    return metrics.record_stages(fn, *args)
+
+def create_scoring_executor() -> ScoringExecutor:
+    """
+    Build the service executor from environment settings.
+
+    - ML_EXECUTOR: 'thread' (default) or 'process'
+    - ML_EXECUTOR_WORKERS: pool size (default: CPU count)
+    - ML_EXECUTOR_QUEUE: tasks allowed to wait beyond the pool size (default 64)
+    """
+    workers = os.getenv('ML_EXECUTOR_WORKERS')
+    return ScoringExecutor(
+        kind=os.getenv('ML_EXECUTOR', 'thread'),
+        max_workers=int(workers) if workers else None,
+        max_queue=int(os.getenv('ML_EXECUTOR_QUEUE', '64'))
+    )
@@ -0,0 +1,229 @@
+"""
+Metrics
+In-process counters, gauges and latency histograms rendered in Prometheus text format
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+
+# Latency buckets in seconds: 50us .. 10s, dense where scoring stages land
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic counter per label set"""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_values, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """
+    Cumulative-bucket histogram per label set.
+
+    observe() is a bisect plus two increments under a lock, cheap enough
+    to call on every request and scoring stage.
+    """
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bucket] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self._series.items())
+
+        for label_values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} {cumulative}")
+            labels = _format_labels(self.labels, label_values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Metrics:
+    """
+    The service's metric registry.
+
+    Request counters and latency histograms are fed by MetricsMiddleware,
+    scoring stages by observe_stage() at the instrumented call sites.
+    Stages observed in another process (a process-pool worker) are
+    recorded there with record_stages() and replayed here with
+    observe_stages(). Gauges (catalog size, cache hit ratio, executor queue depth) are read
+    from callbacks at scrape time, so they cost nothing between scrapes.
+    With enabled=False every observation is a no-op.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.requests = Counter('ml_requests_total', 'HTTP requests handled', ('endpoint', 'method', 'status'))
+        self.errors = Counter('ml_request_errors_total', 'HTTP requests that failed with a 5xx status', ('endpoint',))
+        self.request_latency = Histogram(
+            'ml_request_duration_seconds', 'HTTP request latency by endpoint', ('endpoint',)
+        )
+        self.stage_latency = Histogram(
+            'ml_stage_duration_seconds', 'Latency of request processing stages', ('stage',)
+        )
+        self._gauges = []  # (name, help, kind, labels, callback)
+        self._recording = threading.local()
+
+    def observe_request(self, endpoint: str, method: str, status: int, seconds: float):
+        if not self.enabled:
+            return
+        self.requests.inc(endpoint, method, str(status))
+        if status >= 500:
+            self.errors.inc(endpoint)
+        self.request_latency.observe(seconds, endpoint)
+
+    def observe_stage(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        recording = getattr(self._recording, 'stages', None)
+        if recording is not None:
+            recording.append((stage, seconds))
+        else:
+            self.stage_latency.observe(seconds, stage)
+
+    def record_stages(self, fn: Callable, *args) -> Tuple[object, List[Tuple[str, float]]]:
+        """Call fn(*args) and return (result, [(stage, seconds)]) instead of observing its stages here"""
+        self._recording.stages = stages = []
+        try:
+            return fn(*args), stages
+        finally:
+            self._recording.stages = None
+
+    def observe_stages(self, stages: List[Tuple[str, float]]):
+        """Observe stage timings returned by record_stages() in another process"""
+        for stage, seconds in stages:
+            self.observe_stage(stage, seconds)
+
+    def add_gauge(self, name: str, help: str, callback: Callable[[], object], kind: str = 'gauge',
+                  labels: Tuple[str, ...] = ()):
+        """
+        Register a value read at scrape time.
+
+        callback returns a number, or a dict of label values (tuples
+        matching `labels`) to numbers. kind='counter' exposes
+        monotonic totals kept elsewhere (e.g. cache stats).
+        """
+        self._gauges.append((name, help, kind, labels, callback))
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in (self.requests, self.errors, self.request_latency, self.stage_latency):
+            lines.extend(metric.render())
+
+        for name, help, kind, labels, callback in self._gauges:
+            try:
+                value = callback()
+            except Exception as e:
+                print(f"Warning: metric {name} unavailable: {e}")
+                continue
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            values = value.items() if isinstance(value, dict) else [((), value)]
+            for label_values, v in values:
+                lines.append(f"{name}{_format_labels(labels, label_values)} {_format_value(v)}")
+
+        return '\n'.join(lines) + '\n'
+
+class MetricsMiddleware:
+    """
+    ASGI middleware counting requests and timing them per endpoint.
+
+    Endpoints are labeled by route template (e.g. /api/ml/recommendations),
+    never the raw path, so label cardinality stays bounded; unmatched paths
+    share one "unmatched" label.
+    """
+
+    def __init__(self, app, metrics: 'Metrics', exclude: Tuple[str, ...] = ('/metrics',)):
+        self.app = app
+        self.metrics = metrics
+        self.exclude = exclude
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.metrics.enabled or scope['path'] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', None) or 'unmatched'
+            self.metrics.observe_request(endpoint, scope['method'], status, time.perf_counter() - start)
+
+# Shared registry; ML_METRICS=0 turns instrumentation off
+metrics = Metrics(enabled=os.getenv('ML_METRICS', '1') != '0')
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its JSON encoding time as the serialization stage"""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        metrics.observe_stage('serialization', time.perf_counter() - start)
+        return body
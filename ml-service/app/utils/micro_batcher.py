@@ -0,0 +1,100 @@
+"""
+Micro-Batching
+Coalesces concurrent requests into one vectorized scoring call
+"""
+
+import asyncio
+from typing import Any, Callable, List
+
+class MicroBatcher:
+    """
+    Collects items submitted by concurrent requests and processes them together.
+
+    Items wait in a queue until max_batch_size are pending or max_wait_ms
+    has passed since the first one arrived, then the whole queue is handed
+    to process_batch in one call. process_batch takes a list of items and
+    returns one result per item, in order; each caller gets its own result
+    (or the batch's exception).
+
+    With max_batch_size <= 1 items are processed one at a time, as if no
+    batcher were in place.
+
+    Batches run inline on the event loop, or on an executor (anything with
+    an async run(fn, *args), e.g. ScoringExecutor) so several batches can
+    be scored in parallel while the loop keeps serving requests.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, executor=None):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+
+        self._pending = []
+        self._timer = None
+        self._running = set()
+        self.stats = {'batches': 0, 'items': 0, 'maxBatchSize': 0}
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result"""
+        if self.max_batch_size <= 1:
+            self._count(1)
+            return (await self._execute([item]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        # Callers that gave up (client disconnects) don't need scoring
+        batch = [(item, future) for item, future in batch if not future.cancelled()]
+        if not batch:
+            return
+
+        self._count(len(batch))
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference until the batch finishes so the task isn't garbage collected
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _execute(self, items: List[Any]) -> List[Any]:
+        if self.executor is None:
+            return self.process_batch(items)
+        return await self.executor.run(self.process_batch, items)
+
+    async def _run(self, batch: List[tuple]):
+        try:
+            results = await self._execute([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _count(self, size: int):
+        self.stats['batches'] += 1
+        self.stats['items'] += size
+        self.stats['maxBatchSize'] = max(self.stats['maxBatchSize'], size)
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats['meanBatchSize'] = round(stats['items'] / stats['batches'], 2) if stats['batches'] else 0.0
+        stats['pending'] = len(self._pending)
+        return stats
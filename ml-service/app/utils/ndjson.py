@@ -0,0 +1,170 @@
+"""
+NDJSON Streaming
+Incremental line parsing for streamed request bodies and a streaming response
+"""
+
+import asyncio
+import json
+import tempfile
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi.responses import Response
+
+class LineTooLong(ValueError):
+    """A record exceeded the maximum line length and was skipped"""
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = 1 << 20) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into (line number, line) pairs, 1-based.
+
+    Blank lines are skipped (but counted). A line longer than
+    max_line_bytes is dropped as it streams in and yielded as None, so one
+    oversized record can't make the buffer grow without bound.
+    """
+    buffer = b''
+    line_no = 0
+    overflow = False
+
+    async for chunk in chunks:
+        if overflow:
+            # Keep discarding the oversized record until its newline arrives
+            end = chunk.find(b'\n')
+            if end < 0:
+                continue
+            overflow = False
+            line_no += 1
+            yield line_no, None
+            chunk = chunk[end + 1:]
+
+        lines = (buffer + chunk).split(b'\n')
+        buffer = lines.pop()
+        for line in lines:
+            line_no += 1
+            if len(line) > max_line_bytes:
+                yield line_no, None
+            elif line.strip():
+                yield line_no, line
+
+        if len(buffer) > max_line_bytes:
+            overflow = True
+            buffer = b''
+
+    if overflow:
+        yield line_no + 1, None
+    elif buffer.strip():
+        yield line_no + 1, buffer
+
+async def iter_records(chunks: AsyncIterator[bytes], batch_size: int,
+                       max_line_bytes: int = 1 << 20) -> AsyncIterator[List[Tuple[int, object]]]:
+    """
+    Decode NDJSON into batches of at most batch_size (line number, record) pairs.
+
+    Lines that aren't valid JSON (or are too long) come through as
+    (line number, exception) so callers can report them in place.
+    """
+    batch = []
+    async for line_no, line in iter_lines(chunks, max_line_bytes):
+        if line is None:
+            record = LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = e
+        batch.append((line_no, record))
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+class SpooledBuffer:
+    """
+    FIFO byte buffer between a producer and a consumer on the event loop.
+
+    Holds up to max_memory bytes in memory and spills the rest to a
+    temporary file, so a slow reader costs disk rather than RAM. Storage
+    is reclaimed whenever the reader catches up.
+    """
+
+    def __init__(self, max_memory: int = 8 << 20):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory)
+        self._read_pos = 0
+        self._write_pos = 0
+        self._closed = False
+        self._readable = asyncio.Event()
+
+    def write(self, data: bytes):
+        self._file.seek(self._write_pos)
+        self._file.write(data)
+        self._write_pos += len(data)
+        self._readable.set()
+
+    def close(self):
+        self._closed = True
+        self._readable.set()
+
+    async def chunks(self, size: int = 1 << 16) -> AsyncIterator[bytes]:
+        """Yield buffered bytes as they arrive until the producer closes the buffer"""
+        try:
+            while True:
+                if self._read_pos < self._write_pos:
+                    self._file.seek(self._read_pos)
+                    data = self._file.read(min(size, self._write_pos - self._read_pos))
+                    self._read_pos += len(data)
+                    if self._read_pos == self._write_pos:
+                        # Reader caught up: start over at the beginning of the file
+                        self._file.seek(0)
+                        self._file.truncate()
+                        self._read_pos = self._write_pos = 0
+                    yield data
+                elif self._closed:
+                    return
+                else:
+                    self._readable.clear()
+                    await self._readable.wait()
+        finally:
+            self._file.close()
+
+class NDJSONStreamResponse(Response):
+    """
+    Streams byte chunks from an async iterator as application/x-ndjson.
+
+    The iterator runs as its own task and its output is spooled (see
+    SpooledBuffer), so it keeps consuming the request body even when the
+    client only starts reading the response after uploading everything,
+    as most HTTP/1.1 clients do. Unlike StreamingResponse it never listens
+    for disconnects itself, since that would consume the request body the
+    iterator is still reading; a disconnect surfaces through the request
+    stream.
+    """
+
+    media_type = 'application/x-ndjson'
+
+    def __init__(self, body_iterator: AsyncIterator[bytes], status_code: int = 200):
+        super().__init__(content=None, status_code=status_code)
+        self.body_iterator = body_iterator
+        # Length is unknown up front; let the server use chunked encoding
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k != b'content-length']
+
+    async def __call__(self, scope, receive, send):
+        buffer = SpooledBuffer()
+
+        async def produce():
+            try:
+                async for chunk in self.body_iterator:
+                    buffer.write(chunk)
+            finally:
+                buffer.close()
+
+        producer = asyncio.create_task(produce())
+        try:
+            await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+            async for chunk in buffer.chunks():
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+            await producer
+        finally:
+            producer.cancel()
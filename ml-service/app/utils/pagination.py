@@ -0,0 +1,48 @@
+"""
+Pagination Utilities
+Opaque cursors for paging through ranked results
+"""
+
+import base64
+import json
+from typing import Optional
+
+class StaleCursor(ValueError):
+    """Raised for a cursor issued against a different catalog version than the one now served"""
+
+def encode_cursor(offset: int, catalog_version: str) -> str:
+    """Encode a result offset (and the catalog version it ranks against) as an opaque URL-safe cursor"""
+    payload = json.dumps({'o': offset, 'v': catalog_version}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: Optional[str], catalog_version: str, total: int) -> int:
+    """
+    Decode a cursor produced by encode_cursor into an offset.
+
+    Returns 0 for an empty cursor. Raises StaleCursor when the cursor was
+    issued for another catalog version (its ranking no longer applies, so
+    continuing would skip or repeat careers), and ValueError for a
+    malformed cursor or an offset outside the catalog's `total` careers.
+    """
+    if not cursor:
+        return 0
+
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        offset, version = payload['o'], payload.get('v')
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    # bool is an int subclass; a cursor never holds one
+    if isinstance(offset, bool) or not isinstance(offset, int) or not 0 <= offset < total:
+        raise ValueError("Invalid cursor")
+    if version != catalog_version:
+        raise StaleCursor("Cursor is from a previous catalog version; request the first page again")
+
+    return offset
+
+def next_cursor(offset: int, limit: int, total: int, catalog_version: str) -> Optional[str]:
+    """Cursor for the page after [offset, offset + limit), or None at the end"""
+    next_offset = offset + limit
+    return encode_cursor(next_offset, catalog_version) if next_offset < total else None
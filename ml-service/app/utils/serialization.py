@@ -0,0 +1,145 @@
+"""
+Response Serialization
+Fast JSON encoding with cached per-career fragments spliced into responses
+"""
+
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+FIELD_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+def encode_json(value: Any) -> bytes:
+    """Compact JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a `fields=` query value ("id,title,category") into a field tuple.
+
+    None or empty means the whole career record. Raises ValueError on
+    malformed names.
+    """
+    if not fields:
+        return None
+
+    names = tuple(dict.fromkeys(name.strip() for name in fields.split(',') if name.strip()))
+    invalid = [name for name in names if not FIELD_NAME.match(name)]
+    if invalid:
+        raise ValueError(f"Invalid career field name(s): {', '.join(invalid)}")
+    return names or None
+
+class CareerRecord(dict):
+    """
+    A career decoded from a compiled catalog, remembering where it came from.
+
+    Compiled catalogs decode a fresh dict on every access, so the record
+    carries its catalog and position for CareerFragments to find its
+    cached fragment. Pickles (and JSON-encodes) as a plain dict.
+    """
+
+    __slots__ = ('catalog', 'position')
+
+    def __init__(self, data: Dict, catalog: Any, position: int):
+        super().__init__(data)
+        self.catalog = catalog
+        self.position = position
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+class CareerFragments:
+    """
+    Serialized JSON of each career in one catalog snapshot, built on demand.
+
+    Each career is encoded at most once per field selection (compiled
+    catalogs already store every record's full JSON, which is used as-is),
+    then spliced into responses as bytes. Selections are kept for the
+    max_field_sets most recently used field lists.
+    """
+
+    def __init__(self, careers_data, max_field_sets: int = 16):
+        self.careers_data = careers_data
+        self.max_field_sets = max_field_sets
+        self._positions = None
+        self._field_sets = OrderedDict()  # fields tuple (None = all) -> {position: bytes}
+        self._lock = threading.Lock()
+
+    def position(self, career: Dict) -> Optional[int]:
+        """Index of a career object in this catalog, or None if it came from elsewhere"""
+        if isinstance(career, CareerRecord):
+            return career.position if career.catalog is self.careers_data else None
+
+        if self._positions is None:
+            # In-memory catalogs hand out the same dicts every time, so identity finds them
+            self._positions = {id(c): i for i, c in enumerate(self.careers_data)}
+        position = self._positions.get(id(career))
+        if position is None or self.careers_data[position] is not career:
+            return None
+        return position
+
+    def _cache(self, fields: Optional[Tuple[str, ...]]) -> Dict[int, bytes]:
+        with self._lock:
+            cache = self._field_sets.get(fields)
+            if cache is None:
+                cache = self._field_sets[fields] = {}
+                while len(self._field_sets) > self.max_field_sets:
+                    self._field_sets.popitem(last=False)
+            else:
+                self._field_sets.move_to_end(fields)
+            return cache
+
+    def fragment(self, career: Dict, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """JSON of a career (only `fields` when given), cached when it belongs to this catalog"""
+        position = self.position(career)
+        if position is None:
+            return encode_json(select_fields(career, fields))
+
+        cache = self._cache(fields)
+        fragment = cache.get(position)
+        if fragment is None:
+            raw = getattr(self.careers_data, 'raw', None)
+            if fields is None and raw is not None:
+                fragment = raw(position)
+            else:
+                fragment = encode_json(select_fields(career, fields))
+            cache[position] = fragment
+        return fragment
+
+def select_fields(career: Dict, fields: Optional[Tuple[str, ...]]) -> Dict:
+    """The career restricted to `fields` (missing fields are left out)"""
+    if fields is None:
+        return career
+    return {name: career[name] for name in fields if name in career}
+
+def render_recommendations(recommendations: List[Dict], fragments: CareerFragments,
+                           fields: Optional[Tuple[str, ...]] = None) -> bytes:
+    """
+    JSON array of recommendation objects with career fragments spliced in.
+
+    Equivalent to encoding the list directly (with each career restricted
+    to `fields`), but only the small per-request part of each
+    recommendation is encoded.
+    """
+    parts = []
+    for recommendation in recommendations:
+        career = fragments.fragment(recommendation['career'], fields)
+        rest = encode_json({k: v for k, v in recommendation.items() if k != 'career'})
+        parts.append(b'{"career":' + career + (b',' + rest[1:] if len(rest) > 2 else b'}'))
+    return b'[' + b','.join(parts) + b']'
+
+def render_object(members: Dict[str, Any], raw: Dict[str, bytes]) -> bytes:
+    """JSON object of `members` in order, with the members named in `raw` inserted as pre-encoded bytes"""
+    return b'{' + b','.join(
+        encode_json(name) + b':' + (raw[name] if name in raw else encode_json(value))
+        for name, value in members.items()
+    ) + b'}'
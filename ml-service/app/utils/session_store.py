@@ -0,0 +1,111 @@
+"""
+Session Storage
+Memory-bounded LRU of scoring sessions with idle expiry
+"""
+
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+class SessionStore:
+    """
+    Sessions by ID with least-recently-used eviction.
+
+    Bounded by the memory sessions hold (their nbytes) rather than their
+    count, since a session's size grows with the catalog. Sessions idle
+    for longer than ttl_seconds expire. The most recently stored session
+    is always kept, even on its own over budget. Thread-safe.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, ttl_seconds: float = 1800):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()  # ID -> (expires at, size, session)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'created': 0, 'evicted': 0, 'expired': 0}
+
+    def _drop(self, session_id: str, stat: str):
+        _, size, _ = self._sessions.pop(session_id)
+        self._bytes -= size
+        self.stats[stat] += 1
+
+    def add(self, session: Any) -> str:
+        """Store a new session under a fresh unguessable ID"""
+        session_id = secrets.token_urlsafe(16)
+        self.expire()
+        with self._lock:
+            self.stats['created'] += 1
+        self.put(session_id, session)
+        return session_id
+
+    def put(self, session_id: str, session: Any):
+        """Store (or refresh) a session, evicting the least recently used ones over budget"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            size = session.nbytes
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, size, session)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes and len(self._sessions) > 1:
+                self._drop(next(iter(self._sessions)), 'evicted')
+
+    def get(self, session_id: str) -> Optional[Any]:
+        """A live session (marked as recently used), or None if unknown, evicted or expired"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+
+            expires_at, size, session = entry
+            if expires_at < time.monotonic():
+                self._drop(session_id, 'expired')
+                return None
+
+            self._sessions[session_id] = (time.monotonic() + self.ttl_seconds, size, session)
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+            return entry is not None
+
+    def expire(self):
+        """Drop sessions past their idle timeout"""
+        now = time.monotonic()
+        with self._lock:
+            for session_id in [i for i, (expires_at, _, _) in self._sessions.items() if expires_at < now]:
+                self._drop(session_id, 'expired')
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get_stats(self) -> Dict:
+        self.expire()
+        with self._lock:
+            return {
+                **self.stats,
+                'active': len(self._sessions),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes
+            }
+
+def create_session_store() -> SessionStore:
+    """
+    Build the scoring session store from environment settings.
+
+    - ML_SESSION_MAX_MB: memory budget for all sessions (default 256)
+    - ML_SESSION_TTL_SECONDS: idle time before a session expires (default 1800)
+    """
+    return SessionStore(
+        max_bytes=int(float(os.getenv('ML_SESSION_MAX_MB', '256')) * 2**20),
+        ttl_seconds=float(os.getenv('ML_SESSION_TTL_SECONDS', '1800'))
+    )
@@ -0,0 +1,66 @@
+"""
+Startup Utilities
+Per-phase startup timing and warm-up readiness tracking
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+class StartupTracker:
+    """
+    Records how long each startup phase takes and whether the service is ready.
+
+    Phases are timed with phase() (or record() for spans measured
+    elsewhere). The service only reports ready once warm_up() has run a
+    scoring pass, so the first real request never pays cold-path costs.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.phases = {}
+        self.ready = False
+        self.error = None
+        self._ready_event = threading.Event()
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = round(seconds * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def warm_up(self, run: Callable[[], None]):
+        """Run a warm-up pass, then mark the service ready (stays unready on error)"""
+        try:
+            with self.phase('warmup'):
+                run()
+        except Exception as e:
+            self.error = str(e)
+            print(f"Error during warm-up: {e}")
+            return
+
+        self.ready = True
+        self._ready_event.set()
+        self.record('total', time.perf_counter() - self.started_at)
+        print(f"Startup complete: {self.report()['phasesMs']}")
+
+    def warm_up_in_background(self, run: Callable[[], None]) -> threading.Thread:
+        thread = threading.Thread(target=self.warm_up, args=(run,), name='warm-up', daemon=True)
+        thread.start()
+        return thread
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        return self._ready_event.wait(timeout)
+
+    def report(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "phasesMs": dict(self.phases),
+            "error": self.error
+        }
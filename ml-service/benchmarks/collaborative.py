@@ -0,0 +1,76 @@
+"""
+Collaborative Filtering Benchmark
+Recommendation latency with heuristic vs interaction-based collaborative scores, plus build and fold-in cost
+
+Usage:
+    python -m benchmarks.collaborative --careers 10000 --users 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from .synthetic import generate_careers, generate_interactions, generate_profiles
+
+def latencies(run, inputs) -> np.ndarray:
+    run(inputs[0])
+    result = np.empty(len(inputs))
+    for i, x in enumerate(inputs):
+        start = time.perf_counter()
+        run(x)
+        result[i] = time.perf_counter() - start
+    return result * 1000
+
+def main():
+    from app.models.collaborative import CollaborativeModel, InteractionLog
+    from app.models.hybrid import HybridRecommender
+    from app.utils.data_loader import enhance_career_data
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument('--careers', type=int, default=10000)
+    parser.add_argument('--users', type=int, default=20000, help='users in the interaction log')
+    parser.add_argument('--profiles', type=int, default=500, help='recommend() calls timed per mode')
+    parser.add_argument('--neighbors', type=int, default=50)
+    parser.add_argument('--fold-events', type=int, default=1000, help='events per incremental fold-in')
+    args = parser.parse_args()
+
+    careers = [enhance_career_data(c) for c in generate_careers(args.careers, seed=3)]
+    events = generate_interactions(careers, args.users, seed=5)
+    held_out = events[-args.fold_events:]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = InteractionLog(os.path.join(tmp, 'interactions.jsonl'))
+        log.append(events[:-args.fold_events])
+
+        start = time.perf_counter()
+        model = CollaborativeModel(careers, log=log, neighbors=args.neighbors)
+        build_seconds = time.perf_counter() - start
+
+        log.append(held_out)
+        start = time.perf_counter()
+        model.refresh(force=True)
+        fold_seconds = time.perf_counter() - start
+
+    stats = model.get_stats()
+    print(f"{len(events)} events, {stats['users']} users, {stats['interactions']} user x career cells, "
+          f"{stats['neighborEntries']} neighbor entries")
+    print(f"build from log: {build_seconds * 1000:.0f} ms; fold in {len(held_out)} events: {fold_seconds * 1000:.1f} ms")
+
+    profiles = generate_profiles(args.profiles, seed=9)
+    for i, profile in enumerate(profiles):
+        profile['userId'] = f'user-{i * 7 % args.users}'
+
+    lookup = latencies(model.user_scores, [p['userId'] for p in profiles])
+    print(f"user_scores lookup: p50 {np.percentile(lookup, 50):.3f} ms, p99 {np.percentile(lookup, 99):.3f} ms")
+
+    print(f"{'mode':<14}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, recommender in (('heuristics', HybridRecommender(careers)),
+                              ('interactions', HybridRecommender(careers, collaborative=model))):
+        times = latencies(lambda p: recommender.recommend(p, top_n=5), profiles)
+        print(f"{name:<14}{np.percentile(times, 50):>10.3f}{np.percentile(times, 99):>10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Metrics Overhead Benchmark
+Cost of /metrics instrumentation per observation and per request
+
+Usage:
+    python -m benchmarks.metrics_overhead --careers 5000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from .synthetic import generate_careers, generate_profiles
+
+def observe_cost(repeat: int = 200000) -> float:
+    """Nanoseconds per stage histogram observation"""
+    from app.utils.metrics import Metrics
+
+    registry = Metrics()
+    start = time.perf_counter()
+    for i in range(repeat):
+        registry.observe_stage('content', 0.0001 * (i % 50))
+    return (time.perf_counter() - start) / repeat * 1e9
+
+async def request_latencies(app, profiles, endpoint: str) -> np.ndarray:
+    """Sequential request latencies in seconds (every profile is new, so nothing is cached)"""
+    import httpx
+
+    latencies = np.empty(len(profiles))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        for i, profile in enumerate(profiles):
+            start = time.perf_counter()
+            response = await client.post(endpoint, json=profile)
+            latencies[i] = time.perf_counter() - start
+            response.raise_for_status()
+    return latencies
+
+async def main_async(args):
+    from app import main as service
+    from app.utils.metrics import metrics
+
+    service.startup.warm_up(service.warm_up)
+    profiles = generate_profiles(args.requests * 2 * args.rounds, seed=11)
+
+    print(f"observe(): {observe_cost():.0f} ns per call")
+    print(f"{'endpoint':<34}{'off p50 ms':>11}{'on p50 ms':>11}{'overhead':>10}")
+
+    for endpoint in ('/api/ml/recommendations', '/api/ml/placement-probability'):
+        medians = {True: [], False: []}
+        # Alternate on/off rounds so drift on the machine hits both equally
+        for r in range(args.rounds):
+            for enabled in (False, True):
+                metrics.enabled = enabled
+                start = (2 * r + enabled) * args.requests
+                latencies = await request_latencies(service.app, profiles[start:start + args.requests], endpoint)
+                medians[enabled].append(np.median(latencies))
+        off, on = min(medians[False]) * 1000, min(medians[True]) * 1000
+        print(f"{endpoint:<34}{off:>11.3f}{on:>11.3f}{(on / off - 1) * 100:>9.1f}%")
+
+    metrics.enabled = True
+    scrape = time.perf_counter()
+    body = service.metrics.render()
+    print(f"render(): {(time.perf_counter() - scrape) * 1000:.2f} ms for {len(body.splitlines())} lines")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--careers', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The service loads its catalog at import time
+        careers_file = os.path.join(tmp, 'careers.json')
+        with open(careers_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_careers(args.careers), f)
+        os.environ['CAREERS_DATA_PATH'] = careers_file
+        os.environ['ML_CATALOG_WATCH_SECONDS'] = '0'
+        os.environ['ML_BATCH_MAX_SIZE'] = '1'  # No batching waits in sequential requests
+
+        asyncio.run(main_async(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-Batching Benchmark
+Throughput/latency curves of the scoring endpoints under load, with and without batching
+
+Usage:
+    python -m benchmarks.micro_batching --careers 5000 --rates 50 100 200 400 800
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from .synthetic import generate_careers, generate_profiles
+
+async def run_load(client, path: str, profiles: list, rate: float, seed: int) -> dict:
+    """
+    Open-loop load: requests arrive as a Poisson process at `rate` per second.
+
+    Latency runs from each request's scheduled arrival, so time spent
+    waiting behind a busy event loop counts, as it would for real clients.
+    """
+    rng = np.random.default_rng(seed)
+    arrivals = np.cumsum(rng.exponential(1 / rate, len(profiles)))
+    latencies = []
+    start = time.perf_counter()
+
+    async def send(profile, arrival):
+        await asyncio.sleep(max(0.0, start + arrival - time.perf_counter()))
+        response = await client.post(path, json=profile)
+        latencies.append(time.perf_counter() - (start + arrival))
+        response.raise_for_status()
+
+    await asyncio.gather(*(send(p, a) for p, a in zip(profiles, arrivals)))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50': float(np.percentile(latencies_ms, 50)),
+        'p99': float(np.percentile(latencies_ms, 99))
+    }
+
+async def main_async(args):
+    import httpx
+    from app import main
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        seed = 0
+        for path, batcher in (('/api/ml/recommendations', main.recommendation_batcher),
+                              ('/api/ml/placement-probability', main.placement_batcher)):
+            print(f"\n{path}")
+            print(f"{'batch':>6}{'offered/s':>10}{'served/s':>10}{'p50 ms':>9}{'p99 ms':>10}{'mean batch':>12}")
+            for max_batch_size in (1, args.max_batch_size):
+                batcher.max_batch_size = max_batch_size
+                batcher.max_wait_ms = args.max_wait_ms
+                for rate in args.rates:
+                    # Fresh profiles each run so the result cache never answers
+                    seed += 1
+                    profiles = generate_profiles(args.requests, seed=seed)
+                    batcher.stats = {'batches': 0, 'items': 0, 'maxBatchSize': 0}
+                    r = await run_load(client, path, profiles, rate, seed)
+                    mean_batch = batcher.get_stats()['meanBatchSize']
+                    print(f"{max_batch_size:>6}{rate:>10.0f}{r['throughput']:>10.1f}"
+                          f"{r['p50']:>9.2f}{r['p99']:>10.2f}{mean_batch:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--careers', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--rates', type=float, nargs='+', default=[50, 100, 200, 400, 800],
+                        help='offered load levels in requests per second')
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The service loads its catalog at import time
+        careers_file = os.path.join(tmp, 'careers.json')
+        with open(careers_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_careers(args.careers), f)
+        os.environ['CAREERS_DATA_PATH'] = careers_file
+        os.environ['ML_CATALOG_WATCH_SECONDS'] = '0'
+
+        asyncio.run(main_async(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Placement Inference Benchmark
+Compares sklearn predict_proba with the compiled forest for single rows and batches
+
+Usage:
+    python -m benchmarks.placement_inference --trees 100 --max-depth 12
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from .synthetic import generate_profiles
+
+def time_per_call(run, repeat: int) -> float:
+    """Mean seconds per call"""
+    run()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat
+
+def train_forest(features: np.ndarray, trees: int, max_depth: int, seed: int = 0):
+    """Random forest on synthetic placement labels (skills, experience and projects drive placement)"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    signal = 0.3 * features[:, 1] + 0.4 * features[:, 3] + 0.2 * features[:, 5] + 0.5 * features[:, 6]
+    labels = (signal + rng.normal(0, 1.5, len(features)) > 5).astype(int)
+    return RandomForestClassifier(n_estimators=trees, max_depth=max_depth, random_state=seed).fit(features, labels)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trees', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=12)
+    parser.add_argument('--profiles', type=int, default=20000)
+    args = parser.parse_args()
+
+    from app.models.compiled_forest import CompiledForest
+    from app.models.placement import PlacementPredictor
+
+    features = PlacementPredictor().extract_features_batch(generate_profiles(args.profiles))
+    model = train_forest(features, args.trees, args.max_depth)
+    forest = CompiledForest.from_sklearn(model)
+    print(f"{len(forest.roots)} trees, {len(forest.feature)} nodes, depth {forest.depth}")
+
+    max_diff = np.abs(model.predict_proba(features) - forest.predict_proba(features)).max()
+    print(f"max |sklearn - compiled| over {len(features)} rows: {max_diff:.3g}")
+
+    print(f"{'rows':>7}{'sklearn us/row':>16}{'compiled us/row':>17}{'speedup':>9}")
+    for rows in (1, 10, 100, 1000, 10000):
+        batch = features[:rows]
+        repeat = max(3, 2000 // rows)
+        sklearn_time = time_per_call(lambda: model.predict_proba(batch), max(3, repeat // 20))
+        compiled_time = time_per_call(lambda: forest.predict_proba(batch), repeat)
+        print(f"{rows:>7}{sklearn_time / rows * 1e6:>16.1f}{compiled_time / rows * 1e6:>17.1f}"
+              f"{sklearn_time / compiled_time:>8.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Streaming Memory Benchmark
+Server RSS while bulk-scoring growing NDJSON uploads through /api/ml/score/stream
+
+Usage:
+    python -m benchmarks.stream_memory --careers 5000 --records 10000 50000 200000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from .synthetic import generate_careers, generate_profiles
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MB (Linux only)"""
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def upload(records: int):
+    """NDJSON body generated on the fly, 1000 profiles at a time"""
+    for start in range(0, records, 1000):
+        profiles = generate_profiles(min(1000, records - start), seed=start)
+        yield ''.join(json.dumps(p) + '\n' for p in profiles).encode('utf-8')
+
+def stream(url: str, records: int, pid: int) -> dict:
+    import httpx
+
+    samples = []
+    done = threading.Event()
+
+    def sample():
+        while not done.is_set():
+            samples.append(rss_mb(pid))
+            time.sleep(0.2)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    before = rss_mb(pid)
+    sampler.start()
+
+    start = time.perf_counter()
+    lines = 0
+    with httpx.Client(timeout=None) as client:
+        with client.stream('POST', f'{url}/api/ml/score/stream?fields=id,title', content=upload(records)) as response:
+            response.raise_for_status()
+            for _ in response.iter_lines():
+                lines += 1
+    elapsed = time.perf_counter() - start
+    done.set()
+    sampler.join()
+
+    return {
+        'records': records,
+        'lines': lines,
+        'seconds': round(elapsed, 2),
+        'recordsPerSecond': round(records / elapsed, 1),
+        'rssBeforeMb': round(before, 1),
+        'rssPeakMb': round(max(samples + [before]), 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--careers', type=int, default=5000)
+    parser.add_argument('--records', type=int, nargs='+', default=[10000, 50000, 200000])
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        careers_file = os.path.join(tmp, 'careers.json')
+        with open(careers_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_careers(args.careers), f)
+
+        env = dict(os.environ, CAREERS_DATA_PATH=careers_file, ML_CATALOG_WATCH_SECONDS='0')
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'app.main:app', '--port', str(args.port), '--log-level', 'warning'],
+            env=env
+        )
+        url = f'http://127.0.0.1:{args.port}'
+        try:
+            import httpx
+
+            for _ in range(300):
+                try:
+                    if httpx.get(f'{url}/ready').status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.2)
+
+            print(f"{'records':>9}{'seconds':>9}{'records/s':>11}{'RSS before MB':>15}{'RSS peak MB':>13}")
+            for records in args.records:
+                r = stream(url, records, server.pid)
+                assert r['lines'] == records + 1, r
+                print(f"{r['records']:>9}{r['seconds']:>9}{r['recordsPerSecond']:>11}"
+                      f"{r['rssBeforeMb']:>15}{r['rssPeakMb']:>13}")
+        finally:
+            server.terminate()
+            server.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+"""
+Benchmark Suite
+Latency, throughput and peak memory of the scoring and loading paths, checked against JSON baselines
+
+Usage:
+    python -m benchmarks.suite
+    python -m benchmarks.suite --save benchmarks/baselines/default.json
+    python -m benchmarks.suite --check benchmarks/baselines/default.json --threshold 0.25
+    python -m benchmarks.suite --sizes 1000 10000 100000 1000000 --cases recommend
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .synthetic import generate_careers, generate_profiles
+
+# Fields load_careers_data infers; the catalog file is written without them, like the Next.js data
+INFERRED_FIELDS = ('experienceRange', 'suitableWorkStyles', 'industries', 'salaryRange', 'topCompanies')
+
+CASES = ('load', 'enhance', 'index', 'recommend', 'placement', 'profile_strength')
+
+# Metrics compared against the baseline (all "higher is worse"), with the
+# smallest absolute change worth reporting so timer noise on tiny numbers is ignored
+CHECKED_METRICS = {'p50Ms': 0.05, 'p99Ms': 0.5, 'peakMemKb': 256}
+
+# Timed passes per case; the fastest is kept, which filters out noisy neighbours on shared machines
+ROUNDS = 3
+
+def measure(run: Callable, inputs: Sequence, items_per_call: int = 1, memory_samples: int = 20) -> Dict:
+    """
+    Time run(x) for every input, then measure peak memory on a few of them.
+
+    Latencies are per call, from the pass (of ROUNDS) with the lowest
+    median; throughput is items per second over that pass. Peak memory is
+    the largest traced allocation high-water mark of a single call,
+    measured separately since tracing slows Python code down.
+    """
+    run(inputs[0])  # Warm caches and lazy imports
+
+    latencies = None
+    for _ in range(ROUNDS):
+        gc.collect()  # Don't bill this pass for garbage left by the previous one
+        current = np.empty(len(inputs))
+        for i, x in enumerate(inputs):
+            start = time.perf_counter()
+            run(x)
+            current[i] = time.perf_counter() - start
+        if latencies is None or np.median(current) < np.median(latencies):
+            latencies = current
+
+    peak = 0
+    tracemalloc.start()
+    try:
+        for x in inputs[:memory_samples]:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            run(x)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'p50Ms': round(float(np.percentile(latencies, 50)) * 1000, 4),
+        'p99Ms': round(float(np.percentile(latencies, 99)) * 1000, 4),
+        'throughput': round(len(inputs) * items_per_call / float(latencies.sum()), 1),
+        'peakMemKb': round(peak / 1024, 1),
+        'samples': len(inputs)
+    }
+
+def repeats_for(size: int) -> int:
+    """Timed repetitions of whole-catalog operations (fewer for big catalogs)"""
+    return max(2, min(30, 300000 // size))
+
+def bench_catalog(size: int, profiles: List[Dict], cases: Sequence[str], seed: int) -> Dict[str, Dict]:
+    """Catalog-size dependent cases for one synthetic catalog"""
+    from app.models.hybrid import HybridRecommender
+    from app.utils.data_loader import enhance_career_data, load_careers_data
+
+    results = {}
+    careers = generate_careers(size, seed=seed)
+    raw = [{k: v for k, v in career.items() if k not in INFERRED_FIELDS} for career in careers]
+
+    if 'load' in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            careers_file = os.path.join(tmp, 'careers.json')
+            with open(careers_file, 'w', encoding='utf-8') as f:
+                json.dump(raw, f)
+
+            previous = os.environ.get('CAREERS_DATA_PATH')
+            os.environ['CAREERS_DATA_PATH'] = careers_file
+            try:
+                results[f'load_careers_data[careers={size}]'] = measure(
+                    lambda _: load_careers_data(strict=True), range(repeats_for(size)),
+                    items_per_call=size, memory_samples=1
+                )
+            finally:
+                if previous is None:
+                    os.environ.pop('CAREERS_DATA_PATH')
+                else:
+                    os.environ['CAREERS_DATA_PATH'] = previous
+
+    if 'enhance' in cases:
+        results[f'enhance_career_data[careers={size}]'] = measure(enhance_career_data, raw[:20000])
+    del raw
+
+    if 'index' in cases or 'recommend' in cases:
+        if 'index' in cases:
+            results[f'HybridRecommender.__init__[careers={size}]'] = measure(
+                lambda _: HybridRecommender(careers), range(max(1, repeats_for(size) // 5)),
+                items_per_call=size, memory_samples=1
+            )
+
+        if 'recommend' in cases:
+            recommender = HybridRecommender(careers)
+            results[f'recommend[careers={size}]'] = measure(
+                lambda profile: recommender.recommend(profile, top_n=5), profiles
+            )
+            del recommender
+
+    return results
+
+def bench_profiles(profiles: List[Dict], cases: Sequence[str]) -> Dict[str, Dict]:
+    """Catalog independent cases over the profile corpus"""
+    results = {}
+
+    if 'placement' in cases:
+        from app.models.placement import PlacementPredictor
+
+        predictor = PlacementPredictor()
+        results['predict_probability'] = measure(predictor.predict_probability, profiles)
+
+    if 'profile_strength' in cases:
+        # calculate_profile_strength lives in the service module, which loads a catalog on import
+        from app.main import calculate_profile_strength
+
+        results['calculate_profile_strength'] = measure(calculate_profile_strength, profiles)
+
+    return results
+
+def environment() -> Dict:
+    """Machine details stored with a baseline; numbers only compare on like hardware"""
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpuCount': os.cpu_count()
+    }
+
+def check_regressions(results: Dict[str, Dict], baseline: Dict, threshold: float) -> List[str]:
+    """Descriptions of every checked metric more than `threshold` (a fraction) worse than the baseline"""
+    regressions = []
+    for name, expected in baseline['results'].items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        for metric, min_change in CHECKED_METRICS.items():
+            old, new = expected.get(metric), actual.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_change:
+                regressions.append(f"{name} {metric}: {old} -> {new} (+{(new / old - 1) * 100 if old else float('inf'):.0f}%)")
+    return regressions
+
+def print_results(results: Dict[str, Dict]):
+    print(f"{'case':<44}{'p50 ms':>10}{'p99 ms':>10}{'items/s':>13}{'peak KB':>12}")
+    for name, r in results.items():
+        print(f"{name:<44}{r['p50Ms']:>10.3f}{r['p99Ms']:>10.3f}{r['throughput']:>13,.0f}{r['peakMemKb']:>12,.1f}")
+
+def main():
+    global ROUNDS
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='synthetic catalog sizes (1000000 needs several GB of RAM)')
+    parser.add_argument('--profiles', type=int, default=300, help='profiles scored per recommend case')
+    parser.add_argument('--corpus', type=int, default=3000, help='profiles for the catalog independent cases')
+    parser.add_argument('--cases', nargs='+', choices=CASES, default=list(CASES))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help='timed passes per case (the fastest is kept)')
+    parser.add_argument('--save', metavar='PATH', help='write the results as a JSON baseline')
+    parser.add_argument('--check', metavar='PATH', help='compare against a JSON baseline; exit 1 on regression')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown / memory growth as a fraction of the baseline')
+    args = parser.parse_args()
+    ROUNDS = args.rounds
+
+    corpus = generate_profiles(args.corpus, seed=args.seed + 1)
+    results = {}
+    for size in args.sizes:
+        results.update(bench_catalog(size, corpus[:args.profiles], args.cases, args.seed))
+    results.update(bench_profiles(corpus, args.cases))
+
+    print_results(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        config = {'sizes': args.sizes, 'profiles': args.profiles, 'corpus': args.corpus, 'seed': args.seed}
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'config': config, 'results': results}, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.check:
+        with open(args.check, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != environment():
+            print(f"Warning: baseline was recorded on a different environment: {baseline.get('environment')}")
+
+        regressions = check_regressions(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.check}")
+
+if __name__ == '__main__':
+    main()
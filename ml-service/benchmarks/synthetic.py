@@ -0,0 +1,144 @@
+"""
+Synthetic Data
+Seeded career catalogs and profile corpora shaped like get_mock_careers_data
+"""
+
+import random
+from typing import Dict, List
+
+BASE_SKILLS = [
+    'React', 'Node.js', 'SQL', 'Git', 'REST APIs', 'Python', 'Machine Learning', 'Statistics',
+    'Data Visualization', 'Figma', 'User Research', 'Prototyping', 'UI Design', 'Wireframing',
+    'JavaScript', 'TypeScript', 'Java', 'Go', 'Rust', 'C++', 'AWS', 'Docker', 'Kubernetes',
+    'Excel', 'Tableau', 'Spark', 'TensorFlow', 'PyTorch', 'Financial Modeling', 'SEO',
+    'Copywriting', 'Project Management', 'Agile', 'Linux', 'Networking', 'Security'
+]
+BASE_INTERESTS = [
+    'Coding', 'Building Things', 'Problem Solving', 'Data Analysis', 'Math & Statistics',
+    'Research', 'Design & Art', 'User Empathy', 'Creativity', 'Logic & Puzzles', 'Writing',
+    'Teaching', 'Business Strategy', 'Healthcare', 'Finance', 'Gaming'
+]
+INDUSTRIES = [
+    'Technology & Software', 'E-commerce & Retail', 'Finance & Banking',
+    'Healthcare & Biotech', 'Media & Entertainment', 'Consulting'
+]
+EDUCATION_LEVELS = ['High School', 'Diploma', 'Undergraduate', 'Postgraduate', 'PhD']
+FIELDS = [
+    'Computer Science', 'Engineering', 'Statistics', 'Mathematics', 'Design',
+    'Arts & Humanities', 'Business', 'Economics', 'Biology', 'Physics'
+]
+WORK_STYLES = ['collaborative', 'independent', 'leadership']
+CATEGORIES = ['Software Development', 'Data Science & AI', 'Design', 'Business', 'Marketing', 'Finance', 'Healthcare']
+LEVELS = ['Junior', '', 'Senior', 'Lead', 'Principal', 'Manager']
+TIME_COMMITMENTS = ['Less than 5 hours', '5–10 hours', '10–20 hours', 'Full-time learning']
+TIMELINES = ['6months', '1year', '2years', '5years']
+
+def vocabulary(base: List[str], size: int) -> List[str]:
+    """The base terms followed by numbered variants, `size` terms in total"""
+    terms = list(base[:size])
+    variant = 2
+    while len(terms) < size:
+        terms.extend(f"{term} {variant}" for term in base[:size - len(terms)])
+        variant += 1
+    return terms
+
+def generate_careers(n: int, seed: int = 42, n_skills: int = None, n_interests: int = None) -> List[Dict]:
+    """
+    n careers with the fields of get_mock_careers_data.
+
+    Skill and interest vocabularies grow with the catalog (roughly n / 10
+    and n / 50 terms, at least the base lists) and terms are drawn with a
+    Zipf-like skew, so some skills are common and most are rare.
+    """
+    rng = random.Random(seed)
+    skills = vocabulary(BASE_SKILLS, n_skills or max(len(BASE_SKILLS), n // 10))
+    interests = vocabulary(BASE_INTERESTS, n_interests or max(len(BASE_INTERESTS), n // 50))
+    skill_weights = [1.0 / (rank + 1) for rank in range(len(skills))]
+    interest_weights = [1.0 / (rank + 1) for rank in range(len(interests))]
+
+    careers = []
+    for i in range(n):
+        level = rng.choice(LEVELS)
+        category = rng.choice(CATEGORIES)
+        exp_min = rng.randint(0, 8)
+        salary_min = rng.randrange(40000, 150000, 5000)
+        careers.append({
+            'id': str(i + 1),
+            'title': f"{level} {category} Role {i + 1}".strip(),
+            'category': category,
+            'description': f"Synthetic {category.lower()} career",
+            'requiredEducation': {
+                'level': rng.choice(EDUCATION_LEVELS),
+                'fields': rng.sample(FIELDS, rng.randint(1, 3))
+            },
+            'requiredSkills': list(dict.fromkeys(rng.choices(skills, skill_weights, k=rng.randint(3, 7)))),
+            'relatedInterests': list(dict.fromkeys(rng.choices(interests, interest_weights, k=rng.randint(2, 4)))),
+            'industries': rng.sample(INDUSTRIES, rng.randint(1, 3)),
+            'experienceRange': {'min': exp_min, 'max': exp_min + rng.randint(2, 12)},
+            'suitableWorkStyles': rng.sample(WORK_STYLES, rng.randint(1, 2)),
+            'salaryRange': {'min': salary_min, 'max': salary_min + rng.randrange(20000, 100000, 5000), 'currency': 'USD'},
+            'topCompanies': rng.sample(['Google', 'Microsoft', 'Amazon', 'Meta', 'Apple', 'Netflix', 'Uber', 'Stripe'], 8),
+            'demand': rng.choice(['Medium', 'High', 'Very High']),
+            'growthRate': rng.choice(['Steady', 'Fast', 'Very Fast'])
+        })
+    return careers
+
+def generate_profiles(n: int, seed: int = 7, n_skills: int = None) -> List[Dict]:
+    """n onboarding profiles: UserProfile fields plus the portfolio fields PlacementPredictor reads"""
+    rng = random.Random(seed)
+    skills = vocabulary(BASE_SKILLS, n_skills or len(BASE_SKILLS))
+
+    profiles = []
+    for _ in range(n):
+        profile = {
+            'educationLevel': rng.choice(EDUCATION_LEVELS),
+            'fieldOfStudy': rng.choice(FIELDS),
+            'currentStatus': rng.choice(['Student', 'Working Professional', 'Career Changer']),
+            'experienceLevel': rng.choice(['beginner', 'intermediate', 'advanced']),
+            'skills': rng.sample(skills, rng.randint(0, 10)),
+            'interests': rng.sample(BASE_INTERESTS, rng.randint(1, 4)),
+            'startingFresh': False,
+            'primaryObjectives': ['Get a job'],
+            'preferredDomains': [],
+            'learningStyle': rng.choice(['hands-on', 'visual', 'reading']),
+            'timeCommitment': rng.choice(TIME_COMMITMENTS),
+            'yearsExperience': rng.randint(0, 15),
+            'targetIndustries': rng.sample(INDUSTRIES, rng.randint(0, 3)),
+            'careerTimeline': rng.choice(TIMELINES),
+            'workLifeBalancePriority': rng.randint(1, 10),
+            'workStyle': rng.choice(WORK_STYLES),
+            'learningPace': rng.choice(['fast', 'steady', 'thorough']),
+            'leadershipAspirations': rng.random() < 0.3,
+            'projectsCompleted': rng.randint(0, 12),
+            'certifications': [f"Cert {j}" for j in range(rng.randint(0, 4))]
+        }
+        if rng.random() < 0.3:
+            profile['portfolioUrl'] = 'https://example.com/portfolio'
+        profiles.append(profile)
+    return profiles
+
+def generate_interactions(careers: List[Dict], n_users: int, seed: int = 13, events_per_user: int = 12) -> List[Dict]:
+    """
+    Interaction log events (view / save / plan_start) for n_users users.
+
+    Each user browses mostly within one or two career categories, with a
+    Zipf-like skew towards popular careers, so careers co-occur the way
+    they would on the site. Views outnumber saves, which outnumber plan
+    starts.
+    """
+    rng = random.Random(seed)
+    by_category = {}
+    for career in careers:
+        by_category.setdefault(career.get('category'), []).append(str(career['id']))
+    categories = sorted(by_category)
+    weights = {c: [1.0 / (rank + 1) for rank in range(len(ids))] for c, ids in by_category.items()}
+
+    events = []
+    for user in range(n_users):
+        home = rng.sample(categories, min(len(categories), rng.randint(1, 2)))
+        for _ in range(rng.randint(1, 2 * events_per_user)):
+            category = rng.choice(home) if rng.random() < 0.9 else rng.choice(categories)
+            career_id = rng.choices(by_category[category], weights[category])[0]
+            event = rng.choices(['view', 'save', 'plan_start'], [0.8, 0.15, 0.05])[0]
+            events.append({'userId': f'user-{user}', 'careerId': career_id, 'event': event, 'ts': 1700000000 + len(events)})
+    return events
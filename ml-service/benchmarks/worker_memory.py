@@ -0,0 +1,104 @@
+"""
+Worker Memory Benchmark
+Compares per-worker memory of in-memory catalogs vs a shared compiled artifact
+
+Usage:
+    python -m benchmarks.worker_memory --careers 200000 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from .synthetic import generate_careers, generate_profiles
+
+def read_memory() -> dict:
+    """RSS and PSS of this process in MB (PSS splits shared pages between their users; Linux only)"""
+    memory = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            key, value = line.split(':', 1)
+            if key in ('Rss', 'Pss'):
+                memory[key.lower()] = int(value.split()[0]) / 1024
+    return memory
+
+def worker(mode: str, careers_file: str, artifact_dir: str, barrier, results):
+    from app.models.hybrid import HybridRecommender
+    from app.utils.catalog_artifact import load_compiled_catalog
+    from app.utils.data_loader import enhance_career_data
+
+    start = time.perf_counter()
+    if mode == 'json':
+        with open(careers_file, 'r', encoding='utf-8') as f:
+            careers = [enhance_career_data(c) for c in json.load(f)]
+        recommender = HybridRecommender(careers)
+    else:
+        careers = load_compiled_catalog(artifact_dir, careers_file, lambda: None)
+        recommender = HybridRecommender(careers, index=careers.catalog_index)
+    attach_ms = (time.perf_counter() - start) * 1000
+
+    # Serve some traffic so the pages scoring touches are resident
+    for profile in generate_profiles(50, seed=os.getpid()):
+        recommender.recommend(profile, top_n=10)
+
+    # Measure while every worker is alive, so shared pages are split between them
+    barrier.wait()
+    results.put(dict(read_memory(), attachMs=attach_ms))
+    barrier.wait()
+
+def run(mode: str, workers: int, careers_file: str, artifact_dir: str) -> dict:
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, careers_file, artifact_dir, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        'mode': mode,
+        'workers': workers,
+        'rssMbPerWorker': round(sum(s['rss'] for s in samples) / workers, 1),
+        'pssMbTotal': round(sum(s['pss'] for s in samples), 1),
+        'attachMsMean': round(sum(s['attachMs'] for s in samples) / workers, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--careers', type=int, default=200_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        careers_file = os.path.join(tmp, 'careers.json')
+        with open(careers_file, 'w', encoding='utf-8') as f:
+            json.dump(generate_careers(args.careers), f)
+
+        # Compile once up front, as the first worker of a deployment would
+        from app.utils.catalog_artifact import load_compiled_catalog
+        from app.utils.data_loader import enhance_career_data
+
+        def load():
+            with open(careers_file, 'r', encoding='utf-8') as f:
+                return [enhance_career_data(c) for c in json.load(f)]
+
+        artifact_dir = os.path.join(tmp, 'artifacts')
+        load_compiled_catalog(artifact_dir, careers_file, load)
+
+        print(f"{args.careers} careers")
+        print(f"{'mode':<10}{'workers':>8}{'RSS/worker MB':>15}{'PSS total MB':>14}{'load ms':>10}")
+        for workers in args.workers:
+            for mode in ('json', 'artifact'):
+                r = run(mode, workers, careers_file, artifact_dir)
+                print(f"{r['mode']:<10}{r['workers']:>8}{r['rssMbPerWorker']:>15}{r['pssMbTotal']:>14}{r['attachMsMean']:>10}")
+
+if __name__ == '__main__':
+    main()
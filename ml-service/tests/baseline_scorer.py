@@ -0,0 +1,135 @@
+"""
+Baseline Scorer
+Frozen copy of the original per-career, set-based HybridRecommender scoring (before the catalog index)
+
+Fast paths are checked against this, not against the current scalar scorers,
+which now read the index's own bitsets and tables.
+"""
+
+from typing import Dict, List
+
+CONTENT_WEIGHT = 0.7
+COLLAB_WEIGHT = 0.3
+
+EDU_HIERARCHY = {
+    'high school': 1,
+    'diploma': 2,
+    'undergraduate': 3,
+    'postgraduate': 4,
+    'phd': 5
+}
+
+def content_based_score(user_profile: Dict, career: Dict) -> float:
+    score = 0.0
+
+    user_edu = user_profile.get('educationLevel', '').lower()
+    req_edu = career.get('requiredEducation', {}).get('level', '').lower()
+    user_edu_level = EDU_HIERARCHY.get(user_edu, 0)
+    req_edu_level = EDU_HIERARCHY.get(req_edu, 0)
+
+    if user_edu_level >= req_edu_level:
+        score += 0.25
+    elif user_edu_level == req_edu_level - 1:
+        score += 0.15
+
+    user_field = user_profile.get('fieldOfStudy', '').lower()
+    req_fields = [f.lower() for f in career.get('requiredEducation', {}).get('fields', [])]
+
+    if any(user_field in f or f in user_field for f in req_fields):
+        score += 0.20
+
+    user_skills = set(s.lower() for s in user_profile.get('skills', []))
+    req_skills = set(s.lower() for s in career.get('requiredSkills', []))
+
+    if req_skills:
+        score += 0.30 * len(user_skills & req_skills) / len(req_skills)
+
+    user_interests = set(i.lower() for i in user_profile.get('interests', []))
+    career_interests = set(i.lower() for i in career.get('relatedInterests', []))
+
+    if career_interests:
+        score += 0.25 * len(user_interests & career_interests) / len(career_interests)
+
+    return score
+
+def collaborative_score(user_profile: Dict, career: Dict) -> float:
+    score = 0.0
+
+    user_industries = set(user_profile.get('targetIndustries', []))
+    career_industries = set(career.get('industries', []))
+
+    if user_industries and career_industries:
+        score += 0.40 * len(user_industries & career_industries) / len(user_industries)
+
+    user_exp = user_profile.get('yearsExperience', 0)
+    career_exp_range = career.get('experienceRange', {})
+    min_exp = career_exp_range.get('min', 0)
+    max_exp = career_exp_range.get('max', 50)
+
+    if min_exp <= user_exp <= max_exp:
+        score += 0.30
+    elif user_exp < min_exp:
+        score += max(0, 0.30 - ((min_exp - user_exp) * 0.05))
+
+    user_work_style = user_profile.get('workStyle', '')
+    career_work_styles = career.get('suitableWorkStyles', [])
+
+    if user_work_style in career_work_styles:
+        score += 0.30
+    elif career_work_styles:
+        score += 0.15
+
+    return score
+
+def calculate_timeline(user_profile: Dict, missing_skills: int) -> str:
+    base_months = 6 + missing_skills * 2
+
+    if user_profile.get('experienceLevel') == 'beginner':
+        base_months += 3
+    elif user_profile.get('experienceLevel') == 'advanced':
+        base_months -= 2
+
+    time_commitment = user_profile.get('timeCommitment', '')
+    if 'Full-time' in time_commitment:
+        base_months = int(base_months * 0.7)
+    elif 'Less than 5' in time_commitment:
+        base_months = int(base_months * 1.5)
+
+    learning_pace = user_profile.get('learningPace', '')
+    if learning_pace == 'fast':
+        base_months = int(base_months * 0.8)
+    elif learning_pace == 'thorough':
+        base_months = int(base_months * 1.2)
+
+    base_months = max(3, min(base_months, 24))
+    if base_months <= 6:
+        return f"{base_months} months"
+    return f"{base_months / 12:.1f} years ({base_months} months)"
+
+def scores(user_profile: Dict, careers: List[Dict]) -> List[tuple]:
+    """(content, collaborative, hybrid) per career"""
+    result = []
+    for career in careers:
+        content = content_based_score(user_profile, career)
+        collab = collaborative_score(user_profile, career)
+        result.append((content, collab, CONTENT_WEIGHT * content + COLLAB_WEIGHT * collab))
+    return result
+
+def recommend(user_profile: Dict, careers: List[Dict], top_n: int) -> List[Dict]:
+    """The original recommend(): score every career, stable sort by hybrid score (best first)"""
+    ranked = []
+    for career, (content, collab, hybrid) in zip(careers, scores(user_profile, careers)):
+        user_skills = set(s.lower() for s in user_profile.get('skills', []))
+        missing = set(s.lower() for s in career.get('requiredSkills', [])) - user_skills
+        ranked.append((hybrid, {
+            'career': career,
+            'matchPercentage': round(hybrid * 100, 2),
+            'breakdown': {
+                'contentBased': round(content * 100, 2),
+                'collaborative': round(collab * 100, 2),
+                'hybrid': round(hybrid * 100, 2)
+            },
+            'timeline': calculate_timeline(user_profile, len(missing))
+        }))
+    ranked.sort(key=lambda x: x[0], reverse=True)
+    return [r[1] for r in ranked[:top_n]]
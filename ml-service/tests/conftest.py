@@ -0,0 +1,53 @@
+"""
+Shared Test Fixtures
+Seeded synthetic catalogs and profiles (see benchmarks/synthetic.py)
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_careers, generate_profiles
+from app.models.hybrid import HybridRecommender
+
+@pytest.fixture(scope='session')
+def careers():
+    return generate_careers(600, seed=3)
+
+@pytest.fixture(scope='session')
+def profiles():
+    return generate_profiles(40, seed=5)
+
+@pytest.fixture(scope='session')
+def recommender(careers):
+    return HybridRecommender(careers)
+
+@pytest.fixture(scope='session')
+def service():
+    """The app.main module (imported on first use: it loads a catalog and builds the scoring stack)"""
+    os.environ.setdefault('ML_CATALOG_WATCH_SECONDS', '0')
+    from app import main
+    return main
+
+@pytest.fixture(scope='session')
+def client(service):
+    from fastapi.testclient import TestClient
+    with TestClient(service.app) as client:
+        yield client
+
+@pytest.fixture
+def serve_catalog(service):
+    """Swap the service to a given catalog through a reload; the original is restored after the test"""
+    store = service.catalog_store
+    original, loader = store.current.careers_data, store.loader
+
+    def swap(careers_data):
+        store.loader = lambda: careers_data
+        return store.reload()
+
+    yield swap
+    swap(original)
+    store.loader = loader
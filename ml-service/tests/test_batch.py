@@ -0,0 +1,128 @@
+"""
+Batch Scoring Tests
+Record normalization, the errors dataset, and resuming a run from its checkpoints
+"""
+
+import json
+import os
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_profiles
+from app.batch import CHECKPOINT_DIR, InvalidRecord, normalize_record, run
+
+@pytest.mark.parametrize('record, column', [
+    ({'yearsExperience': 'inf'}, 'yearsExperience'),
+    ({'yearsExperience': '1e400'}, 'yearsExperience'),
+    ({'yearsExperience': 'nan'}, 'yearsExperience'),
+    ({'yearsExperience': float('inf')}, 'yearsExperience'),
+    ({'yearsExperience': 'three'}, 'yearsExperience'),
+    ({'educationLevel': 5}, 'educationLevel'),
+    ({'skills': 'Python;SQL', 'fieldOfStudy': 3.0}, 'fieldOfStudy'),
+    ({'skillProficiency': '"advanced"'}, 'skillProficiency'),
+    ({'skillProficiency': [{'skill': 'Python', 'level': 'high'}]}, 'skillProficiency'),
+    ({'salaryExpectation': '{"min": "a lot"}'}, 'salaryExpectation'),
+    ({'willingToRelocate': 'maybe'}, 'willingToRelocate'),
+])
+def test_unreadable_cells_are_rejected(record, column):
+    with pytest.raises(InvalidRecord) as e:
+        normalize_record(record)
+    assert e.value.column == column
+
+def test_csv_cells_are_restored():
+    assert normalize_record({
+        'educationLevel': 'true',
+        'skills': 'Python; SQL',
+        'interests': '["AI"]',
+        'yearsExperience': '4.0',
+        'willingToRelocate': 'TRUE',
+        'salaryExpectation': '{"min": 50000, "max": 90000}',
+        'skillProficiency': '[{"skill": "Python", "level": 4}]',
+        'currentRole': ''
+    }) == {
+        'educationLevel': 'true',
+        'skills': ['Python', 'SQL'],
+        'interests': ['AI'],
+        'yearsExperience': 4,
+        'willingToRelocate': True,
+        'salaryExpectation': {'min': 50000, 'max': 90000},
+        'skillProficiency': [{'skill': 'Python', 'level': 4}]
+    }
+
+@pytest.fixture
+def catalog_file(careers, tmp_path, monkeypatch):
+    """The synthetic catalog as the careers file the batch workers load"""
+    path = tmp_path / 'careers.json'
+    path.write_text(json.dumps(careers[:200]), encoding='utf-8')
+    monkeypatch.setenv('CAREERS_DATA_PATH', str(path))
+    monkeypatch.delenv('ML_CATALOG_ARTIFACT_DIR', raising=False)
+    monkeypatch.delenv('ML_INTERACTIONS_PATH', raising=False)
+    return path
+
+@pytest.fixture
+def profiles_file(tmp_path):
+    """30 profiles as JSONL with three unreadable rows among them"""
+    records = [dict(p, userId=f'u{i}') for i, p in enumerate(generate_profiles(30, seed=11))]
+    records[3]['yearsExperience'] = 1e400
+    records[14]['educationLevel'] = 5
+    records[25]['skillProficiency'] = 'expert'
+    path = tmp_path / 'profiles.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    return path
+
+def read_output(out_dir):
+    recommendations = pd.read_parquet(os.path.join(out_dir, 'recommendations'))
+    placement = pd.read_parquet(os.path.join(out_dir, 'placement'))
+    return (recommendations.sort_values(['userId', 'rank'], ignore_index=True),
+            placement.sort_values('userId', ignore_index=True))
+
+def test_bad_rows_go_to_the_errors_dataset(catalog_file, profiles_file, tmp_path):
+    out_dir = str(tmp_path / 'out')
+    summary = run(str(profiles_file), out_dir, top_k=3, chunk_size=10, workers=1, quiet=True)
+
+    assert summary['profilesScored'] == 27
+    assert summary['profilesRejected'] == 3
+    errors = pd.read_parquet(os.path.join(out_dir, 'errors')).sort_values('row', ignore_index=True)
+    assert errors[['row', 'userId', 'column']].to_dict('records') == [
+        {'row': 3, 'userId': 'u3', 'column': 'yearsExperience'},
+        {'row': 14, 'userId': 'u14', 'column': 'educationLevel'},
+        {'row': 25, 'userId': 'u25', 'column': 'skillProficiency'},
+    ]
+
+    recommendations, placement = read_output(out_dir)
+    assert set(placement['userId']) == {f'u{i}' for i in range(30)} - {'u3', 'u14', 'u25'}
+    assert (recommendations.groupby('userId').size() == 3).all()
+
+def test_resume_scores_only_missing_chunks(catalog_file, profiles_file, tmp_path):
+    out_dir = str(tmp_path / 'out')
+    run(str(profiles_file), out_dir, top_k=3, chunk_size=10, workers=1, quiet=True)
+    expected = read_output(out_dir)
+
+    # An interruption after chunk 0: chunk 1's output never landed, chunk 2's checkpoint wasn't written
+    for table in ('recommendations', 'placement', 'errors'):
+        os.remove(os.path.join(out_dir, table, 'part-00001.parquet'))
+    for chunk in (1, 2):
+        os.remove(os.path.join(out_dir, CHECKPOINT_DIR, f'chunk-{chunk:05d}.json'))
+
+    summary = run(str(profiles_file), out_dir, top_k=3, chunk_size=10, workers=1, quiet=True)
+    assert summary['chunksSkipped'] == 1
+    assert summary['chunksScored'] == 2
+    assert summary['profilesRejected'] == 2
+
+    recommendations, placement = read_output(out_dir)
+    pd.testing.assert_frame_equal(recommendations, expected[0])
+    pd.testing.assert_frame_equal(placement, expected[1])
+    assert len(pd.read_parquet(os.path.join(out_dir, 'errors'))) == 3
+
+def test_resume_refuses_different_settings(catalog_file, profiles_file, tmp_path):
+    out_dir = str(tmp_path / 'out')
+    run(str(profiles_file), out_dir, top_k=3, chunk_size=10, workers=1, quiet=True)
+    with pytest.raises(ValueError):
+        run(str(profiles_file), out_dir, top_k=5, chunk_size=10, workers=1, quiet=True)
@@ -0,0 +1,161 @@
+"""
+Result Cache Tests
+Fingerprints, the local LRU and Redis tiers, catalog version invalidation, and coalesced misses
+"""
+
+import asyncio
+
+from app.utils.cache import LRUCache, RedisCache, ResultCache, profile_fingerprint
+
+class MemoryRedis:
+    """In-memory stand-in for a redis-py client (get / set with ex=)"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+        self.down = False
+
+    def get(self, key):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('redis is down')
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError('redis is down')
+        self.data[key] = value
+
+def test_fingerprint_ignores_order_and_case(profiles):
+    profile = profiles[0]
+    reordered = {**dict(reversed(list(profile.items()))), 'skills': [s.upper() for s in reversed(profile['skills'])]}
+    assert profile_fingerprint(reordered) == profile_fingerprint(profile)
+    assert profile_fingerprint({**profile, 'yearsExperience': 99}) != profile_fingerprint(profile)
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+def test_redis_tier_is_shared_between_workers(profiles):
+    redis = MemoryRedis()
+    first = ResultCache(LRUCache(), RedisCache(redis), 'v1')
+    second = ResultCache(LRUCache(), RedisCache(redis), 'v1')
+
+    computed = []
+    value = first.get_or_compute('recommendations', profiles[0], lambda: computed.append(1) or [{'id': '1'}])
+    assert second.get_or_compute('recommendations', profiles[0], lambda: computed.append(1)) == value == [{'id': '1'}]
+    assert len(computed) == 1
+    assert second.stats['remoteHits'] == 1
+
+    # The Redis hit was copied into the local tier
+    assert second.get(second.key('recommendations', profiles[0])) == value
+    assert second.stats['localHits'] == 1
+
+def test_async_lookups_use_the_redis_tier(profiles):
+    redis = MemoryRedis()
+    ResultCache(LRUCache(), RedisCache(redis), 'v1').get_or_compute('recommendations', profiles[0], lambda: [1])
+    cache = ResultCache(LRUCache(), RedisCache(redis), 'v1')
+
+    async def compute():
+        raise AssertionError('cached in Redis')
+
+    assert asyncio.run(cache.get_or_compute_async('recommendations', profiles[0], compute)) == [1]
+
+def test_catalog_version_bump_invalidates(profiles):
+    redis = MemoryRedis()
+    cache = ResultCache(LRUCache(), RedisCache(redis), 'v1')
+    cache.get_or_compute('recommendations', profiles[0], lambda: 'old catalog')
+
+    cache.set_catalog_version('v2')
+    assert len(cache.local) == 0
+    assert cache.get_or_compute('recommendations', profiles[0], lambda: 'new catalog') == 'new catalog'
+
+    # A request still served from the old snapshot reads and writes under the old version only
+    assert cache.get_or_compute('recommendations', profiles[0], lambda: 'stale', catalog_version='v1') == 'old catalog'
+    assert cache.get_or_compute('recommendations', profiles[0], lambda: 'unused') == 'new catalog'
+
+def test_redis_outage_is_a_miss_and_backs_off(profiles):
+    redis = MemoryRedis()
+    redis.down = True
+    cache = ResultCache(LRUCache(), RedisCache(redis, retry_seconds=60), 'v1')
+
+    assert cache.get_or_compute('recommendations', profiles[0], lambda: 'computed') == 'computed'
+    calls = redis.calls
+    cache.get_or_compute('recommendations', profiles[1], lambda: 'computed')
+    assert redis.calls == calls
+
+def test_concurrent_misses_share_one_computation(profiles):
+    cache = ResultCache(LRUCache(), catalog_version='v1')
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {'value': len(calls)}
+
+    async def requests():
+        return await asyncio.gather(*(cache.get_or_compute_async('recommend', profiles[0], compute) for _ in range(10)))
+
+    results = asyncio.run(requests())
+    assert len(calls) == 1
+    assert results == [{'value': 1}] * 10
+    assert cache.in_flight.stats == {'leaders': 1, 'coalesced': 9}
+
+    # The shared result was stored for later requests
+    assert asyncio.run(cache.get_or_compute_async('recommend', profiles[0], compute)) == {'value': 1}
+    assert len(calls) == 1
+
+def test_distinct_profiles_and_versions_are_not_coalesced(profiles):
+    cache = ResultCache(LRUCache(), catalog_version='v2')
+
+    async def requests():
+        return await asyncio.gather(*(
+            cache.get_or_compute_async('recommend', p, lambda p=p, v=v: asyncio.sleep(0, result=(v, p['skills'])),
+                                       catalog_version=v)
+            for p in profiles[:5] for v in ('v1', 'v2')
+        ))
+
+    assert asyncio.run(requests()) == [(v, p['skills']) for p in profiles[:5] for v in ('v1', 'v2')]
+    assert cache.in_flight.stats['coalesced'] == 0
+
+def test_shared_failure_reaches_every_caller_and_is_not_cached(profiles):
+    cache = ResultCache(LRUCache(), catalog_version='v1')
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError('scoring failed')
+
+    async def requests():
+        return await asyncio.gather(*(cache.get_or_compute_async('recommend', profiles[0], compute) for _ in range(5)),
+                                    return_exceptions=True)
+
+    results = asyncio.run(requests())
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(cache.in_flight) == 0
+
+    assert asyncio.run(cache.get_or_compute_async('recommend', profiles[0], lambda: asyncio.sleep(0, result='ok'))) == 'ok'
+
+def test_cancelled_caller_does_not_cancel_shared_work(profiles):
+    cache = ResultCache(LRUCache(), catalog_version='v1')
+
+    async def compute():
+        await asyncio.sleep(0.02)
+        return 'done'
+
+    async def requests():
+        first = asyncio.ensure_future(cache.get_or_compute_async('recommend', profiles[0], compute))
+        second = asyncio.ensure_future(cache.get_or_compute_async('recommend', profiles[0], compute))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(requests()) == 'done'
+    assert cache.get(cache.key('recommend', profiles[0])) == 'done'
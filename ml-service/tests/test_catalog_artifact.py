@@ -0,0 +1,49 @@
+"""
+Compiled Catalog Artifact Tests
+A memory-mapped artifact behaves like the JSON catalog it was compiled from
+"""
+
+import json
+
+import numpy as np
+
+from app.models.hybrid import HybridRecommender
+from app.utils.catalog_artifact import CompiledCatalog, load_compiled_catalog, write_catalog_artifact
+from app.utils.data_loader import compute_catalog_version
+
+def test_round_trip_equals_the_json_catalog(careers, tmp_path):
+    catalog = CompiledCatalog(write_catalog_artifact(str(tmp_path), careers, 'test'))
+
+    assert len(catalog) == len(careers)
+    assert list(catalog) == careers
+    assert catalog[-1] == careers[-1]
+    assert catalog[10:13] == careers[10:13]
+    assert json.loads(catalog.raw(5)) == careers[5]
+    assert catalog.career_ids == [c['id'] for c in careers]
+    assert catalog.version == compute_catalog_version(careers)
+
+def test_mapped_index_scores_like_an_in_memory_build(careers, profiles, recommender, tmp_path):
+    catalog = CompiledCatalog(write_catalog_artifact(str(tmp_path), careers, 'test'))
+    mapped = HybridRecommender(catalog, index=catalog.catalog_index)
+
+    for profile in profiles:
+        for got, expected in zip(mapped.index.score(profile), recommender.index.score(profile)):
+            np.testing.assert_array_equal(got, expected)
+        assert mapped.recommend(profile, 5) == recommender.recommend(profile, 5)
+
+def test_workers_attach_to_the_compiled_artifact(service, careers, profiles, tmp_path):
+    careers_file = tmp_path / 'careers.json'
+    careers_file.write_text(json.dumps(careers))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return careers
+
+    first = load_compiled_catalog(str(tmp_path / 'artifacts'), str(careers_file), loader)
+    second = load_compiled_catalog(str(tmp_path / 'artifacts'), str(careers_file), loader)
+    assert len(loads) == 1
+    assert second.path == first.path
+
+    # The service stack built on the artifact gives the same recommendations
+    assert service.build_recommender(second).recommend(profiles[0], 5) == HybridRecommender(careers).recommend(profiles[0], 5)
@@ -0,0 +1,71 @@
+"""
+Catalog Index Tests
+Vectorized catalog scoring and pruned top-k ranking against the frozen baseline scorer
+"""
+
+import numpy as np
+import pytest
+
+import baseline_scorer
+
+def assert_scores_match_baseline(content, collab, profile, careers):
+    expected = np.array(baseline_scorer.scores(profile, careers))
+    np.testing.assert_allclose(content, expected[:, 0], rtol=0, atol=1e-12)
+    np.testing.assert_allclose(collab, expected[:, 1], rtol=0, atol=1e-12)
+
+def test_index_scores_match_baseline(recommender, profiles, careers):
+    for profile in profiles:
+        assert_scores_match_baseline(*recommender.index.score(profile), profile, careers)
+
+def test_index_scores_rows_match_baseline(recommender, profiles, careers):
+    rows = np.arange(0, len(careers), 7)
+    subset = [careers[i] for i in rows.tolist()]
+    for profile in profiles:
+        assert_scores_match_baseline(*recommender.index.score(profile, rows), profile, subset)
+
+def test_scalar_scorers_match_baseline(recommender, profiles, careers):
+    for profile in profiles[:10]:
+        content = [recommender.content_based_score(profile, c) for c in careers]
+        collab = [recommender.collaborative_score(profile, c) for c in careers]
+        assert_scores_match_baseline(content, collab, profile, careers)
+
+def test_sparse_profiles_match_baseline(recommender, careers):
+    for profile in ({}, {'skills': [], 'interests': []}, {'educationLevel': 'PhD', 'yearsExperience': 40},
+                    {'skills': [careers[0]['requiredSkills'][0].upper()], 'fieldOfStudy': 'Design'}):
+        assert_scores_match_baseline(*recommender.index.score(profile), profile, careers)
+
+def test_careers_outside_the_catalog_match_baseline(recommender, profiles, careers):
+    outsider = {**careers[0], 'id': 'new', 'requiredSkills': careers[0]['requiredSkills'] + ['Unknown Skill']}
+    for profile in profiles:
+        assert recommender.content_based_score(profile, outsider) == baseline_scorer.content_based_score(profile, outsider)
+
+def assert_matches_baseline_page(page, expected):
+    assert [r['career']['id'] for r in page] == [r['career']['id'] for r in expected]
+    for recommendation, reference in zip(page, expected):
+        for key in ('matchPercentage', 'breakdown', 'timeline'):
+            assert recommendation[key] == reference[key]
+
+@pytest.mark.parametrize('offset, top_n', [(0, 1), (0, 5), (0, 40), (35, 10)])
+def test_recommend_matches_baseline_ranking(recommender, profiles, careers, offset, top_n):
+    for profile in profiles:
+        expected = baseline_scorer.recommend(profile, careers, offset + top_n)[offset:]
+        assert_matches_baseline_page(recommender.recommend(profile, top_n, offset), expected)
+
+def test_top_k_prunes_and_ranks_like_a_full_sort(recommender, profiles, monkeypatch):
+    index = recommender.index
+    scored, pruned = [], 0
+    score = index.score
+    monkeypatch.setattr(index, 'score', lambda context, rows=None: scored.append(rows) or score(context, rows))
+
+    for profile in profiles:
+        content, collab = score(profile)
+        hybrid = recommender.CONTENT_WEIGHT * content + recommender.COLLAB_WEIGHT * collab
+        expected = np.argsort(-hybrid, kind='stable')[:10]
+
+        scored.clear()
+        indices, _, _, top = index.top_k(profile, 10, recommender.CONTENT_WEIGHT, recommender.COLLAB_WEIGHT)
+        assert indices.tolist() == expected.tolist()
+        np.testing.assert_array_equal(top, hybrid[expected])
+        pruned += scored[-1] is not None
+    # The bounds rule out the rest of the catalog for some profiles (the path under test)
+    assert pruned
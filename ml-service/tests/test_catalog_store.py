@@ -0,0 +1,59 @@
+"""
+Catalog Store Tests
+Hot reload: readers keep their snapshot while a new one is built and swapped in
+"""
+
+import threading
+
+import pytest
+
+from app.models.hybrid import HybridRecommender
+from app.utils.catalog_store import CatalogStore
+
+def test_in_flight_request_finishes_on_its_snapshot(careers, profiles):
+    building, release = threading.Event(), threading.Event()
+    catalogs = iter([careers, careers[:300]])
+
+    def builder(careers_data):
+        if len(careers_data) == 300:
+            building.set()
+            release.wait(5)
+        return HybridRecommender(careers_data)
+
+    store = CatalogStore(loader=lambda: next(catalogs), builder=builder)
+    snapshot = store.current  # A request reads the snapshot once
+    expected = snapshot.recommender.recommend(profiles[0], 10)
+
+    reload = store.reload_in_background()
+    assert building.wait(5)
+    # While the new catalog builds, new requests still get the complete old snapshot
+    assert store.current is snapshot
+    release.set()
+    reload.join(5)
+
+    assert len(store.current.careers_data) == 300
+    assert store.current.version != snapshot.version
+    # The request that started before the swap still ranks against its own catalog
+    assert snapshot.recommender.recommend(profiles[0], 10) == expected
+
+def test_swap_notifies_listeners(careers):
+    store = CatalogStore(loader=lambda: careers[:100], builder=HybridRecommender, initial_data=careers)
+    swapped = []
+    store.on_swap(swapped.append)
+
+    snapshot = store.reload()
+    assert swapped == [snapshot]
+    # Same catalog again: nothing to swap
+    assert store.reload() is snapshot
+    assert swapped == [snapshot]
+
+def test_failed_reload_keeps_the_current_snapshot(careers):
+    def loader():
+        raise ValueError('catalog file is corrupt')
+
+    store = CatalogStore(loader=loader, builder=HybridRecommender, initial_data=careers)
+    snapshot = store.current
+    with pytest.raises(ValueError):
+        store.reload()
+    assert store.current is snapshot
+    assert store.last_error == 'catalog file is corrupt'
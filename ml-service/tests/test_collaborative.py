@@ -0,0 +1,132 @@
+"""
+Collaborative Filtering Tests
+Incremental folds against a dense rebuild from the full event list, history blending, and event logging
+"""
+
+import random
+import threading
+
+import numpy as np
+import pytest
+
+import baseline_scorer
+from app.models.collaborative import EVENT_WEIGHTS, CollaborativeModel, InteractionLog
+from app.models.hybrid import HybridRecommender
+
+NEIGHBORS = 5
+PRIOR_STRENGTH = 5.0
+
+@pytest.fixture(scope='module')
+def cf_careers(careers):
+    return careers[:80]
+
+@pytest.fixture(scope='module')
+def events(cf_careers):
+    rng = random.Random(13)
+    # A few popular careers, so neighborhoods overlap
+    popular = [str(c['id']) for c in cf_careers[:15]]
+    everything = [str(c['id']) for c in cf_careers]
+    return [{
+        'userId': f'u{rng.randrange(30)}',
+        'careerId': rng.choice(popular if rng.random() < 0.6 else everything),
+        'event': rng.choice(list(EVENT_WEIGHTS))
+    } for _ in range(600)]
+
+def rebuild(cf_careers, events):
+    """(users, damped interactions, neighbor similarities) recomputed densely from every event"""
+    position = {str(c['id']): i for i, c in enumerate(cf_careers)}
+    users = {}
+    for event in events:
+        users.setdefault(event['userId'], len(users))
+    raw = np.zeros((len(users), len(cf_careers)))
+    for event in events:
+        raw[users[event['userId']], position[event['careerId']]] += EVENT_WEIGHTS[event['event']]
+    interactions = np.log1p(raw)
+
+    cooccurrence = interactions.T @ interactions
+    norms = np.sqrt(np.diag(cooccurrence))
+    neighbors = np.zeros_like(cooccurrence)
+    for row in range(len(cf_careers)):
+        candidates = [
+            (-round(cooccurrence[row, col] / (norms[row] * norms[col]), 12), col)
+            for col in range(len(cf_careers))
+            if col != row and cooccurrence[row, col] > 0
+        ]
+        for similarity, col in sorted(candidates)[:NEIGHBORS]:
+            neighbors[row, col] = -similarity
+    return users, interactions, neighbors
+
+def test_incremental_folds_match_rebuild(cf_careers, events):
+    model = CollaborativeModel(cf_careers, neighbors=NEIGHBORS)
+    for start in range(0, len(events), 37):
+        model.fold_in(events[start:start + 37])
+
+    users, interactions, neighbors = rebuild(cf_careers, events)
+    assert model.state.users == users
+    np.testing.assert_allclose(model.state.interactions.toarray(), interactions, rtol=0, atol=1e-9)
+    np.testing.assert_allclose(model.state.neighbors.toarray(), neighbors, rtol=0, atol=1e-9)
+
+    counts = {}
+    for event in events:
+        counts[event['userId']] = counts.get(event['userId'], 0) + 1
+    assert {user: model.user_version(user) for user in users} == counts
+
+def test_history_blends_into_collaborative_scores(cf_careers, events, profiles):
+    model = CollaborativeModel(cf_careers, neighbors=NEIGHBORS, prior_strength=PRIOR_STRENGTH)
+    model.fold_in(events)
+    recommender = HybridRecommender(cf_careers, collaborative=model)
+    users, interactions, neighbors = rebuild(cf_careers, events)
+
+    for user_id, profile in zip(['u0', 'u7', 'u21', 'nobody'], profiles):
+        profile = dict(profile, userId=user_id)
+        heuristic = np.array([baseline_scorer.collaborative_score(profile, c) for c in cf_careers])
+        if user_id in users:
+            weights = interactions[users[user_id]]
+            total = weights.sum()
+            history = np.minimum((weights + weights @ neighbors) / total, 1.0)
+            blend = total / (total + PRIOR_STRENGTH)
+            expected = (1 - blend) * heuristic + blend * history
+        else:
+            expected = heuristic
+
+        _, collab = recommender.index.score(profile)
+        np.testing.assert_allclose(collab, expected, rtol=0, atol=1e-9)
+        assert [recommender.collaborative_score(profile, c) for c in cf_careers] == pytest.approx(expected, abs=1e-9)
+
+def test_user_version_moves_with_published_state(cf_careers, events):
+    model = CollaborativeModel(cf_careers, neighbors=NEIGHBORS)
+    model.fold_in(events[:100])
+    before = model.user_version('u0')
+    more = [dict(event, userId='u0') for event in events[100:110]]
+
+    # Mid-fold (before the new state is published) readers still see the old history version
+    seen = []
+    replace = model._replace_neighbor_rows
+    def observed(*args):
+        seen.append(model.user_version('u0'))
+        return replace(*args)
+    model._replace_neighbor_rows = observed
+
+    model.fold_in(more)
+    assert seen == [before]
+    assert model.user_version('u0') == before + len(more)
+
+def test_interactions_are_logged_and_folded_on_the_scoring_pool(client, service, tmp_path, monkeypatch):
+    snapshot = service.catalog_store.current
+    model = CollaborativeModel(snapshot.careers_data, log=InteractionLog(str(tmp_path / 'events.jsonl')))
+    monkeypatch.setattr(snapshot.recommender, 'collaborative', model)
+
+    threads = []
+    def traced(name, fn):
+        return lambda *args: threads.append((name, threading.current_thread().name)) or fn(*args)
+    monkeypatch.setattr(model.log, 'append', traced('append', model.log.append))
+    monkeypatch.setattr(model, 'refresh', traced('refresh', model.refresh))
+
+    career_id = str(snapshot.careers_data[0]['id'])
+    response = client.post('/api/ml/interactions', json={'events': [
+        {'userId': 'u1', 'careerId': career_id, 'event': 'save'}
+    ]})
+    assert response.status_code == 200
+    assert response.json()['collaborative']['events'] == 1
+    assert [name for name, _ in threads] == ['append', 'refresh']
+    assert all(thread.startswith('ThreadPoolExecutor') for _, thread in threads)
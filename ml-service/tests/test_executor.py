@@ -0,0 +1,65 @@
+"""
+Scoring Executor Tests
+Bounded admission: a saturated pool sheds load with 503 and Retry-After
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.utils.executor import Overloaded, ScoringExecutor
+
+def test_saturated_pool_rejects_instead_of_queueing():
+    executor = ScoringExecutor(kind='thread', max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        # One task running, one queued: the pool and queue are full
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded) as overloaded:
+            await executor.run(sum, [1, 2])
+        release.set()
+        await asyncio.gather(*running)
+        return overloaded.value, await executor.run(sum, [1, 2])
+
+    try:
+        overloaded, result = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert overloaded.retry_after >= 1
+    assert result == 3
+    assert executor.stats == {'completed': 3, 'rejected': 1}
+
+def test_local_runs_share_the_admission_limit():
+    executor = ScoringExecutor(kind='thread', max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded):
+            await executor.run_local(sum, [1])
+        release.set()
+        await running
+
+    try:
+        asyncio.run(run())
+    finally:
+        executor.shutdown()
+
+@pytest.mark.parametrize('path, body', [
+    ('/api/ml/recommendations', lambda p: p),
+    ('/api/ml/recommendations/batch', lambda p: {'profiles': [p]}),
+    ('/api/ml/placement-probability', lambda p: p),
+])
+def test_saturated_service_returns_503_with_retry_after(client, service, profiles, monkeypatch, path, body):
+    executor = service.scoring_executor
+    monkeypatch.setattr(executor, '_in_flight', executor.max_workers + executor.max_queue)
+    # An uncached profile, so the request has to reach the pool
+    profile = {**profiles[0], 'yearsExperience': 77}
+
+    response = client.post(path, json=body(profile))
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) >= 1
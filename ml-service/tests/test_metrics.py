@@ -0,0 +1,48 @@
+"""
+Metrics Tests
+Stage histograms, including stages observed inside process-pool workers
+"""
+
+import asyncio
+
+import pytest
+
+from app.utils.executor import ScoringExecutor
+from app.utils.metrics import Metrics, metrics
+
+def timed_stage(stage: str) -> str:
+    """A scoring function that observes one stage (runs in the pool)"""
+    metrics.observe_stage(stage, 0.002)
+    return stage
+
+def stage_count(stage: str) -> int:
+    series = metrics.stage_latency._series.get((stage,))
+    return sum(series[0]) if series else 0
+
+def test_stage_histogram_renders():
+    registry = Metrics()
+    registry.observe_stage('content', 0.0003)
+    registry.observe_stage('content', 2.0)
+    text = registry.render()
+    assert 'ml_stage_duration_seconds_bucket{stage="content",le="0.0005"} 1' in text
+    assert 'ml_stage_duration_seconds_count{stage="content"} 2' in text
+
+@pytest.mark.parametrize('kind', ['thread', 'process'])
+def test_worker_stages_reach_this_registry(kind):
+    stage = f'test_{kind}_stage'
+    executor = ScoringExecutor(kind=kind, max_workers=1)
+    try:
+        assert asyncio.run(executor.run(timed_stage, stage)) == stage
+        assert asyncio.run(executor.run_local(timed_stage, stage)) == stage
+    finally:
+        executor.shutdown()
+    assert stage_count(stage) == 2
+
+def test_recording_keeps_stages_out_of_the_registry():
+    registry = Metrics()
+    result, stages = registry.record_stages(lambda: registry.observe_stage('placement', 0.001) or 42)
+    assert (result, stages) == (42, [('placement', 0.001)])
+    assert registry.stage_latency._series == {}
+
+    registry.observe_stages(stages)
+    assert 'ml_stage_duration_seconds_count{stage="placement"} 1' in registry.render()
@@ -0,0 +1,67 @@
+"""
+Micro-Batcher Tests
+Flushing by size and by timer, with each caller getting its own result
+"""
+
+import asyncio
+
+from app.utils.executor import ScoringExecutor
+from app.utils.micro_batcher import MicroBatcher
+
+class Recorder:
+    """process_batch that records the batches it was given"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 10 for item in items]
+
+def submit_all(batcher, items):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(item) for item in items))
+    return asyncio.run(run())
+
+def test_full_batch_flushes_without_waiting():
+    recorder = Recorder()
+    # A timer this long would fail the test if the size limit didn't flush
+    batcher = MicroBatcher(recorder, max_batch_size=4, max_wait_ms=60_000)
+    assert submit_all(batcher, range(8)) == [0, 10, 20, 30, 40, 50, 60, 70]
+    assert recorder.batches == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+def test_partial_batch_flushes_on_the_timer():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch_size=32, max_wait_ms=5)
+    assert submit_all(batcher, [1, 2, 3]) == [10, 20, 30]
+    assert recorder.batches == [[1, 2, 3]]
+    assert batcher.get_stats()['meanBatchSize'] == 3
+
+def test_batch_size_one_disables_batching():
+    recorder = Recorder()
+    batcher = MicroBatcher(recorder, max_batch_size=1)
+    assert submit_all(batcher, [1, 2]) == [10, 20]
+    assert recorder.batches == [[1], [2]]
+
+def test_batch_errors_reach_every_caller():
+    def fail(items):
+        raise RuntimeError('scoring failed')
+
+    batcher = MicroBatcher(fail, max_batch_size=2)
+
+    async def run():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert [str(e) for e in asyncio.run(run())] == ['scoring failed'] * 2
+
+def test_batches_run_on_the_executor(recommender, profiles):
+    executor = ScoringExecutor(kind='thread', max_workers=2, max_queue=8)
+    batcher = MicroBatcher(
+        lambda items: recommender.recommend_batch([p for p, _ in items], pages=[(0, n) for _, n in items]),
+        max_batch_size=16, executor=executor
+    )
+    try:
+        results = submit_all(batcher, [(p, 3 + i % 3) for i, p in enumerate(profiles)])
+    finally:
+        executor.shutdown()
+    assert results == [recommender.recommend(p, 3 + i % 3) for i, p in enumerate(profiles)]
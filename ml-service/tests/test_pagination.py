@@ -0,0 +1,58 @@
+"""
+Pagination Tests
+Cursor encoding and paging through /api/ml/recommendations across catalog reloads
+"""
+
+import pytest
+
+from app.utils.pagination import StaleCursor, decode_cursor, encode_cursor, next_cursor
+
+def test_cursor_round_trip():
+    for offset in (0, 1, 5, 99):
+        assert decode_cursor(encode_cursor(offset, 'v1'), 'v1', 100) == offset
+    assert decode_cursor(None, 'v1', 100) == 0
+    assert decode_cursor('', 'v1', 100) == 0
+
+def test_next_cursor_stops_at_the_end():
+    assert decode_cursor(next_cursor(0, 5, 12, 'v1'), 'v1', 12) == 5
+    assert next_cursor(10, 5, 12, 'v1') is None
+    assert next_cursor(7, 5, 12, 'v1') is None
+
+def test_cursor_from_another_catalog_version_is_stale():
+    with pytest.raises(StaleCursor):
+        decode_cursor(encode_cursor(5, 'v1'), 'v2', 100)
+
+@pytest.mark.parametrize('cursor', ['not-a-cursor', encode_cursor(100, 'v1'), encode_cursor(-1, 'v1'),
+                                    encode_cursor(True, 'v1'), encode_cursor('5', 'v1')])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError) as error:
+        decode_cursor(cursor, 'v1', 100)
+    assert not isinstance(error.value, StaleCursor)
+
+def test_pages_follow_the_ranking(client, service, serve_catalog, careers, profiles):
+    serve_catalog(careers)
+    profile = profiles[0]
+    ranking = service.catalog_store.current.recommender.recommend(profile, 12)
+
+    seen, cursor = [], None
+    for _ in range(3):
+        response = client.post('/api/ml/recommendations', json=profile,
+                               params={'limit': 4, **({'cursor': cursor} if cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        seen += [r['career']['id'] for r in body['recommendations']]
+        cursor = body['nextCursor']
+
+    assert seen == [r['career']['id'] for r in ranking]
+    assert body['total'] == len(careers)
+
+def test_cursor_is_gone_after_a_catalog_swap(client, serve_catalog, careers, profiles):
+    serve_catalog(careers)
+    cursor = client.post('/api/ml/recommendations', json=profiles[0], params={'limit': 4}).json()['nextCursor']
+
+    serve_catalog(careers[:-1])
+    response = client.post('/api/ml/recommendations', json=profiles[0], params={'limit': 4, 'cursor': cursor})
+    assert response.status_code == 410
+
+    response = client.post('/api/ml/recommendations', json=profiles[0], params={'limit': 4, 'cursor': 'garbage'})
+    assert response.status_code == 400
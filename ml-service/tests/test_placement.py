@@ -0,0 +1,73 @@
+"""
+Placement Prediction Tests
+Batched and compiled-forest predictions against per-profile sklearn predictions
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_profiles
+from app.models.compiled_forest import CompiledForest
+from app.models.placement import PlacementPredictor
+
+@pytest.fixture(scope='module')
+def placement_profiles():
+    return generate_profiles(300, seed=9)
+
+@pytest.fixture(scope='module')
+def forest(placement_profiles):
+    """A small random forest fitted on synthetic placement labels"""
+    pytest.importorskip('sklearn')
+    from benchmarks.placement_inference import train_forest
+    features = PlacementPredictor().extract_features_batch(placement_profiles)
+    return train_forest(features, trees=20, max_depth=8)
+
+def sklearn_predictor(model):
+    """A predictor that only uses sklearn's predict_proba (no compiled forest)"""
+    predictor = PlacementPredictor()
+    predictor.model = model
+    predictor.is_trained = True
+    return predictor
+
+def test_heuristic_batch_matches_single(placement_profiles):
+    predictor = PlacementPredictor()
+    assert predictor.predict_probability_batch(placement_profiles) == [
+        predictor.predict_probability(p) for p in placement_profiles
+    ]
+
+def test_feature_matrix_matches_single_rows(placement_profiles):
+    predictor = PlacementPredictor()
+    batch = predictor.extract_features_batch(placement_profiles)
+    for row, profile in zip(batch, placement_profiles):
+        assert row.tolist() == predictor.extract_features(profile)[0].tolist()
+
+def test_model_batch_matches_single(forest, placement_profiles):
+    predictor = sklearn_predictor(forest)
+    assert predictor.predict_probability_batch(placement_profiles) == [
+        predictor.predict_probability(p) for p in placement_profiles
+    ]
+
+def test_empty_batch():
+    assert PlacementPredictor().predict_probability_batch([]) == []
+
+def test_compiled_forest_matches_sklearn(forest, placement_profiles):
+    features = PlacementPredictor().extract_features_batch(placement_profiles)
+    compiled = CompiledForest.from_sklearn(forest)
+    np.testing.assert_allclose(compiled.predict_proba(features), forest.predict_proba(features), rtol=0, atol=1e-12)
+    for row in features[:20]:
+        np.testing.assert_allclose(compiled.predict_proba(row[None]), forest.predict_proba(row[None]), rtol=0, atol=1e-12)
+
+@pytest.mark.parametrize('artifact', ['placement.joblib', 'placement.npz'])
+def test_loaded_model_predictions_match_sklearn(forest, placement_profiles, tmp_path, artifact):
+    path = str(tmp_path / artifact)
+    if artifact.endswith('.npz'):
+        CompiledForest.from_sklearn(forest).save(path)
+    else:
+        import joblib
+        joblib.dump(forest, path)
+    predictor = PlacementPredictor()
+    predictor.load_model(path)
+
+    expected = [sklearn_predictor(forest).predict_probability(p) for p in placement_profiles]
+    assert [predictor.predict_probability(p) for p in placement_profiles] == expected
+    assert predictor.predict_probability_batch(placement_profiles) == expected
@@ -0,0 +1,32 @@
+"""
+Batch Recommendation Tests
+One matrix pass for many profiles against per-profile recommend() and the baseline scorer
+"""
+
+import numpy as np
+
+import baseline_scorer
+
+def test_score_batch_matches_baseline(recommender, profiles, careers):
+    content, collab = recommender.index.score_batch(profiles)
+    for row, profile in enumerate(profiles):
+        expected = np.array(baseline_scorer.scores(profile, careers))
+        np.testing.assert_allclose(content[row], expected[:, 0], rtol=0, atol=1e-12)
+        np.testing.assert_allclose(collab[row], expected[:, 1], rtol=0, atol=1e-12)
+
+def test_recommend_batch_in_chunks(recommender, profiles, monkeypatch):
+    expected = recommender.recommend_batch(profiles, 8)
+    monkeypatch.setattr(recommender.index, 'BATCH_CELLS', 3 * recommender.index.size)
+    assert recommender.recommend_batch(profiles, 8) == expected
+
+def test_recommend_batch_matches_recommend(recommender, profiles):
+    assert recommender.recommend_batch(profiles, 8) == [recommender.recommend(p, 8) for p in profiles]
+
+def test_recommend_batch_pages(recommender, profiles):
+    pages = [(i % 4 * 5, 3 + i % 3) for i in range(len(profiles))]
+    assert recommender.recommend_batch(profiles, pages=pages) == [
+        recommender.recommend(p, n, offset) for p, (offset, n) in zip(profiles, pages)
+    ]
+
+def test_empty_batch(recommender):
+    assert recommender.recommend_batch([], 5) == []
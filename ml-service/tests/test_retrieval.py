@@ -0,0 +1,59 @@
+"""
+Approximate Retrieval Tests
+recall@k of the 'ann' shortlist against exhaustive scoring, and exact scores for what it returns
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import generate_careers, generate_profiles
+from app.models.hybrid import HybridRecommender
+from app.models.retrieval import AnnRetriever
+from app.utils.data_loader import enhance_career_data
+
+K = 10
+# Mean recall@10 with the default settings (0.97 at this size, see the README table)
+RECALL_FLOOR = 0.93
+
+@pytest.fixture(scope='module')
+def large_catalog():
+    careers = [enhance_career_data(c) for c in generate_careers(6000, seed=3)]
+    return HybridRecommender(careers)
+
+@pytest.fixture(scope='module')
+def ann(large_catalog):
+    retriever = AnnRetriever(large_catalog.index, min_catalog_size=0)
+    return HybridRecommender(large_catalog.careers_data, index=large_catalog.index, retriever=retriever)
+
+@pytest.fixture(scope='module')
+def query_profiles():
+    return generate_profiles(100, seed=9, n_skills=600)
+
+def exhaustive(recommender, profile):
+    """Hybrid score of every career, scored one by one without pruning or retrieval"""
+    content, collab = recommender.index.score(profile)
+    return recommender.CONTENT_WEIGHT * content + recommender.COLLAB_WEIGHT * collab
+
+def test_recall_against_exhaustive_scoring(large_catalog, ann, query_profiles):
+    recalls = []
+    for profile in query_profiles:
+        hybrid = exhaustive(large_catalog, profile)
+        kth = np.sort(hybrid)[-K]
+        rows, _, _, scores = ann.rank(profile, K)
+        # Ties at rank k make the exact set ambiguous: a hit is any career scoring at least the k-th score
+        recalls.append(np.count_nonzero(scores >= kth - 1e-12) / K)
+    assert np.mean(recalls) >= RECALL_FLOOR
+
+def test_shortlisted_careers_are_scored_exactly(large_catalog, ann, query_profiles):
+    for profile in query_profiles[:20]:
+        hybrid = exhaustive(large_catalog, profile)
+        rows, content, collab, scores = ann.rank(profile, K)
+        assert len(rows) == K
+        np.testing.assert_allclose(scores, hybrid[rows], rtol=0, atol=1e-12)
+        assert np.all(np.diff(scores) <= 0)
+
+def test_small_catalogs_stay_exact(recommender, profiles):
+    retriever = AnnRetriever(recommender.index)
+    assert not retriever.enabled
+    ann = HybridRecommender(recommender.careers_data, index=recommender.index, retriever=retriever)
+    assert [ann.recommend(p, K) for p in profiles[:10]] == [recommender.recommend(p, K) for p in profiles[:10]]
@@ -0,0 +1,65 @@
+"""
+Scoring Session Tests
+Incrementally rescored sessions against the baseline scorer and a fresh recommend()
+"""
+
+import random
+
+import numpy as np
+
+import baseline_scorer
+from app.models.collaborative import CollaborativeModel
+from app.models.hybrid import HybridRecommender
+from app.models.scoring_session import ScoringSession
+
+def edit(profile, rng, careers):
+    """One random onboarding edit (the fields sessions rescore incrementally)"""
+    profile = dict(profile)
+    field = rng.choice(['skills', 'interests', 'targetIndustries', 'educationLevel', 'fieldOfStudy',
+                        'yearsExperience', 'workStyle'])
+    donor = rng.choice(careers)
+    if field == 'skills':
+        skills = [s for s in profile['skills'] if rng.random() < 0.7]
+        profile['skills'] = skills + rng.sample(donor['requiredSkills'], min(2, len(donor['requiredSkills'])))
+    elif field == 'interests':
+        profile['interests'] = donor.get('relatedInterests', [])[:2] or ['Coding']
+    elif field == 'targetIndustries':
+        profile['targetIndustries'] = donor.get('industries', [])[:rng.randint(0, 2)]
+    elif field == 'educationLevel':
+        profile['educationLevel'] = rng.choice(['High School', 'Undergraduate', 'Graduate', 'Postgraduate', 'PhD'])
+    elif field == 'fieldOfStudy':
+        profile['fieldOfStudy'] = rng.choice(donor['requiredEducation'].get('fields') or ['Arts'])
+    elif field == 'yearsExperience':
+        profile['yearsExperience'] = rng.randint(0, 20)
+    else:
+        profile['workStyle'] = rng.choice((donor.get('suitableWorkStyles') or ['Remote']) + ['Hybrid'])
+    return profile
+
+def test_session_edits_match_baseline(recommender, profiles, careers):
+    rng = random.Random(17)
+    for profile in profiles[:10]:
+        session = ScoringSession(recommender, profile)
+        for _ in range(8):
+            profile = edit(profile, rng, careers)
+            session.update(recommender, profile)
+
+            expected = np.array(baseline_scorer.scores(profile, careers))[:, 2]
+            np.testing.assert_allclose(session.hybrid, expected, rtol=0, atol=1e-12)
+            assert session.recommend(10) == recommender.recommend(profile, 10)
+
+def test_session_rescored_when_history_changes(careers, profiles):
+    model = CollaborativeModel(careers, neighbors=10)
+    recommender = HybridRecommender(careers, collaborative=model)
+    profile = dict(profiles[0], userId='u1')
+    session = ScoringSession(recommender, profile)
+    before = session.hybrid.copy()
+
+    model.fold_in([{'userId': 'u1', 'careerId': str(c['id']), 'event': 'save'} for c in careers[:3]]
+                  + [{'userId': 'u2', 'careerId': str(c['id']), 'event': 'view'} for c in careers[1:6]])
+    session.update(recommender, profile)
+    assert not np.allclose(session.hybrid, before)
+
+    content, collab = recommender.index.score(profile)
+    np.testing.assert_allclose(session.hybrid, recommender.CONTENT_WEIGHT * content + recommender.COLLAB_WEIGHT * collab,
+                               rtol=0, atol=1e-12)
+    assert session.recommend(10) == recommender.recommend(profile, 10)
@@ -0,0 +1,59 @@
+"""
+Serialization Tests
+Spliced career fragments and field selection against encoding the whole response
+"""
+
+import json
+
+import pytest
+
+from app.utils.catalog_artifact import CompiledCatalog, write_catalog_artifact
+from app.utils.serialization import (
+    CareerFragments, encode_json, parse_fields, render_object, render_recommendations, select_fields
+)
+
+def restricted(recommendations, fields):
+    return [{**r, 'career': select_fields(r['career'], fields)} for r in recommendations]
+
+@pytest.mark.parametrize('fields', [None, ('id', 'title'), ('title', 'id', 'notAField')])
+def test_spliced_bytes_equal_encoding_the_list(recommender, profiles, careers, fields):
+    fragments = CareerFragments(careers)
+    for profile in profiles[:10]:
+        recommendations = recommender.recommend(profile, 5)
+        rendered = render_recommendations(recommendations, fragments, fields)
+        assert rendered == encode_json(restricted(recommendations, fields))
+        assert json.loads(rendered) == json.loads(json.dumps(restricted(recommendations, fields)))
+        # Second render is served from the fragment cache
+        assert render_recommendations(recommendations, fragments, fields) == rendered
+
+def test_careers_outside_the_catalog_are_encoded_directly(careers):
+    fragments = CareerFragments(careers)
+    copy = dict(careers[0])
+    assert fragments.position(copy) is None
+    assert fragments.fragment(copy, ('id',)) == encode_json({'id': copy['id']})
+
+def test_compiled_catalog_fragments(recommender, profiles, careers, tmp_path):
+    catalog = CompiledCatalog(write_catalog_artifact(str(tmp_path), careers, 'test'))
+    fragments = CareerFragments(catalog)
+    recommendations = [{**r, 'career': catalog[careers.index(r['career'])]} for r in recommender.recommend(profiles[0], 5)]
+    assert json.loads(render_recommendations(recommendations, fragments)) == json.loads(json.dumps(recommendations))
+
+def test_render_object_splices_raw_members():
+    assert json.loads(render_object({'a': 1, 'items': None, 'b': 'x'}, {'items': b'[1,2]'})) == {'a': 1, 'items': [1, 2], 'b': 'x'}
+
+def test_parse_fields():
+    assert parse_fields(None) is None
+    assert parse_fields(' id, title ,id,') == ('id', 'title')
+    with pytest.raises(ValueError):
+        parse_fields('id,"title"')
+
+def test_fields_projection_through_the_api(client, serve_catalog, careers, profiles):
+    serve_catalog(careers)
+    full = client.post('/api/ml/recommendations', json=profiles[1]).json()
+    trimmed = client.post('/api/ml/recommendations', json=profiles[1], params={'fields': 'id,title'}).json()
+
+    assert [r['career'] for r in trimmed['recommendations']] == [
+        {'id': r['career']['id'], 'title': r['career']['title']} for r in full['recommendations']
+    ]
+    assert restricted(full['recommendations'], ('id', 'title')) == trimmed['recommendations']
+    assert client.post('/api/ml/recommendations', json=profiles[1], params={'fields': 'id,ti tle'}).status_code == 400
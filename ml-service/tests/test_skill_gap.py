@@ -0,0 +1,73 @@
+"""
+Skill Gap Tests
+Counterfactual gains against re-scoring each modified profile with the baseline scorer
+"""
+
+import numpy as np
+import pytest
+
+import baseline_scorer
+from app.models.placement import PlacementPredictor
+from app.models.skill_gap import SkillGapAnalyzer
+
+TOP_K = 10
+POOL = 50
+
+@pytest.fixture(scope='module')
+def analyzer(recommender):
+    return SkillGapAnalyzer(recommender, PlacementPredictor())
+
+def rescored_gains(profile, modified, careers, predictor):
+    """(matchGain, maxMatchGain, careersImproved, placementGain) from scoring both profiles one by one"""
+    original = np.array(baseline_scorer.scores(profile, careers))[:, 2]
+    changed = np.array(baseline_scorer.scores(modified, careers))[:, 2]
+    gain = (changed - original) * 100
+    placement = (predictor.calculate_base_probability(modified) - predictor.calculate_base_probability(profile)) * 100
+    return gain.mean(), gain.max(), int(np.count_nonzero(gain > 1e-9)), placement
+
+def assert_gains(entry, expected):
+    mean, best, improved, placement = expected
+    assert entry['matchGain'] == pytest.approx(mean, abs=0.01)
+    assert entry['maxMatchGain'] == pytest.approx(best, abs=0.01)
+    assert entry['careersImproved'] == improved
+    assert entry['placementGain'] == pytest.approx(placement, abs=0.1)
+
+def test_skill_gains_match_rescoring(recommender, analyzer, profiles):
+    by_id = {c['id']: c for c in recommender.careers_data}
+    for profile in profiles[:15]:
+        result = analyzer.analyze(profile, top_k=TOP_K, pool=POOL)
+        top = [by_id[c['careerId']] for c in result['careers']]
+        assert result['skills']
+        for entry in result['skills']:
+            modified = {**profile, 'skills': list(profile['skills']) + [entry['skill']]}
+            assert_gains(entry, rescored_gains(profile, modified, top, analyzer.predictor))
+
+def test_improvement_gains_match_rescoring(recommender, analyzer, profiles):
+    by_id = {c['id']: c for c in recommender.careers_data}
+    changes = {
+        'Certifications': lambda p: {**p, 'certifications': list(p.get('certifications', [])) + ['counterfactual']},
+        'Projects': lambda p: {**p, 'projectsCompleted': p.get('projectsCompleted', 0) + 2},
+        'Experience': lambda p: {**p, 'yearsExperience': p.get('yearsExperience', 0) + 1},
+    }
+    for profile in profiles[:15]:
+        result = analyzer.analyze(profile, top_k=TOP_K, pool=POOL)
+        top = [by_id[c['careerId']] for c in result['careers']]
+        for entry in result['improvements']:
+            if entry['area'] in changes:
+                modified = changes[entry['area']](profile)
+                assert_gains(entry, rescored_gains(profile, modified, top, analyzer.predictor))
+
+def test_skills_use_the_careers_spelling(recommender, analyzer, profiles):
+    vocabulary = recommender.index.skill_vocabulary
+    for profile in profiles[:15]:
+        owned = {vocabulary.resolve(s) for s in profile['skills']}
+        # The best-ranked pool career's spelling of every skill the user lacks
+        expected = {}
+        for position in recommender.rank(profile, POOL)[0].tolist():
+            for skill in recommender.careers_data[position]['requiredSkills']:
+                skill_id = vocabulary.resolve(skill, fuzzy=False)
+                if skill_id not in owned:
+                    expected.setdefault(skill_id, skill)
+
+        skills = [entry['skill'] for entry in analyzer.analyze(profile, top_k=TOP_K, pool=POOL)['skills']]
+        assert sorted(skills) == sorted(expected.values())
@@ -0,0 +1,57 @@
+"""
+NDJSON Streaming Tests
+Bulk scoring keeps input order, reports bad records inline and validates off the event loop
+"""
+
+import json
+import threading
+
+def stream(client, lines, **params):
+    body = '\n'.join(lines).encode('utf-8')
+    response = client.post('/api/ml/score/stream', content=body, params=params,
+                           headers={'Content-Type': 'application/x-ndjson'})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_results_follow_input_order(client, service, serve_catalog, careers, profiles, monkeypatch):
+    serve_catalog(careers)
+    monkeypatch.setattr(service, 'STREAM_CHUNK_SIZE', 4)
+    records = stream(client, [json.dumps(p) for p in profiles[:10]], limit=3, fields='id')
+
+    assert [r['line'] for r in records[:-1]] == list(range(1, 11))
+    recommender = service.catalog_store.current.recommender
+    for record, profile in zip(records[:-1], profiles):
+        expected = recommender.recommend(service.UserProfile(**profile).dict(), 3)
+        assert record['success']
+        assert [r['career'] for r in record['recommendations']] == [{'id': r['career']['id']} for r in expected]
+        assert record['placement'] == service.placement_predictor.predict_probability(service.UserProfile(**profile).dict())
+    assert records[-1]['done'] and records[-1]['records'] == 10 and records[-1]['failed'] == 0
+
+def test_invalid_records_are_reported_inline(client, profiles):
+    lines = [
+        json.dumps(profiles[0]),
+        '{"educationLevel": ',
+        json.dumps({**profiles[1], 'skills': 'Python'}),
+        '',
+        '[1, 2]',
+        json.dumps(profiles[2]),
+    ]
+    records = stream(client, lines)
+
+    assert [(r['line'], r['success']) for r in records[:-1]] == [
+        (1, True), (2, False), (3, False), (5, False), (6, True)
+    ]
+    assert records[1]['errors'][0]['type'] == 'json_invalid'
+    assert records[2]['errors'][0]['loc'] == ['skills']
+    assert records[3]['errors'][0]['type'] == 'model_type'
+    assert records[-1] == {**records[-1], 'done': True, 'records': 5, 'failed': 3}
+
+def test_records_are_validated_on_the_scoring_pool(client, service, profiles, monkeypatch):
+    threads = []
+    validate = service.validate_stream_record
+    monkeypatch.setattr(service, 'validate_stream_record',
+                        lambda record: threads.append(threading.current_thread().name) or validate(record))
+
+    stream(client, [json.dumps(p) for p in profiles[:3]])
+    assert len(threads) == 3
+    assert all(name.startswith('ThreadPoolExecutor') for name in threads)
@@ -0,0 +1,91 @@
+"""
+Vocabulary Tests
+Alias, spelling-variant and typo-tolerant term lookup, and career spellings in missingSkills
+"""
+
+import random
+
+import pytest
+
+from app.models.vocabulary import TermVocabulary
+
+CATALOG_TERMS = ['Python', 'JavaScript', 'React', 'Kubernetes', 'PostgreSQL', 'TensorFlow', 'Docker',
+                 'REST', 'Jira', 'SQL', 'Go', 'Python 2', 'Excel', 'Machine Learning', 'Node.js']
+
+@pytest.fixture(scope='module')
+def vocabulary():
+    vocabulary = TermVocabulary()
+    vocabulary.add_all(CATALOG_TERMS)
+    return vocabulary
+
+def canonical(vocabulary, term):
+    term_id = vocabulary.resolve(term)
+    return vocabulary.terms[term_id] if term_id is not None else None
+
+@pytest.mark.parametrize('term, expected', [
+    ('JS', 'javascript'),
+    ('k8s', 'kubernetes'),
+    ('Postgres', 'postgresql'),
+    ('ML', 'machine learning'),
+    ('React.js', 'react'),
+    ('ReactJS', 'react'),
+    ('node', 'node.js'),
+    ('Dockers', 'docker'),
+    ('MS Excel', 'excel'),
+])
+def test_aliases_and_spelling_variants(vocabulary, term, expected):
+    assert canonical(vocabulary, term) == expected
+
+@pytest.mark.parametrize('term, expected', [
+    ('Pyhton', 'python'),
+    ('Pythn', 'python'),
+    ('Javscript', 'javascript'),
+    ('Kuberentes', 'kubernetes'),
+    ('Tensorflwo', 'tensorflow'),
+    ('Dokcer', 'docker'),
+    ('Postgressql', 'postgresql'),
+    ('Machine Lerning', 'machine learning'),
+])
+def test_typos_resolve(vocabulary, term, expected):
+    assert canonical(vocabulary, term) == expected
+
+@pytest.mark.parametrize('term', [
+    'Rust',       # REST
+    'Java',       # Jira
+    'NoSQL',      # SQL: two edits
+    'Git',        # Go
+    'MySQL',
+    'Python 3',   # numbers must agree
+    'Kotlin',
+])
+def test_near_miss_distinct_skills_do_not_resolve(vocabulary, term):
+    assert vocabulary.resolve(term) is None
+
+def test_exact_lookup_skips_typos(vocabulary):
+    assert vocabulary.resolve('Pyhton', fuzzy=False) is None
+    assert canonical(vocabulary, 'python') == 'python'
+
+def test_canonical_terms_do_not_depend_on_catalog_order():
+    spellings = CATALOG_TERMS + ['ReactJS', 'react.js', 'Dockers', 'postgres', 'JS', 'nodejs']
+    expected = None
+    for seed in range(5):
+        shuffled = spellings[:]
+        random.Random(seed).shuffle(shuffled)
+        vocabulary = TermVocabulary()
+        vocabulary.add_all(shuffled)
+        mapping = {term: vocabulary.canonical(term) for term in spellings}
+        assert expected is None or mapping == expected
+        expected = mapping
+
+def test_missing_skills_use_the_careers_spelling(recommender, profiles):
+    vocabulary = recommender.index.skill_vocabulary
+    for profile in profiles:
+        owned = {vocabulary.resolve(s) for s in profile['skills']}
+        for recommendation in recommender.recommend(profile, 10):
+            expected, seen = [], set()
+            for skill in recommendation['career']['requiredSkills']:
+                skill_id = vocabulary.resolve(skill, fuzzy=False)
+                if skill_id not in owned and skill_id not in seen:
+                    seen.add(skill_id)
+                    expected.append(skill)
+            assert recommendation['missingSkills'] == expected
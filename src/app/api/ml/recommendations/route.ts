@@ -12,8 +12,12 @@ export async function POST(request: NextRequest) {
     try {
         const userProfile = await request.json();
 
+        // Forward paging and projection params (limit, cursor, fields) so callers can page deeper
+        // into the ranking and trim the embedded career records
+        const search = request.nextUrl.search;
+
         // Call Python ML service
-        const response = await fetch(`${ML_SERVICE_URL}/api/ml/recommendations`, {
+        const response = await fetch(`${ML_SERVICE_URL}/api/ml/recommendations${search}`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',